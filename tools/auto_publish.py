@@ -6,22 +6,35 @@ Workflow:
   1. Pre-warm Ollama
   2. Discover trending topics
   3. Generate 2 original articles
-  4. Generate 1 summary article
+  4. Generate 1 summary article (or, with --digest, one roundup of many items)
   5. Git commit & push (triggers Cloudflare deploy)
 
+With --async, steps 1-4 run as a dependency graph (task_graph.py): web
+searches and the summary's feed and page fetches run while the GPU is
+generating, and generations queue on a semaphore sized to
+OLLAMA_NUM_PARALLEL, so the day's wall time approaches total LLM time.
+
 Usage:
   python auto_publish.py              # Full pipeline
   python auto_publish.py --dry-run    # Discover + generate, skip git push
   python auto_publish.py --skip-push  # Generate but don't push
+  python auto_publish.py --model qwen3:32b  # One model for every task (ignore config/models.json)
+  python auto_publish.py --fresh      # Ignore today's ledger (no resume)
+  python auto_publish.py --async      # Overlap feeds/search/fetches with generation
+  python auto_publish.py --digest     # Daily digest (news_digest.py) instead of one summary
+  python auto_publish.py --no-llm-cache  # Regenerate even if a response is in the LLM cache
+
+Per-step timings and Ollama token counters go to logs/metrics.jsonl
+(summarize with: python metrics.py).
 """
 
 import argparse
-import json
+import asyncio
 import logging
+import os
 import subprocess
 import sys
 import time
-import urllib.request
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -35,8 +48,9 @@ JST = timezone(timedelta(hours=9))
 # Add tools dir to path so we can import sibling modules
 sys.path.insert(0, str(TOOLS_DIR))
 
-OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
-DUCKDUCKGO_WAIT = 300  # 5 minutes between generations to avoid DDG rate limit
+from job_ledger import JobLedger, reached, written_path  # noqa: E402
+from metrics import emit, timed  # noqa: E402
+from task_graph import Task, TaskGraph  # noqa: E402
 
 
 def setup_logging() -> logging.Logger:
@@ -61,34 +75,30 @@ def setup_logging() -> logging.Logger:
 
 
 def prewarm_ollama(logger: logging.Logger) -> bool:
-    """Ping Ollama to ensure it's running and warm up the model."""
-    logger.info("Pre-warming Ollama...")
+    """Ping Ollama to ensure it's running and load the model that will generate."""
+    from model_router import get_router
+    router = get_router()
+    model = router.primary("article")
+    logger.info(f"Pre-warming Ollama ({model})...")
+    start = time.time()
     try:
-        data = json.dumps({
-            "model": "llama3.3:70b-instruct-q4_K_M",
-            "prompt": "Hello",
-            "stream": False,
-            "options": {"num_predict": 1},
-        }).encode()
-        req = urllib.request.Request(
-            OLLAMA_URL,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            resp.read()
-        logger.info("Ollama is ready.")
-        return True
+        router.client.prewarm(model)
     except Exception as e:
         logger.error(f"Ollama pre-warm failed: {e}")
+        emit("pipeline.prewarm", time.time() - start, ok=False, model=model, error=str(e)[:200])
         return False
+    logger.info("Ollama is ready.")
+    emit("pipeline.prewarm", time.time() - start, model=model)
+    return True
 
 
 def discover_topics(logger: logging.Logger, count: int = 3) -> list[dict]:
     """Run topic discovery and return selected topics."""
     logger.info(f"Discovering {count} trending topics...")
     from topic_discovery import discover_topics as _discover
-    topics = _discover(count=count)
+    with timed("pipeline.discover") as m:
+        topics = _discover(count=count)
+        m["topics"] = len(topics)
     if topics:
         for t in topics:
             logger.info(f"  Topic: [{t['lang']}] [{t['category']}] {t['keyword']} (score: {t['score']:.3f})")
@@ -97,10 +107,28 @@ def discover_topics(logger: logging.Logger, count: int = 3) -> list[dict]:
     return topics
 
 
+def register_topics(ledger: JobLedger, topics: list[dict], max_articles: int = 2) -> None:
+    """Record the topics that will be written before generating any of them.
+
+    Discovery marks its picks as used in the topic history, so a topic
+    missing from the ledger after a crash would not come back on rerun.
+    """
+    from generate import article_job_key
+    for topic in topics[:max_articles]:
+        ledger.register(article_job_key(topic["keyword"], topic["lang"], topic["category"]), "article",
+                        {"keyword": topic["keyword"], "lang": topic["lang"],
+                         "category": topic["category"], "translate_to": None})
+
+
 def generate_original_articles(logger: logging.Logger, topics: list[dict],
-                                max_articles: int = 2) -> list[Path]:
-    """Generate original articles from discovered topics."""
-    from generate import generate_article
+                                max_articles: int = 2,
+                                ledger: JobLedger | None = None) -> list[Path]:
+    """Generate original articles from discovered topics.
+
+    Jobs the ledger already marks as committed are skipped; written but
+    uncommitted ones are returned again so they get committed.
+    """
+    from generate import article_job_key, generate_article
     generated = []
     selected = topics[:max_articles]
 
@@ -109,37 +137,46 @@ def generate_original_articles(logger: logging.Logger, topics: list[dict],
         lang = topic["lang"]
         category = topic["category"]
 
+        if ledger and reached(ledger.get(article_job_key(keyword, lang, category)), "committed"):
+            logger.info(f"Article {i+1}/{len(selected)} already published: [{lang}] {keyword}")
+            continue
+
         logger.info(f"Generating article {i+1}/{len(selected)}: [{lang}] {keyword}")
         try:
-            path = generate_article(keyword, lang, category)
+            with timed("pipeline.article", keyword=keyword, lang=lang):
+                path = generate_article(keyword, lang, category, ledger=ledger)
             generated.append(path)
             logger.info(f"  Generated: {path.relative_to(BLOG_ROOT)}")
         except Exception as e:
             logger.error(f"  Failed to generate '{keyword}': {e}")
 
-        # Wait between generations for DuckDuckGo rate limiting
-        if i < len(selected) - 1:
-            wait_time = DUCKDUCKGO_WAIT
-            logger.info(f"  Waiting {wait_time}s for rate limit...")
-            time.sleep(wait_time)
-
     return generated
 
 
-def generate_summary_article(logger: logging.Logger, lang: str | None = None) -> list[Path]:
+def generate_summary_article(logger: logging.Logger, lang: str | None = None,
+                             ledger: JobLedger | None = None) -> list[Path]:
     """Generate a summary article from trending news."""
-    from summarize_news import get_top_articles, generate_summary
+    from summarize_news import best_articles, generate_summary
     logger.info("Generating summary article...")
 
-    articles = get_top_articles(count=1, lang=lang)
+    # Resume a summary started earlier today instead of picking a new article
+    articles = [(j["inputs"], None) for j in ledger.jobs("summary")] if ledger else []
+    if articles:
+        if all(reached(j, "committed") for j in ledger.jobs("summary")):
+            logger.info("  Summary already published today.")
+            return []
+        logger.info("  Resuming summary from ledger.")
+    else:
+        articles = best_articles(count=1, lang=lang)
     if not articles:
-        logger.warning("No articles found for summarization.")
+        logger.warning("No articles with usable text found for summarization.")
         return []
 
     generated = []
-    for article in articles:
+    for article, article_text in articles:
         try:
-            path = generate_summary(article)
+            with timed("pipeline.summary", url=article["url"]):
+                path = generate_summary(article, ledger=ledger, article_text=article_text)
             if path:
                 generated.append(path)
                 logger.info(f"  Summary saved: {path.relative_to(BLOG_ROOT)}")
@@ -149,6 +186,165 @@ def generate_summary_article(logger: logging.Logger, lang: str | None = None) ->
     return generated
 
 
+def generate_digest_article(logger: logging.Logger, lang: str,
+                            ledger: JobLedger | None = None) -> list[Path]:
+    """Generate the daily digest covering the top feed items."""
+    from news_digest import generate_digest
+    logger.info("Generating daily digest...")
+    try:
+        with timed("pipeline.digest", lang=lang):
+            path = generate_digest("daily", lang=lang, ledger=ledger)
+    except Exception as e:
+        logger.error(f"  Digest failed: {e}")
+        return []
+    if not path:
+        return []
+    logger.info(f"  Digest saved: {path.relative_to(BLOG_ROOT)}")
+    return [path]
+
+
+def build_task_graph(logger: logging.Logger, ledger: JobLedger, topics: list[dict],
+                     max_articles: int = 2, summary_lang: str | None = None,
+                     digest: bool = False) -> TaskGraph:
+    """Build the daily pipeline as a graph of I/O and GPU tasks.
+
+      prewarm [gpu] ──────────────┬──────────────┬────────────┐
+      discover ─┬─ search-N ── article-N [gpu]   │            │
+                └─ summary-fetch ─────────── summary [gpu]    │
+
+    With `digest`, summary-fetch collects the digest's items and summary
+    runs its map and reduce calls. `topics` resumed from the ledger make
+    discovery a no-op.
+    """
+    from generate import article_job_key, generate_step, search_step, write_step
+    from news_digest import DIGEST_ITEMS, collect_items, generate_digest, item_cache
+    from summarize_news import best_articles, generate_summary, prefetch_summary
+
+    def prewarm(results):
+        if not prewarm_ollama(logger):
+            raise RuntimeError("Ollama is not available")
+
+    def discover(results):
+        if topics:
+            logger.info(f"Resuming {len(topics)} topics from ledger {ledger.name}")
+            return topics
+        found = discover_topics(logger, count=3)
+        if not found:
+            raise RuntimeError("no topics discovered")
+        register_topics(ledger, found, max_articles)
+        return found
+
+    def search(i, results):
+        selected = results["discover"][:max_articles]
+        if i >= len(selected):
+            return None
+        topic = selected[i]
+        inputs = {k: topic[k] for k in ("keyword", "lang", "category")}
+        job = {**inputs,
+               "key": article_job_key(topic["keyword"], topic["lang"], topic["category"])}
+        record = ledger.register(job["key"], "article", inputs)
+        if reached(record, "committed"):
+            logger.info(f"Article {i+1}/{len(selected)} already published: [{job['lang']}] {job['keyword']}")
+            return None
+        job["path"] = written_path(record)
+        if not job["path"]:
+            search_step(job, ledger)
+        return job
+
+    def article(i, results):
+        job = results[f"search-{i}"]
+        if job is None:
+            return None
+        if job["path"]:
+            return job["path"]
+        logger.info(f"Generating article {i+1}: [{job['lang']}] {job['keyword']}")
+        try:
+            path = write_step(generate_step(job, ledger), ledger)
+        except Exception as e:
+            ledger.fail(job["key"], str(e))
+            raise
+        logger.info(f"  Generated: {path.relative_to(BLOG_ROOT)}")
+        return path
+
+    def digest_fetch(results):
+        jobs = ledger.jobs("digest")
+        if jobs and all(reached(j, "committed") for j in jobs):
+            logger.info("  Digest already published today.")
+            return None
+        if jobs:
+            return []  # resumed from the ledger by generate_digest
+        return collect_items(DIGEST_ITEMS["daily"], summary_lang, item_cache())
+
+    def digest_summary(results):
+        items = results["summary-fetch"]
+        if items is None:
+            return []
+        path = generate_digest("daily", lang=summary_lang, ledger=ledger, items=items or None)
+        if not path:
+            return []
+        logger.info(f"  Digest saved: {path.relative_to(BLOG_ROOT)}")
+        return [path]
+
+    def summary_fetch(results):
+        jobs = ledger.jobs("summary")
+        if jobs and all(reached(j, "committed") for j in jobs):
+            logger.info("  Summary already published today.")
+            return []
+        if jobs:
+            return [j["inputs"] for j in jobs if prefetch_summary(j["inputs"], ledger)]
+        articles = best_articles(count=1, lang=summary_lang)
+        if not articles:
+            logger.warning("No articles with usable text found for summarization.")
+        return [a for a, text in articles if prefetch_summary(a, ledger, text)]
+
+    def summary(results):
+        paths = []
+        for item in results["summary-fetch"]:
+            path = generate_summary(item, ledger=ledger)
+            if path:
+                paths.append(path)
+                logger.info(f"  Summary saved: {path.relative_to(BLOG_ROOT)}")
+        return paths
+
+    tasks = [
+        Task("prewarm", prewarm, gpu=True),
+        Task("discover", discover),
+        Task("summary-fetch", digest_fetch if digest else summary_fetch, deps=("discover",)),
+    ]
+    for i in range(max_articles):
+        tasks.append(Task(f"search-{i}", lambda r, i=i: search(i, r), deps=("discover",)))
+        tasks.append(Task(f"article-{i}", lambda r, i=i: article(i, r),
+                          deps=("prewarm", f"search-{i}"), gpu=True))
+    tasks.append(Task("summary", digest_summary if digest else summary,
+                      deps=("prewarm", "summary-fetch"), gpu=True))
+    return TaskGraph(tasks, gpu_slots=int(os.environ.get("OLLAMA_NUM_PARALLEL", 1)))
+
+
+def run_graph(logger: logging.Logger, ledger: JobLedger, summary_lang: str,
+              max_articles: int = 2, digest: bool = False) -> tuple[list[Path], list[Path]]:
+    """Run steps 1-4 concurrently; return (original article paths, summary paths)."""
+    topics = [j["inputs"] for j in ledger.jobs("article")]
+    graph = build_task_graph(logger, ledger, topics, max_articles, summary_lang, digest)
+    results = asyncio.run(graph.run())
+    for line in graph.summary_lines():
+        logger.info(f"  {line}")
+    for task in graph.tasks:
+        run = graph.runs[task.name]
+        if run.started_at:
+            emit("pipeline.task", run.ended_at - run.started_at, ok=run.status == "ok",
+                 task=task.name, gpu=task.gpu, gpu_wait_s=round(run.started_at - run.queued_at, 3))
+    original_paths = [results[f"article-{i}"] for i in range(max_articles)
+                      if results.get(f"article-{i}")]
+    return original_paths, results.get("summary", [])
+
+
+def mark_committed(ledger: JobLedger) -> None:
+    """Advance every written job in the ledger to committed."""
+    for job in ledger.jobs():
+        if reached(job, "written"):
+            ledger.update(job["key"], "committed")
+
+
 def git_commit_and_push(logger: logging.Logger, paths: list[Path],
                          dry_run: bool = False) -> bool:
     """Stage, commit, and push generated articles."""
@@ -209,53 +405,83 @@ def git_commit_and_push(logger: logging.Logger, paths: list[Path],
     return False
 
 
-def run_pipeline(dry_run: bool = False, skip_push: bool = False) -> None:
-    """Run the full auto-publish pipeline."""
+def run_pipeline(dry_run: bool = False, skip_push: bool = False,
+                 model: str | None = None, fresh: bool = False,
+                 async_mode: bool = False, digest: bool = False,
+                 no_llm_cache: bool = False) -> None:
+    """Run the full auto-publish pipeline.
+
+    Progress is kept in a per-day job ledger, so rerunning after a crash
+    resumes today's topics instead of discovering and generating anew.
+    With `async_mode`, steps 1-4 run concurrently (see build_task_graph).
+    With `digest`, step 4 writes a roundup of the day's top items instead
+    of a single summary.
+    """
     logger = setup_logging()
+    if model:
+        from model_router import get_router
+        get_router().set_model(model)
+    if no_llm_cache:
+        from ollama_client import get_client
+        get_client().read_cache = False
     start_time = time.time()
 
     logger.info("=" * 60)
     logger.info(f"Auto-publish pipeline started at {datetime.now(tz=JST).isoformat()}")
     logger.info("=" * 60)
 
-    # Step 1: Pre-warm Ollama
-    if not prewarm_ollama(logger):
-        logger.error("Aborting: Ollama is not available.")
-        return
+    ledger = JobLedger(f"daily-{datetime.now(tz=JST).strftime('%Y-%m-%d')}")
+    if fresh:
+        ledger.clear()
 
-    # Step 2: Discover topics
-    topics = discover_topics(logger, count=3)
-    if not topics:
-        logger.error("Aborting: no topics discovered.")
-        return
-
-    all_generated: list[Path] = []
-
-    # Step 3: Generate original articles (2)
-    original_paths = generate_original_articles(logger, topics, max_articles=2)
-    all_generated.extend(original_paths)
-
-    # Wait before summary generation
-    if original_paths:
-        logger.info(f"Waiting {DUCKDUCKGO_WAIT}s before summary generation...")
-        time.sleep(DUCKDUCKGO_WAIT)
-
-    # Step 4: Generate summary article (1)
-    # Alternate language: even days = ja, odd days = en
+    # Summary language alternates: even days = ja, odd days = en
     day = datetime.now(tz=JST).day
     summary_lang = "ja" if day % 2 == 0 else "en"
-    summary_paths = generate_summary_article(logger, lang=summary_lang)
-    all_generated.extend(summary_paths)
+
+    if async_mode:
+        original_paths, summary_paths = run_graph(logger, ledger, summary_lang, digest=digest)
+    else:
+        # Step 1: Pre-warm Ollama
+        if not prewarm_ollama(logger):
+            logger.error("Aborting: Ollama is not available.")
+            return
+
+        # Step 2: Discover topics (or resume today's)
+        topics = [j["inputs"] for j in ledger.jobs("article")]
+        if topics:
+            logger.info(f"Resuming {len(topics)} topics from ledger {ledger.name}")
+        else:
+            topics = discover_topics(logger, count=3)
+            register_topics(ledger, topics, max_articles=2)
+        if not topics:
+            logger.error("Aborting: no topics discovered.")
+            return
+
+        # Step 3: Generate original articles (2)
+        original_paths = generate_original_articles(logger, topics, max_articles=2, ledger=ledger)
+
+        # Step 4: Generate summary article (1), or the digest
+        if digest:
+            summary_paths = generate_digest_article(logger, summary_lang, ledger=ledger)
+        else:
+            summary_paths = generate_summary_article(logger, lang=summary_lang, ledger=ledger)
+
+    all_generated: list[Path] = original_paths + summary_paths
 
     # Step 5: Git commit & push
     if all_generated and not skip_push:
-        git_commit_and_push(logger, all_generated, dry_run=dry_run)
+        with timed("pipeline.git", files=len(all_generated), dry_run=dry_run):
+            pushed = git_commit_and_push(logger, all_generated, dry_run=dry_run)
+        if pushed and not dry_run:
+            mark_committed(ledger)
     elif skip_push:
         logger.info("Skipping git push (--skip-push).")
     else:
         logger.info("No articles generated, nothing to commit.")
 
     elapsed = time.time() - start_time
+    emit("pipeline.total", elapsed, mode="async" if async_mode else "sequential",
+         articles=len(original_paths), summaries=len(summary_paths))
     logger.info(f"Pipeline completed in {elapsed/60:.1f} minutes.")
     logger.info(f"  Original articles: {len(original_paths)}")
     logger.info(f"  Summary articles: {len(summary_paths)}")
@@ -269,9 +495,21 @@ def main():
                         help="Run pipeline but skip git commit/push")
     parser.add_argument("--skip-push", action="store_true",
                         help="Generate articles but don't push to remote")
+    parser.add_argument("--model", "-m", default=None,
+                        help="Ollama model to pre-warm and generate with")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore today's job ledger and start a new run")
+    parser.add_argument("--async", dest="async_mode", action="store_true",
+                        help="Run feeds, search and page fetches concurrently with generation")
+    parser.add_argument("--digest", action="store_true",
+                        help="Publish a digest of the day's top news instead of one summary")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Regenerate even if an identical request is in the LLM cache")
     args = parser.parse_args()
 
-    run_pipeline(dry_run=args.dry_run, skip_push=args.skip_push)
+    run_pipeline(dry_run=args.dry_run, skip_push=args.skip_push, model=args.model,
+                 fresh=args.fresh, async_mode=args.async_mode, digest=args.digest,
+                 no_llm_cache=args.no_llm_cache)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Batch Pipeline - Run work items through staged worker pools.
+
+Each stage has its own pool of worker threads and reads from a bounded
+queue fed by the previous stage, so slow I/O (web search) and slow compute
+(LLM generation) overlap instead of running back to back.
+
+Usage:
+  from batch_pipeline import Pipeline, Stage
+  pipeline = Pipeline([
+      Stage("search", do_search, workers=2),
+      Stage("generate", do_generate, workers=1),
+      Stage("write", do_write, workers=1),
+  ], queue_size=2)
+  results, failures = pipeline.run(items)
+  pipeline.print_summary()
+"""
+
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """A pipeline stage: `func` maps one item to the value passed downstream."""
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    """Counters collected for one stage during a run."""
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    first_start: float | None = None
+    last_end: float | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, started: float, ended: float, ok: bool) -> None:
+        with self.lock:
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.busy_seconds += ended - started
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or ended > self.last_end:
+                self.last_end = ended
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per minute of stage wall time."""
+        wall = self.wall_seconds
+        return self.processed / wall * 60 if wall > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker capacity spent busy while the stage was active."""
+        wall = self.wall_seconds
+        return self.busy_seconds / (wall * self.workers) if wall > 0 else 0.0
+
+
+class Pipeline:
+    """Threaded multi-stage pipeline with bounded queues between stages."""
+
+    def __init__(self, stages: list[Stage], queue_size: int = 2):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats = [StageStats(s.name, max(1, s.workers)) for s in stages]
+        self.elapsed = 0.0
+
+    def run(self, items: list[Any]) -> tuple[list[Any], list[tuple[Any, str, Exception]]]:
+        """Process all items; return (results, [(item, stage_name, error), ...]).
+
+        Results come back in completion order. A failure in any stage drops
+        that item from the remaining stages.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: list[Any] = []
+        failures: list[tuple[Any, str, Exception]] = []
+        out_lock = threading.Lock()
+        remaining = [stats.workers for stats in self.stats]
+        remaining_lock = threading.Lock()
+
+        def worker(index: int) -> None:
+            stage = self.stages[index]
+            stats = self.stats[index]
+            in_q = queues[index]
+            while True:
+                job = in_q.get()
+                if job is _DONE:
+                    break
+                item, value = job
+                started = time.time()
+                try:
+                    value = stage.func(value)
+                except Exception as e:
+                    stats.record(started, time.time(), ok=False)
+                    with out_lock:
+                        failures.append((item, stage.name, e))
+                    continue
+                stats.record(started, time.time(), ok=True)
+                if index + 1 < len(self.stages):
+                    queues[index + 1].put((item, value))
+                else:
+                    with out_lock:
+                        results.append(value)
+
+            # Last worker out closes the next stage
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stats[index + 1].workers):
+                    queues[index + 1].put(_DONE)
+
+        threads = []
+        for index, stats in enumerate(self.stats):
+            for n in range(stats.workers):
+                t = threading.Thread(target=worker, args=(index,),
+                                     name=f"{self.stages[index].name}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        start = time.time()
+        for item in items:
+            queues[0].put((item, item))
+        for _ in range(self.stats[0].workers):
+            queues[0].put(_DONE)
+
+        for t in threads:
+            t.join()
+        self.elapsed = time.time() - start
+        return results, failures
+
+    def print_summary(self, file=sys.stdout) -> None:
+        """Print per-stage throughput for the last run."""
+        print(f"\nPipeline finished in {self.elapsed / 60:.1f} minutes.", file=file)
+        print(f"  {'stage':<10} {'workers':>7} {'ok':>4} {'fail':>4} "
+              f"{'busy(s)':>9} {'wall(s)':>9} {'items/min':>9} {'util':>5}", file=file)
+        for s in self.stats:
+            print(f"  {s.name:<10} {s.workers:>7} {s.processed:>4} {s.failed:>4} "
+                  f"{s.busy_seconds:>9.1f} {s.wall_seconds:>9.1f} "
+                  f"{s.throughput:>9.2f} {s.utilization:>5.0%}", file=file)
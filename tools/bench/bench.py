@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark - Time the toolchain end to end against local stand-ins.
+
+Copies tools/ and content/ into a temporary sandbox, starts a stub Ollama
+(stub_ollama.py) and a fixture server for RSS feeds, article pages and
+search results (fixture_server.py), then times each scenario:
+
+  discover        topic_discovery.discover_topics (cold feed cache)
+  article         generate.generate_article (search + LLM + parse + write)
+  summary         summarize_news.generate_summary (page fetch + LLM + write)
+  digest          news_digest.generate_digest (page fetches + map calls + reduce + write)
+  pipeline        auto_publish.run_pipeline (sequential, --skip-push)
+  pipeline-async  auto_publish.run_pipeline in --async mode
+
+With the default instant stub, the timings measure only the Python side,
+so they are stable enough to catch regressions; --token-rate and
+--first-token-ms simulate a real model instead. Nothing outside the
+sandbox is touched and no network access is needed.
+
+Usage:
+  python bench/bench.py                          # All scenarios, 5 iterations
+  python bench/bench.py -s article -s summary -n 20
+  python bench/bench.py --token-rate 40 --first-token-ms 500
+  python bench/bench.py -s article --sections --token-rate 40   # Outline + parallel sections
+  python bench/bench.py --json bench.json        # Save results
+  python bench/bench.py --compare bench.json     # Fail if p50 regressed >25%
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = BENCH_DIR.parent
+BLOG_ROOT = TOOLS_DIR.parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+
+SCENARIOS = ("discover", "article", "summary", "digest", "pipeline", "pipeline-async")
+ARTICLE_JOBS = [
+    ("Ollama local inference", "en", "ai"),
+    ("ローカルLLM 推論 高速化", "ja", "ai"),
+    ("Kubernetes GPU scheduling", "en", "tech"),
+]
+
+
+# -- parent: build the sandbox and re-run inside it ----------------------
+
+def make_sandbox() -> Path:
+    root = Path(tempfile.mkdtemp(prefix="blog-bench-"))
+    shutil.copytree(TOOLS_DIR, root / "tools",
+                    ignore=shutil.ignore_patterns("cache", "__pycache__", "*.txt"))
+    if (BLOG_ROOT / "content").exists():
+        shutil.copytree(BLOG_ROOT / "content", root / "content")
+    (root / "logs").mkdir()
+    return root
+
+
+def run_in_sandbox(argv: list[str], keep: bool) -> int:
+    sandbox = make_sandbox()
+    env = {**os.environ, "BENCH_SANDBOX": str(sandbox)}
+    try:
+        return subprocess.call([sys.executable, str(sandbox / "tools" / "bench" / "bench.py"), *argv],
+                               env=env)
+    finally:
+        if keep:
+            print(f"Sandbox kept at {sandbox}")
+        else:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+
+# -- child: runs inside the sandbox copy ---------------------------------
+
+def configure(args, fixtures, stub) -> None:
+    """Point the sandboxed tools at the local servers."""
+    feeds_file = TOOLS_DIR / "config" / "feeds.json"
+    config = json.loads(feeds_file.read_text(encoding="utf-8"))
+    config["feeds"] = [
+        {"name": f["name"], "url": f"{fixtures.url}/feeds/{f['file']}", "category": f["category"],
+         "language": f["language"], "weight": f["weight"]}
+        for f in json.loads((FIXTURES_DIR / "feeds.json").read_text(encoding="utf-8"))
+    ]
+    feeds_file.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    os.environ["OLLAMA_HOST"] = stub.url
+    os.environ["OLLAMA_CACHE"] = "1" if args.llm_cache else "0"
+    os.environ["METRICS_RUN_ID"] = f"bench-{time.strftime('%Y%m%dT%H%M%S')}"
+    sys.path.insert(0, str(TOOLS_DIR))
+
+    import generate
+    import rate_limit
+    import summarize_news
+    generate.SEARCH_URL = f"{fixtures.url}/search?q={{query}}"
+    generate.SEARCH_CACHE_ENABLED = args.search_cache
+    generate.STREAM_ENABLED = summarize_news.STREAM_ENABLED = args.stream
+    generate.SECTIONED = args.sections
+    generate.SECTION_WORKERS = args.section_workers
+    rate_limit.HOST_LIMITS["127.0.0.1"] = {"per_minute": 1e9, "burst": 1e9}
+
+
+def reset_discovery_state() -> None:
+    """Forget fetched feeds and topic history so each discovery run starts cold."""
+    import history_store
+    shutil.rmtree(TOOLS_DIR / "cache" / "feeds", ignore_errors=True)
+    for path in (history_store.HISTORY_FILE, history_store.ARCHIVE_FILE):
+        path.unlink(missing_ok=True)
+    shutil.rmtree(TOOLS_DIR / "cache" / "ledger", ignore_errors=True)
+
+
+def scenario_funcs() -> dict:
+    import auto_publish
+    import generate
+    import news_digest
+    import summarize_news
+    import topic_discovery
+    from job_ledger import JobLedger
+
+    state = {"i": 0, "articles": None}
+
+    def discover():
+        reset_discovery_state()
+        topics = topic_discovery.discover_topics(count=3)
+        if not topics:
+            raise RuntimeError("no topics discovered")
+
+    def article():
+        keyword, lang, category = ARTICLE_JOBS[state["i"] % len(ARTICLE_JOBS)]
+        state["i"] += 1
+        generate.generate_article(keyword, lang, category)
+
+    def summary():
+        if state["articles"] is None:
+            state["articles"] = summarize_news.get_top_articles(count=2)
+        item = state["articles"][state["i"] % len(state["articles"])]
+        state["i"] += 1
+        if not summarize_news.generate_summary(item):
+            raise RuntimeError("summary was not written")
+
+    def digest():
+        # Forget cached story summaries so every run pays for the map calls
+        JobLedger(news_digest.ITEM_LEDGER).clear()
+        if not news_digest.generate_digest("daily", lang=("en", "ja")[state["i"] % 2]):
+            raise RuntimeError("digest was not written")
+        state["i"] += 1
+
+    def pipeline(async_mode: bool):
+        reset_discovery_state()
+        logging.getLogger("auto_publish").handlers.clear()
+        auto_publish.run_pipeline(skip_push=True, fresh=True, async_mode=async_mode)
+
+    return {
+        "discover": discover,
+        "article": article,
+        "summary": summary,
+        "digest": digest,
+        "pipeline": lambda: pipeline(False),
+        "pipeline-async": lambda: pipeline(True),
+    }
+
+
+def time_scenario(func, iterations: int, warmup: int, log) -> tuple[list[float], int]:
+    timings, failures = [], 0
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+                func()
+            ok = True
+        except Exception as e:
+            print(f"    iteration {i + 1} failed: {type(e).__name__}: {e}", file=sys.stderr)
+            ok = False
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+            failures += not ok
+    return timings, failures
+
+
+def stats(timings: list[float], failures: int) -> dict:
+    from metrics import percentile
+    total = sum(timings)
+    return {
+        "n": len(timings),
+        "failures": failures,
+        "mean": round(total / len(timings), 4),
+        "p50": round(percentile(timings, 50), 4),
+        "p95": round(percentile(timings, 95), 4),
+        "max": round(max(timings), 4),
+        "per_min": round(len(timings) / total * 60, 1) if total else 0.0,
+    }
+
+
+def compare(results: dict, baseline_file: Path, tolerance: float) -> list[str]:
+    """Return a message for every scenario whose p50 grew by more than `tolerance`."""
+    baseline = json.loads(baseline_file.read_text(encoding="utf-8"))["scenarios"]
+    regressions = []
+    for name, current in results["scenarios"].items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        # Small absolute slack so sub-millisecond noise never fails the check
+        if current["p50"] > old["p50"] * (1 + tolerance) + 0.005:
+            regressions.append(f"{name}: p50 {old['p50']:.3f}s → {current['p50']:.3f}s")
+    return regressions
+
+
+def run_benchmarks(args) -> int:
+    from fixture_server import FixtureServer
+    from stub_ollama import StubOllama
+
+    fixtures = FixtureServer(latency_ms=args.fetch_latency_ms).start()
+    stub = StubOllama(token_rate=args.token_rate, first_token_ms=args.first_token_ms,
+                      load_ms=args.load_ms, prompt_rate=args.prompt_rate,
+                      replay_dir=args.replay).start()
+    configure(args, fixtures, stub)
+    import metrics
+
+    funcs = scenario_funcs()
+    log_path = BLOG_ROOT / "logs" / "bench-output.log"
+    results = {"config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                          if k not in ("json", "compare")},
+               "scenarios": {}}
+
+    print(f"{'scenario':<16} {'n':>4} {'fail':>5} {'mean s':>8} {'p50 s':>8} {'p95 s':>8} "
+          f"{'max s':>8} {'runs/min':>9}")
+    with open(log_path, "w", encoding="utf-8") as log:
+        for name in args.scenario or SCENARIOS:
+            timings, failures = time_scenario(funcs[name], args.iterations, args.warmup, log)
+            s = results["scenarios"][name] = stats(timings, failures)
+            print(f"{name:<16} {s['n']:>4} {s['failures']:>5} {s['mean']:8.3f} {s['p50']:8.3f} "
+                  f"{s['p95']:8.3f} {s['max']:8.3f} {s['per_min']:9.1f}")
+
+    records = metrics.load()
+    if records and args.stages:
+        print("\nPer-stage metrics (all scenarios):")
+        print("\n".join(metrics.summarize(records)))
+    print(f"\nStub Ollama requests: {stub.requests}, fixture requests: {sum(fixtures.hits.values())}")
+    stub.stop()
+    fixtures.stop()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%}).")
+    failed = sum(s["failures"] for s in results["scenarios"].values())
+    if failed:
+        print(f"{failed} iterations failed; see {log_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog toolchain offline")
+    parser.add_argument("-s", "--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed iterations per scenario")
+    parser.add_argument("--token-rate", type=float, default=0, help="Stub tokens/s (0 = instant)")
+    parser.add_argument("--prompt-rate", type=float, default=0, help="Stub prompt tokens/s (0 = instant)")
+    parser.add_argument("--first-token-ms", type=float, default=0)
+    parser.add_argument("--load-ms", type=float, default=0, help="Stub one-off model load time")
+    parser.add_argument("--fetch-latency-ms", type=float, default=0, help="Fixture server latency")
+    parser.add_argument("--replay", type=Path, help="Replay real responses from an LLM cache directory")
+    parser.add_argument("--stream", action="store_true", help="Use streaming generation")
+    parser.add_argument("--sections", action="store_true",
+                        help="Generate articles as an outline plus one request per section")
+    parser.add_argument("--section-workers", type=int, default=4,
+                        help="Concurrent section requests with --sections (default: 4)")
+    parser.add_argument("--llm-cache", action="store_true", help="Leave the LLM response cache on")
+    parser.add_argument("--search-cache", action="store_true", help="Leave the search cache on")
+    parser.add_argument("--stages", action="store_true", help="Also print per-stage metrics")
+    parser.add_argument("--json", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check for p50 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p50 slowdown vs. the baseline (default: 0.25)")
+    parser.add_argument("--keep", action="store_true", help="Keep the sandbox directory")
+    args = parser.parse_args()
+
+    if not os.environ.get("BENCH_SANDBOX"):
+        # The child keeps our working directory, so relative paths stay valid
+        sys.exit(run_in_sandbox(sys.argv[1:], args.keep))
+
+    sys.exit(run_benchmarks(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Extract Benchmark - Compare page_extract with the old BeautifulSoup path.
+
+Runs both extractors over the recorded article pages in fixtures/pages/,
+plus a "large" copy of each padded to about --large-kb KB with comment
+threads and link lists (the shape of long HN-linked posts and arXiv
+listings), and reports time, peak memory and whether the article's first
+paragraph made it into the output.
+
+The old path is the previous fetch_article_text: whole-document decode,
+a full BeautifulSoup tree with html.parser, then truncation. It is skipped
+when beautifulsoup4 is not installed.
+
+Usage:
+  python bench/extract_bench.py
+  python bench/extract_bench.py -n 20 --large-kb 4000 --max-chars 5000
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import page_extract  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+PAGES_DIR = BENCH_DIR / "fixtures" / "pages"
+
+_COMMENT = ('<div class="comment"><p><a href="/user/{i}">user{i}</a> · {i} points</p>'
+            '<p>This is comment number {i}, which repeats a point about batching and GPU '
+            'memory that was already made further up the thread.</p>'
+            '<ul class="links"><li><a href="/reply/{i}">reply</a></li>'
+            '<li><a href="/flag/{i}">flag</a></li></ul></div>\n')
+
+
+def load_pages(large_kb: int) -> dict[str, bytes]:
+    pages = {}
+    for path in sorted(PAGES_DIR.glob("*.html")):
+        html = path.read_text(encoding="utf-8").replace("{base}", "http://fixtures.invalid")
+        html = re.sub(r"\{hours_ago:[\d.]+\}", "Sat, 18 Oct 2026 06:00:00 +0000", html)
+        pages[path.stem] = html.encode("utf-8")
+
+        comments, i = [], 0
+        while sum(len(c) for c in comments) < large_kb * 1024:
+            comments.append(_COMMENT.format(i=i))
+            i += 1
+        thread = f'<section id="comments">{"".join(comments)}</section>'
+        pages[f"{path.stem} (large)"] = html.replace("</main>", f"</main>{thread}").encode("utf-8")
+    return pages
+
+
+def legacy_extract(data: bytes, max_chars: int) -> str:
+    """The previous fetch_article_text body, minus the network."""
+    soup = BeautifulSoup(data.decode("utf-8", errors="ignore"), "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
+        tag.decompose()
+    main = (soup.find("article") or soup.find("main")
+            or soup.find(class_=re.compile(r"(article|post|content|entry)")))
+    text = (main or soup).get_text(separator="\n", strip=True)
+    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n[...truncated]"
+    return text
+
+
+def new_extract(data: bytes, max_chars: int) -> str:
+    chunks = (data[i:i + page_extract.CHUNK_SIZE] for i in range(0, len(data), page_extract.CHUNK_SIZE))
+    return page_extract.extract(chunks, max_chars=max_chars)
+
+
+def first_paragraph(data: bytes) -> str:
+    m = re.search(rb"<article[^>]*>.*?<p(?: [^>]*)?>(?!Fixture)(.*?)</p>", data, re.S)
+    return m.group(1).decode("utf-8")[:40] if m else ""
+
+
+def measure(func, data: bytes, max_chars: int, iterations: int) -> tuple[float, float, str]:
+    """Return (median ms, peak MiB, output) for `func` on one page."""
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        text = func(data, max_chars)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    func(data, max_chars)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return statistics.median(times), peak, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main-content extraction")
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--max-chars", type=int, default=5000)
+    parser.add_argument("--large-kb", type=int, default=1500, help="Size of the padded pages")
+    args = parser.parse_args()
+
+    extractors = {"page_extract": new_extract}
+    if BeautifulSoup is not None:
+        extractors["bs4 (old)"] = legacy_extract
+    else:
+        print("beautifulsoup4 not installed; only timing page_extract", file=sys.stderr)
+    print(f"parser backend: {'lxml' if page_extract.etree is not None else 'html.parser'}\n")
+
+    print(f"{'page':<34} {'KB':>6} {'extractor':<13} {'ms p50':>8} {'peak MiB':>9} {'chars':>6}  main")
+    totals = {name: 0.0 for name in extractors}
+    for name, data in load_pages(args.large_kb).items():
+        expected = first_paragraph(data)
+        for extractor, func in extractors.items():
+            ms, peak, text = measure(func, data, args.max_chars, args.iterations)
+            totals[extractor] += ms
+            found = "yes" if expected and expected in text else "NO"
+            print(f"{name:<34} {len(data) / 1024:6.0f} {extractor:<13} {ms:8.2f} {peak:9.2f} "
+                  f"{len(text):6}  {found}")
+    print()
+    for extractor, total in totals.items():
+        print(f"{extractor:<13} total {total:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
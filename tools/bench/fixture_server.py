@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Fixture Server - Serve recorded RSS feeds, article pages and search results.
+
+Serves files from bench/fixtures/ so discovery, web search and page fetches
+run their real network and parsing code without touching the internet:
+
+  /feeds/<name>.xml    RSS fixtures
+  /pages/<name>.html   Article pages linked from the feeds
+  /search?q=...        DuckDuckGo-style HTML results (fixtures/search.html)
+
+Feeds and pages are templates: `{base}` becomes the server's base URL and
+`{hours_ago:N}` an RFC 822 date N hours before now, so recency scoring
+behaves the same on every run. `latency_ms` delays every response.
+
+Usage:
+  python fixture_server.py --port 8765
+  curl http://127.0.0.1:8765/feeds/tech_en.xml
+"""
+
+import argparse
+import re
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+_HOURS_AGO = re.compile(r"\{hours_ago:(\d+(?:\.\d+)?)\}")
+_CONTENT_TYPES = {".xml": "application/rss+xml", ".html": "text/html; charset=utf-8"}
+
+
+class FixtureServer:
+    """Threaded static server for the fixture tree."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 root: Path = FIXTURES_DIR):
+        self.root = root
+        self.latency_ms = latency_ms
+        self.hits: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def feed_urls(self) -> dict[str, str]:
+        """{fixture feed name: URL} for every feed fixture."""
+        return {p.stem: f"{self.url}/feeds/{p.name}"
+                for p in sorted((self.root / "feeds").glob("*.xml"))}
+
+    def render(self, path: Path) -> bytes:
+        now = datetime.now(tz=timezone.utc)
+        text = path.read_text(encoding="utf-8").replace("{base}", self.url)
+        text = _HOURS_AGO.sub(
+            lambda m: format_datetime(now - timedelta(hours=float(m.group(1)))), text)
+        return text.encode("utf-8")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                with server._lock:
+                    server.hits[parsed.path] = server.hits.get(parsed.path, 0) + 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+
+                if parsed.path == "/search" or parsed.path.startswith("/html"):
+                    path = server.root / "search.html"
+                else:
+                    path = (server.root / parsed.path.lstrip("/")).resolve()
+                    if server.root.resolve() not in path.parents:
+                        path = None
+                if path is None or not path.is_file():
+                    self.send_error(404)
+                    return
+
+                body = server.render(path)
+                self.send_response(200)
+                self.send_header("Content-Type", _CONTENT_TYPES.get(path.suffix, "text/plain"))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve benchmark fixtures over HTTP")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency_ms=args.latency_ms).start()
+    print(f"Serving {FIXTURES_DIR} on {server.url} (Ctrl-C to stop)")
+    for name, url in server.feed_urls().items():
+        print(f"  {name}: {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
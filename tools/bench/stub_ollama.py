@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Stub Ollama - Local stand-in for the Ollama HTTP API used by the benchmarks.
+
+Answers /api/generate (streaming and not) with recorded responses at a
+configurable speed, and reports the same counters real Ollama does
+(eval_count, eval_duration, prompt_eval_duration, load_duration, ...), so
+the client, streaming reader, metrics and parsers all run their real code.
+
+Responses are chosen by:
+  1. an exact replay from an LLM cache directory (--replay, see llm_cache.py),
+     keyed by the same request hash the client uses
+  2. otherwise the first entry in fixtures/responses.json whose "match"
+     string occurs in the system prompt + prompt
+
+Like Ollama's KV cache, each model remembers its previous prompt and only
+evaluates the tokens after the prefix it shares with it, so
+prompt_eval_count shows the effect of reusing a fixed system prompt.
+
+Usage:
+  python stub_ollama.py --port 11435 --token-rate 50 --first-token-ms 300
+  OLLAMA_HOST=http://127.0.0.1:11435 python ../generate.py "keyword"
+
+  from stub_ollama import StubOllama
+  stub = StubOllama(token_rate=0).start()   # token_rate 0: no delay
+  ...
+  stub.stop()
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from llm_cache import LLMCache  # noqa: E402
+
+RESPONSES_FILE = BENCH_DIR / "fixtures" / "responses.json"
+
+# Rough tokenizer: words, CJK characters and punctuation each count as one token
+_TOKEN = re.compile(r"\s*(?:[A-Za-z0-9_]+|[\u3040-\u30ff\u3400-\u9fff]|\S)")
+
+
+def split_tokens(text: str) -> list[str]:
+    """Split text into token-sized pieces that concatenate back to `text`."""
+    pieces = _TOKEN.findall(text)
+    consumed = sum(len(p) for p in pieces)
+    if consumed < len(text):
+        pieces.append(text[consumed:])
+    return pieces
+
+
+def full_prompt(payload: dict) -> str:
+    """System prompt followed by the prompt, the order Ollama's templates use."""
+    system = payload.get("system", "")
+    return f"{system}\n{payload.get('prompt', '')}" if system else payload.get("prompt", "")
+
+
+class StubOllama:
+    """Threaded stub server; durations are simulated with real sleeps."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_rate: float = 0,
+                 first_token_ms: float = 0, load_ms: float = 0,
+                 prompt_rate: float = 0, replay_dir: Path | None = None,
+                 responses_file: Path = RESPONSES_FILE):
+        self.token_rate = token_rate          # generated tokens/s (0 = instant)
+        self.first_token_ms = first_token_ms  # extra latency before the first token
+        self.load_ms = load_ms                # charged once per model, like a cold load
+        self.prompt_rate = prompt_rate        # prompt tokens/s (0 = instant)
+        self.replay = LLMCache(replay_dir) if replay_dir else None
+        self.responses = json.loads(responses_file.read_text(encoding="utf-8"))
+        self.loaded: set[str] = set()
+        self.last_prompt: dict[str, list[str]] = {}  # per model, for prefix reuse
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # -- behaviour -------------------------------------------------------
+
+    def pick_response(self, payload: dict) -> str:
+        if self.replay:
+            cached = self.replay.get(payload)
+            if cached is not None:
+                return cached
+        prompt = full_prompt(payload)
+        for entry in self.responses:
+            if entry.get("match", "") in prompt:
+                return entry["response"]
+        return self.responses[-1]["response"]
+
+    def timings(self, model: str, prompt: str) -> dict:
+        """Sleep for model load and prompt evaluation; return their durations in ns.
+
+        Only tokens after the prefix shared with the model's previous prompt
+        are evaluated (at least one, as in Ollama).
+        """
+        tokens = split_tokens(prompt)
+        with self._lock:
+            self.requests += 1
+            cold = model not in self.loaded
+            self.loaded.add(model)
+            previous = self.last_prompt.get(model, [])
+            self.last_prompt[model] = tokens
+        shared = 0
+        for a, b in zip(previous, tokens):
+            if a != b:
+                break
+            shared += 1
+        load = self.load_ms / 1000 if cold else 0.0
+        prompt_tokens = max(1, len(tokens) - shared) if tokens else 0
+        prompt_eval = prompt_tokens / self.prompt_rate if self.prompt_rate else 0.0
+        time.sleep(load + prompt_eval + self.first_token_ms / 1000)
+        return {"load_duration": int(load * 1e9), "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(prompt_eval * 1e9)}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, obj: dict, status: int = 200) -> None:
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, obj: dict) -> None:
+                data = (json.dumps(obj) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/generate":
+                    self._send_json({"error": f"unsupported path {self.path}"}, status=404)
+                    return
+                model = payload.get("model", "stub")
+                start = time.perf_counter()
+                counters = stub.timings(model, full_prompt(payload))
+                if not payload.get("prompt"):
+                    # Prewarm / unload request
+                    self._send_json({"model": model, "response": "", "done": True, **counters})
+                    return
+
+                text = stub.pick_response(payload)
+                tokens = split_tokens(text)
+                delay = 1 / stub.token_rate if stub.token_rate else 0.0
+                eval_start = time.perf_counter()
+                final = {"model": model, "response": "", "done": True, "done_reason": "stop",
+                         **counters, "eval_count": len(tokens)}
+
+                if not payload.get("stream", True):
+                    time.sleep(delay * len(tokens))
+                    final["eval_duration"] = int((time.perf_counter() - eval_start) * 1e9)
+                    final["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                    self._send_json({**final, "response": text})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for piece in tokens:
+                        if delay:
+                            time.sleep(delay)
+                        self._write_chunk({"model": model, "response": piece, "done": False})
+                    final["eval_duration"] = int((time.perf_counter() - eval_start) * 1e9)
+                    final["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                    self._write_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client hung up early (e.g. the JSON object closed)
+                    self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub Ollama server")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-rate", type=float, default=50, help="Generated tokens/s (0 = instant)")
+    parser.add_argument("--prompt-rate", type=float, default=0, help="Prompt tokens/s (0 = instant)")
+    parser.add_argument("--first-token-ms", type=float, default=0)
+    parser.add_argument("--load-ms", type=float, default=0, help="One-off model load time")
+    parser.add_argument("--replay", type=Path, help="Replay responses from this LLM cache directory")
+    args = parser.parse_args()
+
+    stub = StubOllama(port=args.port, token_rate=args.token_rate, prompt_rate=args.prompt_rate,
+                      first_token_ms=args.first_token_ms, load_ms=args.load_ms,
+                      replay_dir=args.replay).start()
+    print(f"Stub Ollama listening on {stub.url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Content Index - Persistent index of published articles' front matter.
+
+Keeps one record per content/**/*.md file (slug, title, lang, category,
+date, tags, mtime, size) in tools/cache/content_index.json. `refresh()`
+only stats files and re-reads the front matter of files whose mtime or
+size changed; the generators call `record_article()` after writing, so
+slug existence checks are set lookups instead of a full content scan.
+
+Usage:
+  python content_index.py             # Refresh and print index stats
+  python content_index.py --rebuild   # Re-read every file's front matter
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+BLOG_ROOT = TOOLS_DIR.parent
+CONTENT_DIR = BLOG_ROOT / "content"
+INDEX_FILE = TOOLS_DIR / "cache" / "content_index.json"
+
+INDEX_VERSION = 1
+FRONT_MATTER_KEYS = ("title", "date", "description", "slug", "tags", "categories", "type", "translationKey")
+
+
+def _parse_value(raw: str):
+    raw = raw.strip()
+    if raw.startswith("["):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return [v.strip().strip('"') for v in raw.strip("[]").split(",") if v.strip()]
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        return raw[1:-1]
+    return raw
+
+
+def read_front_matter(path: Path) -> dict:
+    """Read only the leading `---` block of a Markdown file (top-level keys)."""
+    meta = {}
+    with open(path, encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return meta
+        for line in f:
+            if line.strip() == "---":
+                break
+            if line[:1].isspace() or ":" not in line:
+                continue  # nested keys (cover.image, ...) are not indexed
+            key, _, value = line.partition(":")
+            key = key.strip()
+            if key in FRONT_MATTER_KEYS:
+                meta[key] = _parse_value(value)
+    return meta
+
+
+class ContentIndex:
+    """Front-matter index of content/ keyed by path relative to CONTENT_DIR."""
+
+    def __init__(self, path: Path = INDEX_FILE, content_dir: Path = CONTENT_DIR):
+        self.path = path
+        self.content_dir = content_dir
+        self.articles: dict[str, dict] = {}
+        self.slugs: set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.articles = data.get("articles", {})
+            self._rebuild_slugs()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "articles": self.articles},
+                                  ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def _rebuild_slugs(self) -> None:
+        slugs = set()
+        for rel, rec in self.articles.items():
+            slugs.add(Path(rel).stem.lower())
+            if rec.get("slug"):
+                slugs.add(rec["slug"].lower())
+        self.slugs = slugs
+
+    def _make_record(self, path: Path, stat: os.stat_result) -> dict:
+        rel_parts = path.relative_to(self.content_dir).parts
+        try:
+            meta = read_front_matter(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"  Index: could not read {path}: {e}", file=sys.stderr)
+            meta = {}
+        return {
+            "slug": str(meta.get("slug", "")).strip(),
+            "title": meta.get("title", ""),
+            "lang": rel_parts[0] if len(rel_parts) > 1 else None,
+            "category": rel_parts[1] if len(rel_parts) > 2 else None,
+            "date": meta.get("date"),
+            "tags": meta.get("tags", []),
+            "type": meta.get("type"),
+            "translation_key": meta.get("translationKey"),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+
+    def refresh(self, rebuild: bool = False) -> tuple[int, int]:
+        """Sync with the filesystem; return (updated, removed) record counts."""
+        with self._lock:
+            seen = set()
+            updated = 0
+            for root, _dirs, files in os.walk(self.content_dir):
+                for name in files:
+                    if not name.endswith(".md"):
+                        continue
+                    path = Path(root) / name
+                    rel = path.relative_to(self.content_dir).as_posix()
+                    seen.add(rel)
+                    stat = path.stat()
+                    rec = self.articles.get(rel)
+                    if (rebuild or rec is None or rec["mtime"] != stat.st_mtime
+                            or rec["size"] != stat.st_size):
+                        self.articles[rel] = self._make_record(path, stat)
+                        updated += 1
+
+            removed = [rel for rel in self.articles if rel not in seen]
+            for rel in removed:
+                del self.articles[rel]
+
+            if updated or removed:
+                self._rebuild_slugs()
+                self.save()
+        return updated, len(removed)
+
+    def record(self, path: Path) -> dict:
+        """Add or update one file (called by the generators after writing)."""
+        path = Path(path)
+        with self._lock:
+            rec = self._make_record(path, path.stat())
+            self.articles[path.relative_to(self.content_dir).as_posix()] = rec
+            self.slugs.add(path.stem.lower())
+            if rec["slug"]:
+                self.slugs.add(rec["slug"].lower())
+            self.save()
+        return rec
+
+    def has_slug(self, slug: str) -> bool:
+        return slug.lower() in self.slugs
+
+
+_index: ContentIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index(refresh: bool = True) -> ContentIndex:
+    """Return the process-wide index, refreshed against content/ on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ContentIndex()
+            if refresh:
+                _index.refresh()
+        return _index
+
+
+def record_article(path: Path) -> None:
+    """Add a freshly written article to the index; never fails the caller."""
+    try:
+        get_index(refresh=False).record(path)
+    except Exception as e:
+        print(f"  Index update failed for {path}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the content front-matter index")
+    parser.add_argument("--rebuild", action="store_true", help="Re-read every file, ignoring mtimes")
+    args = parser.parse_args()
+
+    index = ContentIndex()
+    updated, removed = index.refresh(rebuild=args.rebuild)
+    langs = {}
+    for rec in index.articles.values():
+        langs[rec["lang"]] = langs.get(rec["lang"], 0) + 1
+    print(f"Indexed {len(index.articles)} files ({updated} updated, {removed} removed), "
+          f"{len(index.slugs)} slugs")
+    for lang, count in sorted(langs.items(), key=lambda x: str(x[0])):
+        print(f"  {lang}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Feed Store - Shared feed snapshot with concurrent, conditional fetching.
+
+Each feed is fetched on a worker thread with its own timeout. The ETag and
+Last-Modified headers from the previous fetch are sent back, so an
+unchanged feed answers 304 and its entries are served from the local
+store (tools/cache/feeds/). Entries are normalized to plain dicts:
+
+  {"title", "summary", "link", "published"}   # published: ISO 8601 or None
+
+`snapshot()` is what consumers should call: a feed checked within the
+freshness window (settings.snapshot_max_age_minutes in feeds.json) is
+served from the store without any network I/O, so topic discovery and news
+summarization in the same run share one download of every feed.
+
+Usage:
+  python feed_store.py                # Print the current snapshot
+  python feed_store.py --refresh      # Force a re-check of every feed
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import feedparser
+except ImportError:
+    print("Error: feedparser not installed. Run: pip install --user feedparser", file=sys.stderr)
+    sys.exit(1)
+
+from metrics import timed
+from rate_limit import acquire
+
+TOOLS_DIR = Path(__file__).resolve().parent
+CONFIG_DIR = TOOLS_DIR / "config"
+FEEDS_CONFIG = CONFIG_DIR / "feeds.json"
+FEED_CACHE_DIR = TOOLS_DIR / "cache" / "feeds"
+
+USER_AGENT = "Mozilla/5.0 (compatible; BlogBot/1.0)"
+MAX_STORED_ENTRIES = 30
+
+
+def _store_path(url: str) -> Path:
+    return FEED_CACHE_DIR / f"{hashlib.sha1(url.encode()).hexdigest()[:16]}.json"
+
+
+def load_stored(url: str) -> dict | None:
+    """Return the stored snapshot for a feed URL, if any."""
+    try:
+        return json.loads(_store_path(url).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _save_stored(url: str, record: dict) -> None:
+    FEED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _store_path(url)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _entry_date(entry) -> str | None:
+    for attr in ("published_parsed", "updated_parsed"):
+        parsed = entry.get(attr)
+        if parsed:
+            try:
+                return datetime(*parsed[:6], tzinfo=timezone.utc).isoformat()
+            except Exception:
+                pass
+    return None
+
+
+def normalize_entries(parsed) -> list[dict]:
+    """Convert feedparser entries into JSON-serializable dicts."""
+    entries = []
+    for entry in parsed.entries[:MAX_STORED_ENTRIES]:
+        entries.append({
+            "title": entry.get("title", ""),
+            "summary": entry.get("summary", ""),
+            "link": entry.get("link", ""),
+            "published": _entry_date(entry),
+        })
+    return entries
+
+
+def fetch_entries(feed_config: dict, timeout: float = 15) -> list[dict]:
+    """Fetch one feed with a conditional GET and return its normalized entries.
+
+    A 304 or a network failure falls back to the stored entries.
+    """
+    name = feed_config["name"]
+    url = feed_config["url"]
+    stored = load_stored(url)
+
+    headers = {"User-Agent": USER_AGENT}
+    if stored and stored.get("etag"):
+        headers["If-None-Match"] = stored["etag"]
+    if stored and stored.get("last_modified"):
+        headers["If-Modified-Since"] = stored["last_modified"]
+
+    start = time.time()
+    with timed("feed.fetch", feed=name) as m:
+        try:
+            acquire(url)
+            req = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                body = resp.read()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            m["status"] = e.code
+            if e.code == 304 and stored:
+                print(f"  Not modified: {name} ({time.time() - start:.1f}s)", file=sys.stderr)
+                _save_stored(url, {**stored, "fetched_at": time.time()})
+                return stored["entries"]
+            m["ok"] = False
+            m["error"] = f"HTTP {e.code}"
+            print(f"  Failed to fetch {name}: HTTP {e.code}", file=sys.stderr)
+            return stored["entries"] if stored else []
+        except Exception as e:
+            m["status"] = "error"
+            m["ok"] = False
+            m["error"] = f"{type(e).__name__}: {e}"[:200]
+            print(f"  Failed to fetch {name}: {e}", file=sys.stderr)
+            return stored["entries"] if stored else []
+
+        m["status"] = 200
+        m["bytes"] = len(body)
+        parsed = feedparser.parse(body)
+        if parsed.bozo and not parsed.entries:
+            m["ok"] = False
+            m["error"] = f"no entries: {parsed.bozo_exception}"[:200]
+            print(f"  Warning: {name} returned no entries (bozo={parsed.bozo_exception})", file=sys.stderr)
+            return stored["entries"] if stored else []
+
+        entries = normalize_entries(parsed)
+        m["entries"] = len(entries)
+        _save_stored(url, {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "entries": entries,
+        })
+    print(f"  Fetched: {name} ({len(entries)} entries, {time.time() - start:.1f}s)", file=sys.stderr)
+    return entries
+
+
+def fetch_all(feed_configs: list[dict], max_workers: int = 8,
+              timeout: float = 15) -> dict[str, list[dict]]:
+    """Fetch feeds concurrently; return {feed name: entries} in config order."""
+    if not feed_configs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(feed_configs))) as pool:
+        futures = [pool.submit(fetch_entries, fc, timeout) for fc in feed_configs]
+        return {fc["name"]: f.result() for fc, f in zip(feed_configs, futures)}
+
+
+def load_feeds_config() -> dict:
+    """Load RSS feed configuration."""
+    with open(FEEDS_CONFIG, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def snapshot(feed_configs: list[dict] | None = None, max_age: float | None = None,
+             max_workers: int | None = None, timeout: float | None = None) -> dict[str, list[dict]]:
+    """Return {feed name: entries}, fetching only feeds older than `max_age` seconds.
+
+    Defaults come from the `settings` block of feeds.json.
+    """
+    config = load_feeds_config()
+    settings = config.get("settings", {})
+    if feed_configs is None:
+        feed_configs = config["feeds"]
+    if max_age is None:
+        max_age = settings.get("snapshot_max_age_minutes", 30) * 60
+    if max_workers is None:
+        max_workers = settings.get("fetch_workers", 8)
+    if timeout is None:
+        timeout = settings.get("fetch_timeout_seconds", 15)
+
+    now = time.time()
+    result: dict[str, list[dict]] = {}
+    stale = []
+    for fc in feed_configs:
+        stored = load_stored(fc["url"])
+        if stored and now - stored.get("fetched_at", 0) <= max_age:
+            result[fc["name"]] = stored["entries"]
+        else:
+            stale.append(fc)
+
+    if len(stale) < len(feed_configs):
+        print(f"  Feed snapshot: {len(feed_configs) - len(stale)} fresh, "
+              f"{len(stale)} to fetch", file=sys.stderr)
+    result.update(fetch_all(stale, max_workers=max_workers, timeout=timeout))
+    return {fc["name"]: result.get(fc["name"], []) for fc in feed_configs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch all configured feeds into the shared snapshot")
+    parser.add_argument("--refresh", action="store_true", help="Re-check every feed regardless of age")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = snapshot(max_age=0 if args.refresh else None)
+    for name, entries in results.items():
+        print(f"{len(entries):>4}  {name}")
+    print(f"Fetched {len(results)} feeds in {time.time() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
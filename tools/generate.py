@@ -6,23 +6,64 @@ Generates SEO-optimized blog articles using local Ollama LLM.
 Usage:
   python generate.py --keyword "ローカルLLMの始め方" --lang ja --category ai
   python generate.py --keyword "How to fine-tune LLMs" --lang en --category ai
+  python generate.py --keyword "RAGの仕組み" --lang ja+en   # Japanese article + English translation
   python generate.py --batch keywords.txt
+  python generate.py --batch keywords.txt --search-workers 2 --llm-workers 2
+  python generate.py --batch keywords.txt --fresh   # Ignore progress from a previous run
+  python generate.py --batch keywords.txt --no-prefix-reuse   # A/B: old single-prompt layout
+  python generate.py --batch keywords.txt --bilingual   # Every line also in the other language
+  python generate.py --keyword "RAGの仕組み" --sections  # Outline first, then sections in parallel
+
+Bilingual jobs (lang "ja+en" or "en+ja", first one primary) generate the
+primary article once and derive the other language with a translation
+pass (no second web search); both files share a Hugo translationKey.
+
+With --sections, one short request writes the outline (title, description,
+tags, 4-6 headings) and each section is then its own request, up to
+--section-workers at a time. The article model's max_concurrent in
+config/models.json and the server's OLLAMA_NUM_PARALLEL must both allow
+that many to actually overlap. A failed section is retried alone, and
+finished sections are kept in the job ledger for a rerun.
 """
 
 import argparse
 import html
 import json
+import os
 import re
 import subprocess
 import sys
+import threading
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
-OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
-MODEL = "llama3.3:70b-instruct-q4_K_M"
+from batch_pipeline import Pipeline, Stage
+from content_index import record_article
+from job_ledger import JobLedger, job_key, reached, written_path
+from json_extract import extract, extract_json
+from metrics import emit, timed
+from model_router import get_router
+from ollama_client import get_client
+from rate_limit import acquire
+from search_cache import get_search_cache
+from token_budget import ContextBudget
+
 SEARCH_ENABLED = True
+SEARCH_CACHE_ENABLED = True
+STREAM_ENABLED = False
+STALL_TIMEOUT = 60  # seconds without a token before a streamed generation is aborted
+SEARCH_URL = "https://html.duckduckgo.com/html/?q={query}"
+PREFIX_REUSE = True  # send the fixed instructions as a shared system prompt
+ARTICLE_PREDICT = 6144  # num_predict of article calls; also kept free in the context window
+SECTIONED = False  # outline first, then each section as its own request
+SECTION_WORKERS = int(os.environ.get("OLLAMA_NUM_PARALLEL", 1))
+SECTION_RETRIES = 1
+MAX_SECTIONS = 6
+OUTLINE_PREDICT = 1024
+SECTION_PREDICT = 1536
 BLOG_ROOT = Path(__file__).resolve().parent.parent
 CONTENT_DIR = BLOG_ROOT / "content"
 
@@ -32,21 +73,20 @@ CATEGORIES = {
     "research": {"ja": "研究", "en": "Research"},
 }
 
-PROMPT_JA = """あなたはSEOに精通したテクニカルライターです。以下のキーワードについて、高品質なブログ記事を書いてください。
+# Fixed instructions go first (as the system prompt) so Ollama can reuse
+# their KV cache across a batch; only the task part below differs per keyword.
+SYSTEM_PROMPT_JA = """あなたはSEOに精通したテクニカルライターです。ユーザーが指定するキーワードについて、高品質なブログ記事を書いてください。
 
-キーワード: {keyword}
-カテゴリ: {category}
-{web_context}
 以下のJSON形式で出力してください。他の文言は一切不要です。JSONのみ返してください。
-{{
+{
   "title": "SEOに最適化されたタイトル（60文字以内）",
   "description": "メタディスクリプション（120文字以内）",
   "tags": ["タグ1", "タグ2", "タグ3", "タグ4", "タグ5"],
   "body": "記事本文（マークダウン形式、## 見出しを4-6個使い、各セクション200-400字、合計2000-3000字）"
-}}
+}
 
 記事の要件:
-- 上記のWeb検索結果を参考にして、最新かつ正確な情報を記載する
+- ユーザーが提示するWeb検索結果を参考にして、最新かつ正確な情報を記載する
 - 事実に基づいた正確な情報のみ記載する。確信がない情報は書かないこと
 - ツールやライブラリの開発元・所属は正確に記載する（例：OllamaはOllama社のOSS、LlamaはMeta開発）
 - 読者にとって実用的で具体的な内容にする
@@ -57,21 +97,18 @@ PROMPT_JA = """あなたはSEOに精通したテクニカルライターです
 - 架空の情報や不確かな統計データを含めないこと
 """
 
-PROMPT_EN = """You are a technical writer with SEO expertise. Write a high-quality blog article about the following keyword.
+SYSTEM_PROMPT_EN = """You are a technical writer with SEO expertise. Write a high-quality blog article about the keyword given by the user.
 
-Keyword: {keyword}
-Category: {category}
-{web_context}
 Output ONLY in the following JSON format. No other text.
-{{
+{
   "title": "SEO-optimized title (under 60 characters)",
   "description": "Meta description (under 160 characters)",
   "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
   "body": "Article body in Markdown format, use 4-6 ## headings, 150-300 words per section, 1500-2500 words total"
-}}
+}
 
 Article requirements:
-- Use the web search results above as reference for current and accurate information
+- Use the web search results provided by the user as reference for current and accurate information
 - Only include factually accurate information. Do not fabricate details
 - Accurately attribute tools/libraries to their correct creators (e.g., Ollama is by Ollama Inc, Llama by Meta)
 - Practical and specific content for readers
@@ -82,119 +119,216 @@ Article requirements:
 - Do not include made-up statistics or unverified claims
 """
 
+TASK_PROMPT_JA = """キーワード: {keyword}
+カテゴリ: {category}
+{web_context}"""
 
-def web_search(query: str, num_results: int = 5) -> str:
-    """Search DuckDuckGo and return a summary of results."""
-    try:
-        encoded = urllib.parse.quote(query)
-        url = f"https://html.duckduckgo.com/html/?q={encoded}"
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "Mozilla/5.0 (compatible; BlogBot/1.0)"
-        })
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
-
-        # Extract result snippets from DDG HTML
-        results = []
-        # Find result blocks
-        snippets = re.findall(
-            r'class="result__snippet"[^>]*>(.*?)</[^>]+>',
-            raw, re.DOTALL
-        )
-        titles = re.findall(
-            r'class="result__a"[^>]*>(.*?)</a>',
-            raw, re.DOTALL
-        )
+TASK_PROMPT_EN = """Keyword: {keyword}
+Category: {category}
+{web_context}"""
 
-        for i in range(min(num_results, len(snippets))):
-            title = re.sub(r'<[^>]+>', '', titles[i]) if i < len(titles) else ""
-            snippet = re.sub(r'<[^>]+>', '', snippets[i])
-            title = html.unescape(title).strip()
-            snippet = html.unescape(snippet).strip()
-            if title or snippet:
-                results.append(f"- {title}: {snippet}")
+# Sectioned mode: an outline request, then one request per section. Both
+# system prompts are fixed and the section prompt only differs at its end,
+# so the sections of one article share the whole prefix in Ollama's cache.
+OUTLINE_SYSTEM = {
+    "ja": """あなたはSEOに精通したテクニカルライターです。ユーザーが指定するキーワードについて、ブログ記事の構成案を作成してください。
 
-        return "\n".join(results) if results else "No search results found."
-    except Exception as e:
-        print(f"  Web search failed: {e}", file=sys.stderr)
-        return "Web search unavailable."
+以下のJSON形式で出力してください。他の文言は一切不要です。JSONのみ返してください。
+{
+  "title": "SEOに最適化されたタイトル（60文字以内）",
+  "description": "メタディスクリプション（120文字以内）",
+  "tags": ["タグ1", "タグ2", "タグ3", "タグ4", "タグ5"],
+  "sections": [
+    {"heading": "見出し", "points": "このセクションで扱う内容（1-2文）"}
+  ]
+}
 
+構成の要件:
+- sectionsは4-6個、最後は「まとめ」
+- ユーザーが提示するWeb検索結果を参考にして、最新かつ正確な情報に基づく構成にする
+- セクション同士で内容が重複しないようにする
+- 読者にとって実用的で具体的な内容にする
+""",
+    "en": """You are a technical writer with SEO expertise. Plan the outline of a blog article about the keyword given by the user.
 
-def call_ollama(prompt: str) -> str:
-    data = json.dumps({
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"num_predict": 8192, "temperature": 0.7},
-    }).encode()
+Output ONLY in the following JSON format. No other text.
+{
+  "title": "SEO-optimized title (under 60 characters)",
+  "description": "Meta description (under 160 characters)",
+  "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
+  "sections": [
+    {"heading": "Section heading", "points": "What this section covers (1-2 sentences)"}
+  ]
+}
+
+Outline requirements:
+- 4-6 sections, the last one a "Conclusion"
+- Base the outline on the web search results provided by the user for current and accurate information
+- Sections must not overlap in content
+- Practical and specific content for readers
+""",
+}
 
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=data,
-        headers={"Content-Type": "application/json"},
+SECTION_SYSTEM = {
+    "ja": """あなたはSEOに精通したテクニカルライターです。ユーザーが提示するキーワード、Web検索結果、記事の構成案をもとに、指定された1つのセクションの本文を書いてください。
+
+要件:
+- 200-400字、マークダウン形式で本文のみを返す。セクションの見出し（##）は書かない。必要なら ### の小見出しを使ってよい
+- 指定されたセクションの内容だけを書き、他のセクションの内容は書かない
+- 事実に基づいた正確な情報のみ記載する。確信がない情報は書かないこと
+- ツールやライブラリの開発元・所属は正確に記載する（例：OllamaはOllama社のOSS、LlamaはMeta開発）
+- 専門用語には簡潔な説明を加える
+- コード例やコマンド例がある場合はコードブロックで記載
+- 自然な日本語で書く
+- 架空の情報や不確かな統計データを含めないこと
+""",
+    "en": """You are a technical writer with SEO expertise. Using the keyword, web search results and article outline provided by the user, write the body of the one section they ask for.
+
+Requirements:
+- 150-300 words of Markdown; return the body only, without the section's ## heading. ### subheadings are fine
+- Cover only this section; leave the other sections' topics to them
+- Only include factually accurate information. Do not fabricate details
+- Accurately attribute tools/libraries to their correct creators (e.g., Ollama is by Ollama Inc, Llama by Meta)
+- Include brief explanations for technical terms
+- Use code blocks for code/command examples where applicable
+- Write in natural, engaging English
+- Do not include made-up statistics or unverified claims
+""",
+}
+
+SECTION_PROMPT = {
+    "ja": """
+記事タイトル: {title}
+構成案:
+{outline}
+
+次のセクションの本文を書いてください: {number}. {heading}
+内容: {points}""",
+    "en": """
+Article title: {title}
+Outline:
+{outline}
+
+Write the body of this section: {number}. {heading}
+Covers: {points}""",
+}
+
+# Translation pass for bilingual jobs, keyed by target language
+TRANSLATE_PROMPTS = {
+    "en": """You are a professional technical translator. Translate the Japanese blog article provided by the user (a JSON object) into natural, engaging English for an English-speaking technical audience.
+
+Rules:
+- Keep the same JSON keys: title, description, tags, body
+- Keep the Markdown structure, code blocks, commands and URLs unchanged
+- Adapt the title (under 60 characters) and description (under 160 characters) for English SEO instead of translating word for word
+- Translate the tags
+- Replace the 「まとめ」 heading with "Conclusion"
+
+Output ONLY the translated JSON object. No other text.
+""",
+    "ja": """あなたはプロの技術翻訳者です。ユーザーが提示する英語のブログ記事（JSONオブジェクト）を、日本の技術者向けの自然な日本語に翻訳してください。
+
+ルール:
+- JSONのキー（title, description, tags, body）はそのまま使う
+- マークダウンの構造、コードブロック、コマンド、URLは変更しない
+- タイトル（60文字以内）とメタディスクリプション（120文字以内）は直訳せず、日本語のSEOに合わせて調整する
+- タグも翻訳する
+- 「Conclusion」の見出しは「まとめ」にする
+
+翻訳したJSONのみ返してください。他の文言は一切不要です。
+""",
+}
+
+# Title-only retry when a response parsed without a title (routed to the "title" model)
+TITLE_PROMPT_JA = """次の記事に、SEOに最適化されたタイトルを1つ付けてください（60文字以内）。タイトルだけを1行で返してください。
+
+キーワード: {keyword}
+
+{body}"""
+
+TITLE_PROMPT_EN = """Write one SEO-optimized title (under 60 characters) for the article below. Reply with the title only, on one line.
+
+Keyword: {keyword}
+
+{body}"""
+
+
+def fetch_search_results(query: str, num_results: int = 5) -> list[str]:
+    """Query DuckDuckGo's HTML endpoint and return formatted result lines."""
+    url = SEARCH_URL.format(query=urllib.parse.quote(query))
+    req = urllib.request.Request(url, headers={
+        "User-Agent": "Mozilla/5.0 (compatible; BlogBot/1.0)"
+    })
+    acquire(url)
+    with urllib.request.urlopen(req, timeout=15) as resp:
+        raw = resp.read().decode("utf-8", errors="ignore")
+
+    # Extract result snippets from DDG HTML
+    results = []
+    # Find result blocks
+    snippets = re.findall(
+        r'class="result__snippet"[^>]*>(.*?)</[^>]+>',
+        raw, re.DOTALL
     )
+    titles = re.findall(
+        r'class="result__a"[^>]*>(.*?)</a>',
+        raw, re.DOTALL
+    )
+
+    for i in range(min(num_results, len(snippets))):
+        title = re.sub(r'<[^>]+>', '', titles[i]) if i < len(titles) else ""
+        snippet = re.sub(r'<[^>]+>', '', snippets[i])
+        title = html.unescape(title).strip()
+        snippet = html.unescape(snippet).strip()
+        if title or snippet:
+            results.append(f"- {title}: {snippet}")
+    return results
+
+
+def web_search(query: str, num_results: int = 5) -> str:
+    """Search DuckDuckGo and return a summary of results (cached on disk)."""
+    cache = get_search_cache() if SEARCH_CACHE_ENABLED else None
+    if cache:
+        cached = cache.get(query, num_results)
+        if cached is not None:
+            print(f"  Search cache hit: {query}")
+            emit("search", 0.0, query=query, cached=True, results=len(cached))
+            return "\n".join(cached)
 
     try:
-        with urllib.request.urlopen(req, timeout=600) as resp:
-            result = json.loads(resp.read().decode())
-            return result.get("response", "")
+        with timed("search", query=query, cached=False) as m:
+            results = fetch_search_results(query, num_results)
+            m["results"] = len(results)
     except Exception as e:
-        raise RuntimeError(f"Ollama API error: {e}")
+        print(f"  Web search failed: {e}", file=sys.stderr)
+        return "Web search unavailable."
 
+    if not results:
+        return "No search results found."
+    if cache:
+        cache.put(query, num_results, results)
+    return "\n".join(results)
 
-def extract_json(text: str) -> dict:
-    """Extract article fields from LLM response using regex-based extraction.
 
-    More robust than JSON parsing since LLMs often produce invalid JSON
-    (unescaped quotes in code blocks, raw newlines, truncated output).
-    """
-    result = {}
-
-    # Extract title
-    m = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
-    if m:
-        result["title"] = m.group(1)
-
-    # Extract description
-    m = re.search(r'"description"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
-    if m:
-        result["description"] = m.group(1)
-
-    # Extract tags
-    m = re.search(r'"tags"\s*:\s*\[(.*?)\]', text, re.DOTALL)
-    if m:
-        tags_str = m.group(1)
-        result["tags"] = re.findall(r'"((?:[^"\\]|\\.)*)"', tags_str)
-
-    # Extract body - everything after "body": " until the last possible closing
-    m = re.search(r'"body"\s*:\s*"', text)
-    if m:
-        body_start = m.end()
-        # Find the body content - take everything from body_start
-        # and work backwards from the end to find where the body value ends
-        remaining = text[body_start:]
-
-        # Try to find the closing pattern: "\n} or "} at end of response
-        # Work backwards to find the last unescaped quote
-        body = remaining
-        # Remove trailing } and whitespace
-        body = body.rstrip()
-        if body.endswith("}"):
-            body = body[:-1].rstrip()
-        if body.endswith("}"):
-            body = body[:-1].rstrip()
-        # Remove trailing quote if present
-        if body.endswith('"'):
-            body = body[:-1]
-
-        # Unescape JSON string escapes
-        body = body.replace("\\n", "\n").replace("\\t", "\t").replace('\\"', '"').replace("\\\\", "\\")
-        result["body"] = body
-
-    if not result.get("title") and not result.get("body"):
-        raise ValueError(f"Could not extract article fields from response:\n{text[:500]}")
-
-    return result
+def call_ollama(prompt: str, system: str = "", stats: dict | None = None,
+                num_predict: int = ARTICLE_PREDICT, expect_json: bool = True) -> str:
+    if system and not PREFIX_REUSE:
+        # Single-prompt layout: the per-keyword part comes first, so nothing is shared
+        prompt, system = f"{prompt}\n{system}", ""
+    try:
+        return get_router().generate(
+            "article",
+            prompt,
+            options={"num_predict": num_predict, "temperature": 0.7},
+            timeout=600,
+            stream=STREAM_ENABLED,
+            stall_timeout=STALL_TIMEOUT,
+            stats=stats,
+            expect_json=expect_json,
+            **({"system": system} if system else {}),
+        )
+    except Exception as e:
+        raise RuntimeError(f"Ollama API error: {e}")
 
 
 def slugify(text: str) -> str:
@@ -213,8 +347,15 @@ def slugify(text: str) -> str:
         return slug[:80]
 
 
-def generate_article(keyword: str, lang: str, category: str) -> Path:
-    """Generate a single article and save it as a Hugo content file."""
+def system_prompt(lang: str) -> str:
+    return SYSTEM_PROMPT_JA if lang == "ja" else SYSTEM_PROMPT_EN
+
+
+def build_prompt(keyword: str, lang: str, category: str) -> str:
+    """Validate inputs, run the web search and return the per-keyword task prompt.
+
+    The fixed instructions are sent separately, see system_prompt().
+    """
     if category not in CATEGORIES:
         raise ValueError(f"Invalid category: {category}. Use: {', '.join(CATEGORIES.keys())}")
 
@@ -222,29 +363,175 @@ def generate_article(keyword: str, lang: str, category: str) -> Path:
         raise ValueError(f"Invalid language: {lang}. Use: ja, en")
 
     cat_name = CATEGORIES[category][lang]
-    prompt_template = PROMPT_JA if lang == "ja" else PROMPT_EN
+    prompt_template = TASK_PROMPT_JA if lang == "ja" else TASK_PROMPT_EN
 
-    # Web search for real-time context
+    # Web search for real-time context, trimmed (whole results first) to what fits
+    # next to the instructions and the reserved output in the context window
     web_context = ""
     if SEARCH_ENABLED:
         print(f"  Searching web: {keyword} ...")
         search_results = web_search(keyword)
         if search_results and "unavailable" not in search_results.lower():
+            task = prompt_template.format(keyword=keyword, category=cat_name, web_context="")
+            budget = ContextBudget(reserve_output=ARTICLE_PREDICT, model=get_router().primary("article"))
+            search_results = budget.allocate([system_prompt(lang), task],
+                                             {"search": search_results})["search"]
             web_context = f"\n最新のWeb検索結果（参考情報）:\n{search_results}\n" if lang == "ja" \
                 else f"\nRecent web search results (reference):\n{search_results}\n"
 
-    prompt = prompt_template.format(keyword=keyword, category=cat_name, web_context=web_context)
+    return prompt_template.format(keyword=keyword, category=cat_name, web_context=web_context)
 
-    print(f"  Generating: [{lang}] [{category}] {keyword} ...")
-    response = call_ollama(prompt)
 
+def parse_article(response: str) -> dict:
+    """Extract article fields from an LLM response, logging the raw text on failure."""
     try:
-        article = extract_json(response)
+        return extract_json(response)
     except (json.JSONDecodeError, ValueError) as e:
         print(f"  Failed to parse JSON: {e}", file=sys.stderr)
         print(f"  Raw response (first 500 chars):\n{response[:500]}", file=sys.stderr)
+        get_client().forget(response)  # regenerate on the next run instead of replaying it
         raise
 
+
+def retry_title(body: str, keyword: str, lang: str) -> str:
+    """Ask the title model for a title for `body`; return "" if that fails too."""
+    prompt = (TITLE_PROMPT_JA if lang == "ja" else TITLE_PROMPT_EN).format(keyword=keyword, body=body[:2000])
+    try:
+        text = get_router().generate("title", prompt, options={"num_predict": 128, "temperature": 0.3},
+                                     expect_json=False)
+    except Exception as e:
+        print(f"  Title retry failed: {e}", file=sys.stderr)
+        return ""
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    lines = [line.strip().strip('"「」#* ') for line in text.splitlines() if line.strip()]
+    return lines[0][:100] if lines else ""
+
+
+def parse_outline(response: str) -> dict:
+    """Outline fields with 2 to MAX_SECTIONS usable sections; ValueError otherwise."""
+    fields, _ = extract(response)
+    sections = [s for s in fields.get("sections") or []
+                if isinstance(s, dict) and str(s.get("heading", "")).strip()]
+    if len(sections) < 2:
+        raise ValueError(f"outline has {len(sections)} usable sections")
+    tags = fields.get("tags")
+    return {
+        "title": fields.get("title") if isinstance(fields.get("title"), str) else "",
+        "description": fields.get("description") if isinstance(fields.get("description"), str) else "",
+        "tags": [str(t) for t in tags if isinstance(t, (str, int, float))] if isinstance(tags, list) else [],
+        "sections": sections[:MAX_SECTIONS],
+    }
+
+
+def generate_section(job: dict, outline: dict, index: int) -> str:
+    """Write one section's body, retrying it alone up to SECTION_RETRIES times."""
+    lang = job["lang"]
+    section = outline["sections"][index]
+    heading = section["heading"].strip()
+    listing = "\n".join(f"{i + 1}. {s['heading']}: {s.get('points', '')}"
+                        for i, s in enumerate(outline["sections"]))
+    prompt = job["prompt"] + SECTION_PROMPT[lang].format(
+        title=outline.get("title", job["keyword"]), outline=listing, number=index + 1,
+        heading=heading, points=section.get("points", ""))
+    error = ""
+    for attempt in range(SECTION_RETRIES + 1):
+        try:
+            with timed("article.section", keyword=job["keyword"], section=index + 1) as m:
+                text = call_ollama(prompt, SECTION_SYSTEM[lang], num_predict=SECTION_PREDICT,
+                                   expect_json=False)
+                m["chars"] = len(text)
+        except RuntimeError as e:
+            error = str(e)
+        else:
+            text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
+            # Drop the heading if the model repeated it; it is added back on assembly
+            text = re.sub(r"\A#{1,2}\s+[^\n]*\n+", "", text).strip()
+            if text:
+                return text
+            error = "empty response"
+        print(f"  Section {index + 1} failed (attempt {attempt + 1}): {error}", file=sys.stderr)
+    raise RuntimeError(f"section {index + 1} ({heading}): {error}")
+
+
+def generate_sectioned(job: dict, ledger: JobLedger | None = None) -> str:
+    """Outline, then every section as its own request; return the article as JSON.
+
+    The result has the same fields as a single-request response, so parsing,
+    translation and writing are unchanged. An unusable outline falls back to
+    a single request.
+    """
+    lang = job["lang"]
+    record = ledger.get(job["key"]) if ledger else None
+    if record and record.get("outline"):
+        outline_response = record["outline"]
+    else:
+        print(f"  Outlining: [{lang}] [{job['category']}] {job['keyword']} ...")
+        with timed("article.outline", keyword=job["keyword"]):
+            outline_response = call_ollama(job["prompt"], OUTLINE_SYSTEM[lang], num_predict=OUTLINE_PREDICT)
+    try:
+        outline = parse_outline(outline_response)
+    except ValueError as e:
+        print(f"  Outline unusable ({e}), generating in one request", file=sys.stderr)
+        return call_ollama(job["prompt"], system_prompt(lang), job.get("llm_stats"))
+    if ledger:
+        ledger.update(job["key"], "searched", outline=outline_response)
+
+    count = len(outline["sections"])
+    sections = dict((record or {}).get("sections") or {})
+    lock = threading.Lock()
+    if sections:
+        print(f"  Resuming {len(sections)}/{count} sections: {job['keyword']}")
+
+    def write_section(index: int) -> str:
+        if str(index) not in sections:
+            text = generate_section(job, outline, index)
+            with lock:
+                sections[str(index)] = text
+                if ledger:
+                    ledger.update(job["key"], "searched", sections=dict(sections))
+        return sections[str(index)]
+
+    print(f"  Writing {count} sections: {job['keyword']} ...")
+    with ThreadPoolExecutor(max_workers=max(1, min(SECTION_WORKERS, count))) as pool:
+        bodies = list(pool.map(write_section, range(count)))
+
+    body = "\n\n".join(f"## {s['heading'].strip()}\n\n{text}"
+                        for s, text in zip(outline["sections"], bodies))
+    return json.dumps({"title": outline.get("title", ""), "description": outline.get("description", ""),
+                       "tags": outline.get("tags", []), "body": body}, ensure_ascii=False)
+
+
+def parse_langs(lang: str) -> tuple[str, str | None]:
+    """Split "ja+en" into (primary, translation target); "ja" gives ("ja", None)."""
+    primary, _, target = lang.partition("+")
+    if primary not in ("ja", "en") or target not in ("", "ja", "en") or target == primary:
+        raise ValueError(f"Invalid language: {lang}. Use: ja, en, ja+en, en+ja")
+    return primary, target or None
+
+
+def translate_article(article: dict, target: str, stats: dict | None = None) -> str:
+    """Translate parsed article fields into `target`; return the raw LLM response."""
+    source = {k: article.get(k, "") for k in ("title", "description", "tags", "body")}
+    return get_router().generate(
+        "translate",
+        json.dumps(source, ensure_ascii=False, indent=1),
+        system=TRANSLATE_PROMPTS[target],
+        options={"num_predict": 8192, "temperature": 0.3},
+        timeout=600,
+        stream=STREAM_ENABLED,
+        stall_timeout=STALL_TIMEOUT,
+        stats=stats,
+    )
+
+
+def write_article(article: dict, keyword: str, lang: str, category: str,
+                  translation_key: str | None = None) -> Path:
+    """Render parsed article fields as a Hugo content file.
+
+    Files with the same `translation_key` are linked as translations by Hugo.
+    """
+    cat_name = CATEGORIES[category][lang]
+
     title = article.get("title", keyword)
     description = article.get("description", "")
     tags = article.get("tags", [])
@@ -256,17 +543,18 @@ def generate_article(keyword: str, lang: str, category: str) -> Path:
 
     # Map category to cover image
     cover_image = f"/images/covers/{category}.svg"
+    translation_line = f'translationKey: "{translation_key}"\n' if translation_key else ""
 
     front_matter = f"""---
-title: "{title}"
+title: {json.dumps(title, ensure_ascii=False)}
 date: {date}
-description: "{description}"
+description: {json.dumps(description, ensure_ascii=False)}
 tags: {json.dumps(tags, ensure_ascii=False)}
 categories: ["{cat_name}"]
 slug: "{slug}"
-cover:
+{translation_line}cover:
   image: "{cover_image}"
-  alt: "{title}"
+  alt: {json.dumps(title, ensure_ascii=False)}
   relative: false
 ShowToc: true
 TocOpen: false
@@ -284,25 +572,343 @@ draft: false
     output_path = output_dir / filename
 
     output_path.write_text(content, encoding="utf-8")
+    record_article(output_path)
     print(f"  Saved: {output_path.relative_to(BLOG_ROOT)}")
     return output_path
 
 
+def save_article(response: str, keyword: str, lang: str, category: str) -> Path:
+    """Parse an LLM response and save it as a Hugo content file."""
+    return write_article(parse_article(response), keyword, lang, category)
+
+
+def article_job_key(keyword: str, lang: str, category: str,
+                    translate_to: str | None = None) -> str:
+    if translate_to:
+        lang = f"{lang}+{translate_to}"
+    return job_key("article", keyword, lang, category)
+
+
+def search_step(job: dict, ledger: JobLedger | None = None) -> dict:
+    """Stage 1: build the prompt (web search), or reuse it from the ledger."""
+    record = ledger.get(job["key"]) if ledger else None
+    if reached(record, "searched") and record.get("prompt"):
+        print(f"  Resuming (searched): {job['keyword']}")
+        job["prompt"] = record["prompt"]
+        return job
+    job["prompt"] = build_prompt(job["keyword"], job["lang"], job["category"])
+    if ledger:
+        ledger.update(job["key"], "searched", prompt=job["prompt"])
+    return job
+
+
+def generate_step(job: dict, ledger: JobLedger | None = None) -> dict:
+    """Stage 2: run the LLM, or reuse the raw response from the ledger."""
+    record = ledger.get(job["key"]) if ledger else None
+    if reached(record, "generated") and record.get("response"):
+        print(f"  Resuming (generated): {job['keyword']}")
+        job["response"] = record["response"]
+        return job
+    job["llm_stats"] = {}
+    if SECTIONED:
+        job["response"] = generate_sectioned(job, ledger)
+    else:
+        print(f"  Generating: [{job['lang']}] [{job['category']}] {job['keyword']} ...")
+        job["response"] = call_ollama(job["prompt"], system_prompt(job["lang"]), job["llm_stats"])
+    if ledger:
+        ledger.update(job["key"], "generated", response=job["response"])
+    return job
+
+
+def parse_response(response: str, keyword: str, lang: str, kind: str = "article") -> dict:
+    """Parse an LLM response, asking for a title separately if it has none."""
+    with timed("parse", kind=kind, keyword=keyword) as m:
+        article = parse_article(response)
+        m["body_chars"] = len(article.get("body", ""))
+    if not article.get("title") and article.get("body"):
+        print(f"  No title in the response, retrying title only: {keyword}", file=sys.stderr)
+        article["title"] = retry_title(article["body"], keyword, lang) or keyword
+    return article
+
+
+def parse_job_response(job: dict, ledger: JobLedger | None = None) -> dict:
+    """Parse a job's primary response; an unparseable one is dropped from the ledger."""
+    try:
+        return parse_response(job["response"], job["keyword"], job["lang"])
+    except ValueError:
+        if ledger:
+            ledger.update(job["key"], "searched", response=None, translation=None)
+        raise
+
+
+def translate_step(job: dict, ledger: JobLedger | None = None) -> dict:
+    """Stage 3 (bilingual jobs only): translate the primary article.
+
+    A failed translation is reported but does not stop the primary article
+    from being written.
+    """
+    target = job.get("translate_to")
+    if not target:
+        return job
+    job["article"] = parse_job_response(job, ledger)
+    record = ledger.get(job["key"]) if ledger else None
+    if record and record.get("translation"):
+        print(f"  Resuming (translated): {job['keyword']}")
+        job["translation"] = record["translation"]
+        return job
+    print(f"  Translating: [{job['lang']} → {target}] {job['keyword']} ...")
+    try:
+        job["translation"] = translate_article(job["article"], target)
+    except Exception as e:
+        print(f"  Translation failed, writing {job['lang']} only: {e}", file=sys.stderr)
+        return job
+    if ledger:
+        ledger.update(job["key"], "generated", translation=job["translation"])
+    return job
+
+
+def write_step(job: dict, ledger: JobLedger | None = None) -> Path:
+    """Stage 4: parse the response(s) and write the Hugo file(s); return the primary one."""
+    article = job.get("article") or parse_job_response(job, ledger)
+    translated = None
+    if job.get("translation"):
+        try:
+            translated = parse_response(job["translation"], job["keyword"], job["translate_to"],
+                                        kind="translation")
+        except ValueError:
+            print(f"  Translation unusable, writing {job['lang']} only", file=sys.stderr)
+    if ledger:
+        ledger.update(job["key"], "parsed", title=article.get("title", ""))
+
+    translation_key = job["key"] if translated else None
+    with timed("write", kind="article", keyword=job["keyword"]):
+        path = write_article(article, job["keyword"], job["lang"], job["category"], translation_key)
+        paths = {"path": str(path.relative_to(BLOG_ROOT))}
+        if translated:
+            other = write_article(translated, job["keyword"], job["translate_to"], job["category"],
+                                  translation_key)
+            paths["translation_path"] = str(other.relative_to(BLOG_ROOT))
+    if ledger:
+        ledger.update(job["key"], "written", **paths)
+    return path
+
+
+def generate_article(keyword: str, lang: str, category: str,
+                     ledger: JobLedger | None = None) -> Path:
+    """Generate a single article and save it as a Hugo content file.
+
+    `lang` may name a pair ("ja+en") to also write a translation. With a
+    `ledger`, completed stages are recorded and reused on a rerun.
+    """
+    lang, translate_to = parse_langs(lang)
+    job = {"keyword": keyword, "lang": lang, "category": category, "translate_to": translate_to,
+           "key": article_job_key(keyword, lang, category, translate_to)}
+    if ledger:
+        record = ledger.register(job["key"], "article", {"keyword": keyword, "lang": lang,
+                                                         "category": category,
+                                                         "translate_to": translate_to})
+        path = written_path(record)
+        if path:
+            print(f"  Already written: {path.relative_to(BLOG_ROOT)}")
+            return path
+    try:
+        job = generate_step(search_step(job, ledger), ledger)
+        return write_step(translate_step(job, ledger), ledger)
+    except Exception as e:
+        if ledger:
+            ledger.fail(job["key"], str(e))
+        raise
+
+
+def read_batch_file(batch_file: Path, bilingual: bool = False) -> list[dict]:
+    """Parse a keywords file (keyword|lang|category per line) into jobs.
+
+    A lang of "ja+en" or "en+ja" (or `bilingual`) adds a translation pass.
+    Every line is checked before any job runs; ValueError lists the bad ones.
+    """
+    jobs, errors = [], []
+    lines = batch_file.read_text(encoding="utf-8").splitlines()
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split("|")
+        keyword = parts[0].strip()
+        try:
+            if not keyword:
+                raise ValueError("Empty keyword")
+            lang, translate_to = parse_langs(parts[1].strip() if len(parts) > 1 else "ja")
+        except ValueError as e:
+            errors.append(f"  line {lineno}: {line}  ({e})")
+            continue
+        if bilingual and not translate_to:
+            translate_to = "en" if lang == "ja" else "ja"
+        jobs.append({
+            "keyword": keyword,
+            "lang": lang,
+            "category": parts[2].strip() if len(parts) > 2 else "ai",
+            "translate_to": translate_to,
+        })
+    if errors:
+        raise ValueError(f"{len(errors)} bad line(s) in {batch_file}:\n" + "\n".join(errors))
+    return jobs
+
+
+def batch_ledger(batch_file: Path) -> JobLedger:
+    """Ledger for a keywords file, stable across reruns of the same file."""
+    digest = job_key(str(batch_file.resolve()))[:8]
+    return JobLedger(f"batch-{batch_file.stem}-{digest}")
+
+
+def prime_prefixes(langs: list[str]) -> dict[str, dict]:
+    """Load each language's system prompt into Ollama's cache; return its counters.
+
+    Primed in reverse order so the first language to run is the one left cached.
+    """
+    primed = {}
+    for lang in reversed(langs):
+        try:
+            primed[lang] = get_client().prime(system_prompt(lang), model=get_router().primary("article"))
+        except Exception as e:
+            print(f"  Could not prime the {lang} system prompt: {e}", file=sys.stderr)
+    return primed
+
+
+def report_prefix_reuse(primed: dict[str, dict], jobs: list[dict]) -> None:
+    """Estimate the prompt evaluation saved by the shared system prompt.
+
+    The primed request measures the prefix (tokens and seconds); a request
+    that reused it evaluated fewer tokens than prefix + its own task text.
+    """
+    saved_tokens = saved_seconds = evaluated = 0.0
+    counted = 0
+    for job in jobs:
+        stats = job.get("llm_stats") or {}
+        prime = primed.get(job["lang"])
+        if not prime or not prime.get("prompt_eval_count") or "prompt_eval_count" not in stats:
+            continue
+        prefix_tokens = prime["prompt_eval_count"]
+        tokens_per_char = prefix_tokens / len(system_prompt(job["lang"]))
+        full = prefix_tokens + len(job["prompt"]) * tokens_per_char
+        saved = max(0.0, full - stats["prompt_eval_count"])
+        saved_tokens += saved
+        saved_seconds += saved * prime.get("prompt_eval_s", 0.0) / prefix_tokens
+        evaluated += stats["prompt_eval_count"]
+        counted += 1
+    if not counted:
+        return
+    print(f"Prefix reuse: {counted} generations evaluated {evaluated / counted:.0f} prompt tokens "
+          f"on average; ≈{saved_tokens:.0f} tokens (≈{saved_seconds:.1f}s of prompt eval) saved")
+
+
+def run_batch(jobs: list[dict], search_workers: int = 1, llm_workers: int = 1,
+              queue_size: int = 2, ledger: JobLedger | None = None) -> tuple[list[Path], list[str]]:
+    """Generate articles for many jobs with search, generation and writing pipelined.
+
+    `llm_workers` is the number of in-flight Ollama requests and should match
+    the server's OLLAMA_NUM_PARALLEL; more only queues up on the server side.
+    With a `ledger`, already written jobs are skipped and the rest resume
+    from their last completed stage.
+    """
+    todo = []
+    skipped = 0
+    for job in jobs:
+        job["key"] = article_job_key(job["keyword"], job["lang"], job["category"],
+                                     job.get("translate_to"))
+        if ledger:
+            record = ledger.register(job["key"], "article", {
+                "keyword": job["keyword"], "lang": job["lang"], "category": job["category"],
+                "translate_to": job.get("translate_to")})
+            if written_path(record):
+                skipped += 1
+                continue
+        todo.append(job)
+    if skipped:
+        print(f"Skipping {skipped} already written jobs (ledger: {ledger.name})")
+
+    primed = {}
+    if PREFIX_REUSE and todo:
+        # Same-language jobs back to back keep one system prompt cached
+        todo.sort(key=lambda job: job["lang"])
+        if not SECTIONED:
+            primed = prime_prefixes(list(dict.fromkeys(job["lang"] for job in todo)))
+
+    generated_jobs = []
+
+    def generate_stage(job: dict) -> dict:
+        job = generate_step(job, ledger)
+        generated_jobs.append(job)
+        return job
+
+    pipeline = Pipeline([
+        Stage("search", lambda job: search_step(job, ledger), workers=search_workers),
+        Stage("generate", generate_stage, workers=llm_workers),
+        Stage("translate", lambda job: translate_step(job, ledger), workers=llm_workers),
+        Stage("write", lambda job: write_step(job, ledger), workers=1),
+    ], queue_size=queue_size)
+    generated, failures = pipeline.run(todo)
+
+    failed = []
+    for job, stage, e in failures:
+        print(f"  SKIPPED: {job['keyword']} ({stage}: {e})", file=sys.stderr)
+        if ledger:
+            ledger.fail(job["key"], f"{stage}: {e}")
+        failed.append(job["keyword"])
+
+    pipeline.print_summary()
+    report_prefix_reuse(primed, generated_jobs)
+    return generated, failed
+
+
 def main():
+    global SEARCH_ENABLED, SEARCH_CACHE_ENABLED, STREAM_ENABLED, STALL_TIMEOUT, PREFIX_REUSE
+    global SECTIONED, SECTION_WORKERS
     parser = argparse.ArgumentParser(description="Generate blog articles using local LLM")
     parser.add_argument("--keyword", "-k", help="Article keyword/topic")
-    parser.add_argument("--lang", "-l", default="ja", choices=["ja", "en"], help="Language (default: ja)")
+    parser.add_argument("--lang", "-l", default="ja", choices=["ja", "en", "ja+en", "en+ja"],
+                        help="Language, or a primary+translation pair (default: ja)")
     parser.add_argument("--category", "-c", default="ai", choices=list(CATEGORIES.keys()), help="Category (default: ai)")
     parser.add_argument("--batch", "-b", help="Path to keywords file (one per line, format: keyword|lang|category)")
-    parser.add_argument("--model", "-m", default=None, help="Ollama model to use (default: llama3.3:70b-instruct-q4_K_M)")
+    parser.add_argument("--bilingual", action="store_true",
+                        help="Batch: also translate every article into the other language")
+    parser.add_argument("--model", "-m", default=None, help="Ollama model for every task (default: config/models.json)")
     parser.add_argument("--no-search", action="store_true", help="Disable web search for context")
+    parser.add_argument("--no-search-cache", action="store_true",
+                        help="Always query DuckDuckGo instead of reusing cached results")
+    parser.add_argument("--search-workers", type=int, default=1,
+                        help="Batch: concurrent web searches (default: 1)")
+    parser.add_argument("--llm-workers", type=int, default=int(os.environ.get("OLLAMA_NUM_PARALLEL", 1)),
+                        help="Batch: in-flight Ollama requests (default: $OLLAMA_NUM_PARALLEL or 1)")
+    parser.add_argument("--queue-size", type=int, default=2,
+                        help="Batch: max items waiting between stages (default: 2)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Batch: ignore the job ledger and start from line 1")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Regenerate even if an identical request is in the LLM cache")
+    parser.add_argument("--no-prefix-reuse", action="store_true",
+                        help="Send instructions and keyword as one prompt (no shared system prompt)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream tokens from Ollama with live progress and stall detection")
+    parser.add_argument("--stall-timeout", type=float, default=STALL_TIMEOUT,
+                        help=f"Streaming: abort after this many seconds without tokens (default: {STALL_TIMEOUT})")
+    parser.add_argument("--sections", action="store_true",
+                        help="Generate an outline first, then each section as its own request")
+    parser.add_argument("--section-workers", type=int, default=SECTION_WORKERS,
+                        help="Sections: concurrent section requests per article (default: $OLLAMA_NUM_PARALLEL or 1)")
     args = parser.parse_args()
 
-    global MODEL, SEARCH_ENABLED
-    if args.model:
-        MODEL = args.model
+    get_router().set_model(args.model)
+    if args.no_llm_cache:
+        get_client().read_cache = False
     if args.no_search:
         SEARCH_ENABLED = False
+    if args.no_search_cache:
+        SEARCH_CACHE_ENABLED = False
+    STREAM_ENABLED = args.stream
+    PREFIX_REUSE = not args.no_prefix_reuse
+    STALL_TIMEOUT = args.stall_timeout
+    SECTIONED = args.sections
+    SECTION_WORKERS = args.section_workers
 
     if args.batch:
         batch_file = Path(args.batch)
@@ -310,22 +916,17 @@ def main():
             print(f"Batch file not found: {batch_file}")
             sys.exit(1)
 
-        generated = []
-        failed = []
-        for line in batch_file.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split("|")
-            keyword = parts[0].strip()
-            lang = parts[1].strip() if len(parts) > 1 else "ja"
-            category = parts[2].strip() if len(parts) > 2 else "ai"
-            try:
-                path = generate_article(keyword, lang, category)
-                generated.append(path)
-            except Exception as e:
-                print(f"  SKIPPED: {keyword} ({e})", file=sys.stderr)
-                failed.append(keyword)
+        try:
+            jobs = read_batch_file(batch_file, bilingual=args.bilingual)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        ledger = batch_ledger(batch_file)
+        if args.fresh:
+            ledger.clear()
+        generated, failed = run_batch(jobs, search_workers=args.search_workers,
+                                      llm_workers=args.llm_workers,
+                                      queue_size=args.queue_size, ledger=ledger)
 
         print(f"\nGenerated {len(generated)} articles, {len(failed)} failed.")
         if failed:
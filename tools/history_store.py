@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+History Store - Append-only, date-ordered topic history in JSON Lines.
+
+Every discovery run appends its selected topics to
+config/topics_history.jsonl instead of rewriting the whole file. Because
+records are only ever appended with the current time, the file is sorted
+by date, and a window query reads it backwards from the end and stops at
+the first record older than the window, touching only recent rows.
+Records older than the keep window are periodically moved to
+config/topics_history.archive.jsonl so the live file stays small.
+
+Usage:
+  python history_store.py               # Show live/archive record counts
+  python history_store.py --compact 30  # Archive records older than 30 days
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+CONFIG_DIR = TOOLS_DIR / "config"
+HISTORY_FILE = CONFIG_DIR / "topics_history.jsonl"
+ARCHIVE_FILE = CONFIG_DIR / "topics_history.archive.jsonl"
+LEGACY_HISTORY_FILE = CONFIG_DIR / "topics_history.json"
+
+COMPACT_GRACE_DAYS = 7  # let records age this far past the window before compacting
+_BLOCK_SIZE = 64 * 1024
+
+
+def _record_date(record: dict) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(record["date"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _iter_lines_reversed(path: Path):
+    """Yield the non-empty lines of a file from last to first, reading in blocks."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8")
+        if tail.strip():
+            yield tail.decode("utf-8")
+
+
+def _write_jsonl(path: Path, records: list[dict], mode: str) -> None:
+    with open(path, mode, encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def migrate_legacy() -> int:
+    """Convert a legacy topics_history.json into the JSON Lines store once."""
+    if HISTORY_FILE.exists() or not LEGACY_HISTORY_FILE.exists():
+        return 0
+    with open(LEGACY_HISTORY_FILE, encoding="utf-8") as f:
+        records = json.load(f).get("generated", [])
+    records.sort(key=lambda r: _record_date(r) or datetime.min.replace(tzinfo=timezone.utc))
+    _write_jsonl(HISTORY_FILE, records, "w")
+    LEGACY_HISTORY_FILE.unlink()
+    return len(records)
+
+
+def recent(days: float) -> list[dict]:
+    """Return records from the last `days` days, oldest first."""
+    migrate_legacy()
+    if not HISTORY_FILE.exists():
+        return []
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=days)
+    records = []
+    for line in _iter_lines_reversed(HISTORY_FILE):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        date = _record_date(record)
+        if date is not None and date < cutoff:
+            break
+        records.append(record)
+    records.reverse()
+    return records
+
+
+def append(records: list[dict], keep_days: float | None = None) -> None:
+    """Append records; compact first if the oldest live record is past the window."""
+    migrate_legacy()
+    if keep_days is not None and needs_compaction(keep_days):
+        compact(keep_days)
+    if records:
+        _write_jsonl(HISTORY_FILE, records, "a")
+
+
+def needs_compaction(keep_days: float) -> bool:
+    """True when the first (oldest) live record is older than the window plus grace."""
+    if not HISTORY_FILE.exists():
+        return False
+    date = None
+    with open(HISTORY_FILE, encoding="utf-8") as f:
+        for line in f:
+            try:
+                date = _record_date(json.loads(line))
+            except ValueError:
+                continue  # blank or truncated line; the next one tells the age
+            break
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=keep_days + COMPACT_GRACE_DAYS)
+    return date is not None and date < cutoff
+
+
+def compact(keep_days: float) -> int:
+    """Move records older than `keep_days` to the archive; return how many moved.
+
+    Unreadable lines are skipped, like recent() does, and dropped from the live file.
+    """
+    if not HISTORY_FILE.exists():
+        return 0
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(days=keep_days)
+    old, live = [], []
+    skipped = 0
+    with open(HISTORY_FILE, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1  # e.g. a half-written line from a crash mid-append
+                continue
+            date = _record_date(record)
+            (old if date is not None and date < cutoff else live).append(record)
+    if skipped:
+        print(f"  Dropped {skipped} unreadable line(s) from {HISTORY_FILE.name}", file=sys.stderr)
+    if not old and not skipped:
+        return 0
+    if old:
+        _write_jsonl(ARCHIVE_FILE, old, "a")
+    tmp = HISTORY_FILE.with_suffix(".tmp")
+    _write_jsonl(tmp, live, "w")
+    tmp.replace(HISTORY_FILE)
+    return len(old)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or compact the topic history store")
+    parser.add_argument("--compact", type=float, metavar="DAYS",
+                        help="Archive records older than DAYS")
+    args = parser.parse_args()
+
+    migrated = migrate_legacy()
+    if migrated:
+        print(f"Migrated {migrated} records from {LEGACY_HISTORY_FILE.name}")
+    if args.compact is not None:
+        print(f"Archived {compact(args.compact)} records")
+    for path in (HISTORY_FILE, ARCHIVE_FILE):
+        count = sum(1 for _ in open(path, encoding="utf-8")) if path.exists() else 0
+        print(f"{path.name}: {count} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Job Ledger - Persistent per-job progress for resumable batch runs.
+
+A ledger is a directory under tools/cache/ledger/<name>/ holding one JSON
+file per job (a keyword or news article). Each file records how far the
+job got and the intermediate artifacts needed to continue from there:
+
+  pending → searched → generated → parsed → written → committed
+            (prompt)   (response)   (title)  (path)
+
+A rerun after a crash or an Ollama restart reads the ledger, skips jobs
+that are already written, and resumes the rest from their last completed
+stage instead of re-running search and generation.
+
+Usage:
+  python job_ledger.py                  # List ledgers and their progress
+  python job_ledger.py batch-keywords   # Show one ledger's jobs
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+BLOG_ROOT = TOOLS_DIR.parent
+LEDGER_DIR = TOOLS_DIR / "cache" / "ledger"
+
+STATES = ("pending", "searched", "generated", "parsed", "written", "committed")
+
+
+def job_key(*parts: str) -> str:
+    """Stable key for a job from its identifying inputs."""
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def reached(record: dict | None, state: str) -> bool:
+    """True if the job has completed `state` (or a later one)."""
+    if not record:
+        return False
+    return STATES.index(record.get("state", "pending")) >= STATES.index(state)
+
+
+def written_path(record: dict | None) -> Path | None:
+    """Return the output file of a written job if it still exists on disk."""
+    if reached(record, "written") and record.get("path"):
+        path = BLOG_ROOT / record["path"]
+        if path.exists():
+            return path
+    return None
+
+
+class JobLedger:
+    """Directory of per-job JSON records, safe to update from worker threads."""
+
+    def __init__(self, name: str, root: Path = LEDGER_DIR):
+        self.name = name
+        self.dir = root / name
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def register(self, key: str, kind: str, inputs: dict) -> dict:
+        """Create a pending job if it is not in the ledger yet; return its record."""
+        with self._lock:
+            record = self.get(key)
+            if record is None:
+                record = {"key": key, "kind": kind, "inputs": inputs, "state": "pending",
+                          "created": time.time(), "updated": time.time()}
+                self._write(record)
+            return record
+
+    def update(self, key: str, state: str, **artifacts) -> dict:
+        """Advance a job to `state` and store artifacts; never moves a job backwards."""
+        with self._lock:
+            record = self.get(key) or {"key": key, "state": "pending", "created": time.time()}
+            if STATES.index(state) > STATES.index(record.get("state", "pending")):
+                record["state"] = state
+            record.update(artifacts)
+            record.pop("error", None)
+            record["updated"] = time.time()
+            self._write(record)
+            return record
+
+    def fail(self, key: str, error: str) -> None:
+        """Record the last error for a job without changing its state."""
+        with self._lock:
+            record = self.get(key)
+            if record is not None:
+                record["error"] = error
+                record["updated"] = time.time()
+                self._write(record)
+
+    def _write(self, record: dict) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(record["key"])
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(path)
+
+    def jobs(self, kind: str | None = None) -> list[dict]:
+        """All job records, oldest first."""
+        if not self.dir.exists():
+            return []
+        records = []
+        for path in self.dir.glob("*.json"):
+            try:
+                records.append(json.loads(path.read_text(encoding="utf-8")))
+            except ValueError:
+                continue
+        records.sort(key=lambda r: r.get("created", 0))
+        return [r for r in records if kind is None or r.get("kind") == kind]
+
+    def prune(self, max_age: float) -> int:
+        """Delete records not updated for `max_age` seconds; return how many."""
+        cutoff = time.time() - max_age
+        removed = 0
+        with self._lock:
+            for path in self.dir.glob("*.json"):
+                try:
+                    updated = json.loads(path.read_text(encoding="utf-8")).get("updated", 0)
+                except (FileNotFoundError, ValueError):
+                    updated = 0
+                if updated < cutoff:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for path in self.dir.glob("*.json"):
+            path.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show job ledger progress")
+    parser.add_argument("name", nargs="?", help="Ledger name (default: list all)")
+    args = parser.parse_args()
+
+    if not args.name:
+        if not LEDGER_DIR.exists():
+            print("No ledgers.")
+            return
+        for d in sorted(LEDGER_DIR.iterdir()):
+            jobs = JobLedger(d.name).jobs()
+            done = sum(1 for j in jobs if reached(j, "written"))
+            print(f"{d.name}: {done}/{len(jobs)} written")
+        return
+
+    jobs = JobLedger(args.name).jobs()
+    if not jobs:
+        print(f"Ledger '{args.name}' is empty.", file=sys.stderr)
+        sys.exit(1)
+    for j in jobs:
+        label = j.get("inputs", {}).get("keyword") or j.get("inputs", {}).get("title", "")
+        err = f"  ERROR: {j['error']}" if j.get("error") else ""
+        print(f"  {j['state']:<10} [{j.get('kind')}] {label[:60]}{err}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+JSON Extract - Single-pass, tolerant extractor for LLM-produced JSON.
+
+The models are asked for a JSON object (title, description, tags, body) but
+often wrap it in code fences, put raw newlines or unescaped quotes inside
+strings, or run out of tokens halfway through the body. JsonExtractor is a
+character-level state machine that:
+
+  - skips any preamble before the first `{`
+  - decodes JSON escapes, including `\\uXXXX` and surrogate pairs
+  - treats a `"` as the end of a string only when what follows agrees: `:`
+    after a key, `,`/`]` in a list, and after a value either `,` plus the
+    next known key (`, "tags":`) or the `}` that closes the object (at the
+    top level: followed only by whitespace, a closing code fence, or the
+    end of the text). Quotes inside code blocks, as in
+    `subprocess.run(["git", "add"])` or a JSON example, stay part of the text
+  - can be fed chunk by chunk while a response streams in, reporting each
+    top-level field as it completes
+  - recovers truncated output: `finish()` returns whatever was parsed,
+    including the partial string that was being read; a top-level value
+    that never closed ends at its last `"}` if it has one (text the model
+    added after the JSON)
+
+Usage:
+  from json_extract import extract_json
+  article = extract_json(response)        # dict; ValueError if nothing usable
+
+  extractor = JsonExtractor()
+  for chunk in chunks:
+      for field in extractor.feed(chunk):
+          print("complete:", field)
+  fields = extractor.finish()
+"""
+
+import json
+import re
+import sys
+
+_WHITESPACE = " \t\r\n"
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f",
+                   "n": "\n", "r": "\r", "t": "\t"}
+
+# Roles a string can play, which decide what may legally follow its closing quote
+_KEY, _VALUE, _ITEM = "key", "value", "item"
+
+# Keys of the objects the prompts ask for (articles, translations, outlines)
+KNOWN_KEYS = frozenset({"title", "description", "tags", "body", "sections", "heading", "points"})
+
+_KEY_PREFIX = re.compile(r'"[A-Za-z_]{0,32}')
+_KEY_WAITING = re.compile(r'"([A-Za-z_]+)"\s*')
+_KEY_COLON = re.compile(r'"([A-Za-z_]+)"\s*:')
+
+
+class JsonExtractor:
+    """Incremental, error-tolerant parser for one top-level JSON object."""
+
+    def __init__(self, keys=KNOWN_KEYS):
+        self.keys = frozenset(keys)
+        self.started = False
+        self.closed = False
+        self.completed: list[str] = []
+        self.root: dict = {}
+        # Open containers: [container, pending key] (key is None for lists)
+        self._stack: list[list] = []
+        self._key: str | None = None      # key read but `:` not yet seen
+        self._string: list[str] | None = None
+        self._role = _VALUE
+        self._escape: str | None = None    # None, "\\", or "u" + hex digits so far
+        self._high_surrogate: str | None = None
+        self._lookahead: list[str] | None = None
+        self._candidate: int | None = None  # length of the open string at a rejected `"}`
+        self._scalar: list[str] = []
+
+    # -- public ----------------------------------------------------------
+
+    def feed(self, chunk: str) -> list[str]:
+        """Consume a chunk; return the names of top-level fields completed in it."""
+        done_before = len(self.completed)
+        pending = list(reversed(chunk))
+        while pending and not self.closed:
+            ch = pending.pop()
+            if self._lookahead is not None:
+                self._step_lookahead(ch, pending)
+            elif self._string is not None:
+                self._step_string(ch)
+            elif not self.started:
+                if ch == "{":
+                    self.started = True
+                    self._stack.append([self.root, None])
+            else:
+                self._step_structure(ch)
+        return self.completed[done_before:]
+
+    def finish(self) -> dict:
+        """End of input: close whatever is still open and return the top-level fields.
+
+        Fields listed in `completed` were closed properly; any other field in
+        the result was cut off (e.g. by num_predict) and holds the partial value.
+        """
+        if self._lookahead is not None:
+            # Text ended right after a candidate closing quote
+            after = "".join(self._lookahead).lstrip(_WHITESPACE)
+            self._lookahead = None
+            if self._closes(after, final=True):
+                self._close_string()
+            else:
+                self._string.append('"' + after)
+        if self._string is not None:
+            self._flush_surrogate()
+            if self._candidate is not None:
+                # The object did end at that `"}`; what followed was not JSON
+                self._assign("".join(self._string[:self._candidate]), complete=True)
+            else:
+                self._assign("".join(self._string), complete=False)
+            self._string = None
+        self._end_scalar()
+        return self.root
+
+    @property
+    def incomplete(self) -> list[str]:
+        return [name for name in self.root if name not in self.completed]
+
+    # -- strings ---------------------------------------------------------
+
+    def _step_string(self, ch: str) -> None:
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = "\\"
+            elif ch == '"':
+                # Decide whether this quote really closes the string
+                self._lookahead = []
+            else:
+                self._flush_surrogate()
+                self._string.append(ch)
+            return
+
+        if self._escape == "\\":
+            if ch == "u":
+                self._escape = "u"
+                return
+            self._escape = None
+            self._flush_surrogate()
+            # Unknown escapes (e.g. a Windows path) are kept verbatim
+            self._string.append(_SIMPLE_ESCAPES.get(ch, "\\" + ch))
+            return
+
+        # Inside \uXXXX
+        if ch in "0123456789abcdefABCDEF":
+            self._escape += ch
+            if len(self._escape) == 5:
+                self._append_codepoint(int(self._escape[1:], 16))
+                self._escape = None
+            return
+        # Malformed \u escape: keep it as text and reprocess this character
+        self._flush_surrogate()
+        self._string.append("\\" + self._escape)
+        self._escape = None
+        self._step_string(ch)
+
+    def _append_codepoint(self, code: int) -> None:
+        if 0xD800 <= code <= 0xDBFF:
+            self._flush_surrogate()
+            self._high_surrogate = chr(code)
+        elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate:
+            high = ord(self._high_surrogate)
+            self._high_surrogate = None
+            self._string.append(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)))
+        else:
+            self._flush_surrogate()
+            self._string.append(chr(code) if not 0xD800 <= code <= 0xDFFF else "\ufffd")
+
+    def _flush_surrogate(self) -> None:
+        if self._high_surrogate:
+            self._string.append("\ufffd")
+            self._high_surrogate = None
+
+    def _step_lookahead(self, ch: str, pending: list[str]) -> None:
+        buf = self._lookahead
+        buf.append(ch)
+        if ch in _WHITESPACE:
+            return
+        after = "".join(buf).lstrip(_WHITESPACE)
+        closes = self._closes(after)
+        if closes is None:
+            return  # need more text to decide
+
+        self._lookahead = None
+        if closes:
+            self._close_string()
+        else:
+            if self._role == _VALUE and len(self._stack) == 1 and after[0] == "}":
+                self._candidate = len(self._string)
+            # Stray quote inside the text: keep it and re-read what followed
+            self._string.append('"')
+        pending.extend(reversed(buf))
+
+    def _closes(self, after: str, final: bool = False) -> bool | None:
+        """Whether the quote before `after` closes the string; None: undecided yet.
+
+        With `final`, `after` is all the text there is and the answer is never None.
+        """
+        if not after:
+            return True
+        undecided = True if final else None
+        container, current_key = self._stack[-1]
+        if self._role == _KEY:
+            return after[0] == ":"
+        if self._role == _ITEM:
+            return after[0] in ",]"
+        if after[0] == "}":
+            rest = "".join(after[1:].split())
+            if len(self._stack) > 1:
+                # Nested object (an outline section): the enclosing list or object goes on
+                return rest[0] in ",]}" if rest else undecided
+            # Top level: only a code fence may follow the object
+            return undecided if "```".startswith(rest) else False
+        if after[0] == ",":
+            text = after[1:].lstrip(_WHITESPACE)
+            if not text:
+                return undecided
+            m = _KEY_COLON.match(text)
+            if m:
+                key = m.group(1)
+                # A key the object already has cannot come again
+                return key in self.keys and key not in container and key != current_key
+            if final:
+                # Cut off inside the next key: close only if it can still become one
+                name = text[1:].rstrip('"' + _WHITESPACE)
+                return any(k.startswith(name) and k not in container and k != current_key
+                           for k in self.keys)
+            if _KEY_PREFIX.fullmatch(text) or _KEY_WAITING.fullmatch(text):
+                return None
+            return False
+        return False
+
+    def _close_string(self) -> None:
+        self._flush_surrogate()
+        text = "".join(self._string)
+        self._string = None
+        if self._role == _KEY:
+            self._key = text
+        else:
+            self._assign(text, complete=True)
+
+    # -- structure -------------------------------------------------------
+
+    def _step_structure(self, ch: str) -> None:
+        if ch in _WHITESPACE or ch == ",":
+            self._end_scalar()
+            return
+        if ch == '"':
+            self._end_scalar()
+            self._string = []
+            self._candidate = None
+            container, key = self._stack[-1]
+            if isinstance(container, list):
+                self._role = _ITEM
+            else:
+                self._role = _VALUE if key is not None else _KEY
+        elif ch == ":":
+            self._end_scalar()
+            if self._key is not None:
+                self._stack[-1][1] = self._key
+                self._key = None
+        elif ch in "{[":
+            self._end_scalar()
+            child = {} if ch == "{" else []
+            self._assign(child, complete=False)
+            self._stack.append([child, None])
+        elif ch in "}]":
+            self._end_scalar()
+            self._stack.pop()
+            if not self._stack:
+                self.closed = True
+                return
+            container, key = self._stack[-1]
+            if len(self._stack) == 1 and key is not None:
+                self._mark_complete(key)
+            if isinstance(container, dict):
+                self._stack[-1][1] = None
+        else:
+            self._scalar.append(ch)
+
+    def _end_scalar(self) -> None:
+        if not self._scalar or self._string is not None:
+            return
+        raw = "".join(self._scalar)
+        self._scalar = []
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        self._assign(value, complete=True)
+
+    def _assign(self, value, complete: bool) -> None:
+        """Store a value in the innermost open container."""
+        if not self._stack:
+            return
+        entry = self._stack[-1]
+        container, key = entry
+        if isinstance(container, list):
+            container.append(value)
+            return
+        if key is None:
+            return
+        container[key] = value
+        if complete:
+            if len(self._stack) == 1:
+                self._mark_complete(key)
+            entry[1] = None
+
+    def _mark_complete(self, key: str) -> None:
+        if key not in self.completed:
+            self.completed.append(key)
+
+
+def extract(text: str, keys=KNOWN_KEYS) -> tuple[dict, list[str]]:
+    """Parse `text`; return (top-level fields, names of fields that were cut off)."""
+    extractor = JsonExtractor(keys)
+    extractor.feed(text)
+    fields = extractor.finish()
+    return fields, extractor.incomplete
+
+
+def extract_json(text: str) -> dict:
+    """Extract article fields from an LLM response.
+
+    Tags are normalized to a list of strings. Raises ValueError when neither
+    a title nor a body could be recovered.
+    """
+    fields, incomplete = extract(text)
+    if incomplete:
+        print(f"  Warning: response truncated, incomplete fields: {', '.join(incomplete)}",
+              file=sys.stderr)
+
+    result = {}
+    for name in ("title", "description", "body"):
+        if isinstance(fields.get(name), str):
+            result[name] = fields[name]
+    tags = fields.get("tags")
+    if isinstance(tags, list):
+        result["tags"] = [str(t) for t in tags if isinstance(t, (str, int, float))]
+    elif isinstance(tags, str):
+        result["tags"] = [t.strip() for t in tags.split(",") if t.strip()]
+
+    if not result.get("title") and not result.get("body"):
+        raise ValueError(f"Could not extract article fields from response:\n{text[:500]}")
+    return result
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher - Score text against per-category keyword lists in one pass.
+
+All keywords are compiled into a single alternation regex, so a text is
+scanned once no matter how many categories or keywords there are. Latin
+keywords only match on word boundaries ("ai" no longer matches inside
+"said" or "openai") and tolerate a plural "s" ("llms"); the boundary only
+looks at ASCII letters and digits, so "AIエージェント" still matches "ai".
+Keywords written in CJK script match as plain substrings since those
+languages have no word separators. Text is NFKC-normalized first, so
+full-width "ＬＬＭ" matches "llm".
+
+Usage:
+  matcher = KeywordMatcher({"ai": ["llm", "生成ai"], "tech": ["docker"]})
+  matcher.hits("New LLMs on Docker")   # {"ai": 1, "tech": 1}
+"""
+
+import re
+import unicodedata
+
+_ASCII_WORD = re.compile(r"^[\x00-\x7f]+$")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+class KeywordMatcher:
+    """Precompiled multi-pattern matcher returning per-category hit counts."""
+
+    def __init__(self, category_keywords: dict[str, list[str]]):
+        self.categories = list(category_keywords)
+        self._owners: dict[str, list[str]] = {}
+        for cat, keywords in category_keywords.items():
+            for kw in keywords:
+                kw = _normalize(kw).strip()
+                if kw and cat not in self._owners.setdefault(kw, []):
+                    self._owners[kw].append(cat)
+
+        # Longest first so "machine learning" wins over any shorter overlap
+        ordered = sorted(self._owners, key=len, reverse=True)
+        latin = [re.escape(kw) for kw in ordered if _ASCII_WORD.match(kw)]
+        cjk = [re.escape(kw) for kw in ordered if not _ASCII_WORD.match(kw)]
+        branches = []
+        if latin:
+            branches.append(rf"(?<![a-z0-9])(?:{'|'.join(latin)})s?(?![a-z0-9])")
+        if cjk:
+            branches.append(f"(?:{'|'.join(cjk)})")
+        self._pattern = re.compile("|".join(branches)) if branches else None
+
+    def matched(self, text: str) -> dict[str, set[str]]:
+        """Return {category: set of distinct keywords found} for every category."""
+        found: dict[str, set[str]] = {cat: set() for cat in self.categories}
+        if not self._pattern:
+            return found
+        for m in self._pattern.finditer(_normalize(text)):
+            kw = m.group()
+            owners = self._owners.get(kw)
+            if owners is None and kw.endswith("s"):
+                kw = kw[:-1]
+                owners = self._owners.get(kw, [])
+            for cat in owners or []:
+                found[cat].add(kw)
+        return found
+
+    def hits(self, text: str) -> dict[str, int]:
+        """Return {category: number of distinct keywords found}."""
+        return {cat: len(kws) for cat, kws in self.matched(text).items()}
+
+
+def merge_keywords(*sources: dict[str, list[str]]) -> dict[str, list[str]]:
+    """Union several {category: [keywords]} maps, keeping first-seen order."""
+    merged: dict[str, list[str]] = {}
+    for source in sources:
+        for cat, keywords in (source or {}).items():
+            bucket = merged.setdefault(cat, [])
+            for kw in keywords:
+                if kw not in bucket:
+                    bucket.append(kw)
+    return merged
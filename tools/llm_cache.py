@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+LLM Cache - Content-addressed store of raw Ollama responses.
+
+Every completed generation is stored under tools/cache/llm/ keyed by a
+SHA-256 of (model, prompt, options and any other request fields). Running
+the same request again — e.g. after fixing extract_json or changing the
+front-matter template — returns the stored raw response with zero GPU
+time. Total size is capped; the least recently used entries are evicted.
+
+Usage:
+  python llm_cache.py --stats           # Entry count and size
+  python llm_cache.py --list            # Recent entries with prompt previews
+  python llm_cache.py --show KEY        # Print one raw response
+  python llm_cache.py --clear           # Remove everything
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+LLM_CACHE_DIR = TOOLS_DIR / "cache" / "llm"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Request fields that do not change the generated text
+_VOLATILE_FIELDS = ("stream", "keep_alive")
+
+
+def request_key(payload: dict) -> str:
+    """Hash the parts of an Ollama request that determine its output."""
+    stable = {k: v for k, v in payload.items() if k not in _VOLATILE_FIELDS}
+    blob = json.dumps(stable, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class LLMCache:
+    """Directory of `<key[:2]>/<key>.json` files with LRU eviction by total size."""
+
+    def __init__(self, root: Path = LLM_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, payload: dict) -> str | None:
+        """Return the cached response text for a request, or None."""
+        path = self._path(request_key(payload))
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)  # mark as recently used
+        return entry["response"]
+
+    def put(self, payload: dict, response: str) -> str:
+        """Store a response; return its key."""
+        key = request_key(payload)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "key": key,
+            "model": payload.get("model"),
+            "options": payload.get("options", {}),
+            "prompt_preview": str(payload.get("prompt") or payload.get("messages", ""))[:200],
+            "created": time.time(),
+            "response": response,
+        }
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        self.evict()
+        return key
+
+    def delete(self, key: str) -> None:
+        """Remove one entry, e.g. a response that turned out to be unusable."""
+        self._path(key).unlink(missing_ok=True)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until under max_bytes; return count."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            return removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "size_mb": round(sum(size for _, size, _ in entries) / 1e6, 1),
+            "max_mb": round(self.max_bytes / 1e6, 1),
+        }
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the raw LLM response cache")
+    parser.add_argument("--stats", action="store_true", help="Show entry count and size")
+    parser.add_argument("--list", action="store_true", help="List the 20 most recent entries")
+    parser.add_argument("--show", metavar="KEY", help="Print the raw response for KEY (prefix ok)")
+    parser.add_argument("--clear", action="store_true", help="Remove all entries")
+    args = parser.parse_args()
+
+    cache = LLMCache()
+    if args.clear:
+        cache.clear()
+        print("LLM cache cleared.")
+    elif args.show:
+        matches = list(cache.root.glob(f"{args.show[:2]}/{args.show}*.json"))
+        if len(matches) != 1:
+            print(f"{len(matches)} entries match '{args.show}'", file=sys.stderr)
+            sys.exit(1)
+        print(json.loads(matches[0].read_text(encoding="utf-8"))["response"])
+    elif args.list:
+        for mtime, _, path in sorted(cache._entries(), reverse=True)[:20]:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            preview = " ".join(entry.get("prompt_preview", "").split())[:70]
+            print(f"{entry['key'][:12]}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))}  "
+                  f"{entry.get('model')}  {preview}")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Metrics - Per-stage timing and token counters as JSON Lines.
+
+Every instrumented step (feed fetch, web search, page fetch, Ollama call,
+parse, write, pipeline step) appends one line to logs/metrics.jsonl:
+
+  {"ts": 1760000000.1, "run": "20261018T060001-4242", "stage": "ollama.generate",
+   "seconds": 312.4, "ok": true, "model": "...", "eval_count": 2310,
+   "eval_tokens_per_s": 8.1, "prompt_eval_s": 4.2, "load_s": 0.01, ...}
+
+All lines written by one process share a run id, so a daily run can be
+compared with earlier ones stage by stage. Set METRICS=0 to disable.
+
+Usage:
+  from metrics import timed
+  with timed("search", query=q) as m:
+      results = fetch(q)
+      m["results"] = len(results)
+
+  python metrics.py                     # Per-stage summary of the last 7 days
+  python metrics.py --days 30 --stage ollama
+  python metrics.py --runs              # Wall time and tokens/s per run
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+BLOG_ROOT = TOOLS_DIR.parent
+METRICS_FILE = BLOG_ROOT / "logs" / "metrics.jsonl"
+
+ENABLED = os.environ.get("METRICS", "1") != "0"
+RUN_ID = os.environ.get("METRICS_RUN_ID") or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+# Ollama reports these durations in nanoseconds
+_OLLAMA_DURATIONS = {
+    "total_duration": "total_s",
+    "load_duration": "load_s",
+    "prompt_eval_duration": "prompt_eval_s",
+    "eval_duration": "eval_s",
+}
+
+_lock = threading.Lock()
+
+
+def emit(stage: str, seconds: float, ok: bool = True, **fields) -> None:
+    """Append one metrics record."""
+    if not ENABLED:
+        return
+    record = {"ts": round(time.time(), 3), "run": RUN_ID, "stage": stage,
+              "seconds": round(seconds, 4), "ok": ok, **fields}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        with _lock:
+            METRICS_FILE.parent.mkdir(exist_ok=True)
+            with open(METRICS_FILE, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        print(f"  Could not write metrics: {e}", file=sys.stderr)
+
+
+@contextmanager
+def timed(stage: str, **fields):
+    """Time a block and emit it; the yielded dict collects extra fields.
+
+    An exception is recorded as ok=false with its message, then re-raised;
+    a handled failure can set "ok" (and "error") in the dict itself.
+    """
+    extra = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield extra
+    except BaseException as e:
+        # The exception wins over any ok/error the block had already set
+        emit(stage, time.perf_counter() - start,
+             **{**extra, "ok": False, "error": f"{type(e).__name__}: {e}"[:200]})
+        raise
+    emit(stage, time.perf_counter() - start, **extra)
+
+
+def ollama_fields(response: dict) -> dict:
+    """Pull Ollama's token counters and timings out of a final response chunk."""
+    fields = {}
+    for key in ("prompt_eval_count", "eval_count"):
+        if key in response:
+            fields[key] = response[key]
+    for key, name in _OLLAMA_DURATIONS.items():
+        if key in response:
+            fields[name] = round(response[key] / 1e9, 3)
+    if fields.get("eval_count") and fields.get("eval_s"):
+        fields["eval_tokens_per_s"] = round(fields["eval_count"] / fields["eval_s"], 2)
+    if fields.get("prompt_eval_count") and fields.get("prompt_eval_s"):
+        fields["prompt_tokens_per_s"] = round(fields["prompt_eval_count"] / fields["prompt_eval_s"], 2)
+    return fields
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Linear-interpolated percentile (p in 0-100) of a non-empty list."""
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def load(days: float | None = None, path: Path = METRICS_FILE) -> list[dict]:
+    """Read metrics records, optionally only those from the last `days` days."""
+    if not path.exists():
+        return []
+    cutoff = time.time() - days * 86400 if days else 0
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("ts", 0) >= cutoff:
+                records.append(record)
+    return records
+
+
+def summarize(records: list[dict]) -> list[str]:
+    """Per-stage count, failures and latency percentiles (plus tokens/s for Ollama)."""
+    by_stage: dict[str, list[dict]] = {}
+    for r in records:
+        by_stage.setdefault(r["stage"], []).append(r)
+    lines = [f"{'stage':<24} {'n':>5} {'fail':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8}  tok/s p50"]
+    for stage in sorted(by_stage):
+        rows = by_stage[stage]
+        secs = [r["seconds"] for r in rows]
+        rates = [r["eval_tokens_per_s"] for r in rows if r.get("eval_tokens_per_s")]
+        rate = f"{percentile(rates, 50):9.1f}" if rates else ""
+        lines.append(f"{stage:<24} {len(rows):>5} {sum(not r.get('ok', True) for r in rows):>5} "
+                     f"{percentile(secs, 50):8.2f} {percentile(secs, 95):8.2f} {max(secs):8.2f}  {rate}")
+    return lines
+
+
+def summarize_runs(records: list[dict]) -> list[str]:
+    """One line per run: wall span, Ollama time and generated tokens."""
+    runs: dict[str, list[dict]] = {}
+    for r in records:
+        runs.setdefault(r["run"], []).append(r)
+    lines = [f"{'run':<24} {'wall s':>8} {'ollama s':>9} {'tokens':>7} {'tok/s':>6}"]
+    for run_id, rows in sorted(runs.items(), key=lambda kv: kv[1][0]["ts"]):
+        start = min(r["ts"] - r["seconds"] for r in rows)
+        wall = max(r["ts"] for r in rows) - start
+        llm = [r for r in rows if r["stage"] == "ollama.generate" and not r.get("cached")]
+        tokens = sum(r.get("eval_count", 0) for r in llm)
+        eval_s = sum(r.get("eval_s", 0) for r in llm)
+        lines.append(f"{run_id:<24} {wall:8.1f} {sum(r['seconds'] for r in llm):9.1f} {tokens:>7} "
+                     f"{tokens / eval_s if eval_s else 0:6.1f}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize pipeline metrics")
+    parser.add_argument("--days", type=float, default=7, help="Look back this many days (default: 7)")
+    parser.add_argument("--stage", help="Only stages starting with this prefix")
+    parser.add_argument("--runs", action="store_true", help="Summarize per run instead of per stage")
+    args = parser.parse_args()
+
+    records = load(args.days)
+    if args.stage:
+        records = [r for r in records if r["stage"].startswith(args.stage)]
+    if not records:
+        print(f"No metrics in {METRICS_FILE} for the last {args.days:g} days.", file=sys.stderr)
+        sys.exit(1)
+    print("\n".join(summarize_runs(records) if args.runs else summarize(records)))
+
+
+if __name__ == "__main__":
+    main()
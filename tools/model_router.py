@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Model Router - Pick the Ollama model for each kind of generation.
+
+config/models.json maps a task to a model plus an ordered list of
+fallbacks, and caps how many requests each model may have in flight:
+
+  {
+    "tasks": {
+      "article": {"fallback": ["qwen3:32b"], "timeout_seconds": 900},
+      "summary": {"model": "qwen3:14b", "fallback": ["default"]},
+      "translate": {"model": "qwen3:32b", "fallback": ["default"]},
+      "title":   {"model": "qwen3:8b", "fallback": ["qwen3:14b", "default"]},
+      "digest":  {"model": "qwen3:8b", "fallback": ["qwen3:14b", "default"]}
+    },
+    "models": {
+      "llama3.3:70b-instruct-q4_K_M": {"max_concurrent": 1},
+      "qwen3:14b": {"max_concurrent": 2}
+    }
+  }
+
+A task without "model", and the name "default", mean the client's model
+(OLLAMA_MODEL or --model). A request that times out, stalls, or finds its
+model overloaded (HTTP 429/503 after the client's retries) or not pulled
+(HTTP 404) moves on to the next model; a missing model is skipped for the
+rest of the process. Each capped model has its own semaphore, so a summary
+on a small model never waits behind an article on the large one.
+
+`--model` pins every task to that one model, as before.
+
+Usage:
+  from model_router import get_router
+  text = get_router().generate("summary", prompt, options={"num_predict": 4096})
+
+  python model_router.py              # Show the routes in effect
+"""
+
+import argparse
+import json
+import sys
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+
+from metrics import emit
+from ollama_client import OllamaClient, OllamaError, get_client
+from ollama_stream import StreamStalled
+
+TOOLS_DIR = Path(__file__).resolve().parent
+MODELS_CONFIG = TOOLS_DIR / "config" / "models.json"
+
+TASKS = ("article", "summary", "translate", "title", "digest")
+DEFAULT = "default"
+
+# Statuses that mean "try another model" rather than "this request is bad"
+FALLBACK_STATUSES = {404, 429, 503}
+
+
+def load_config(path: Path = MODELS_CONFIG) -> dict:
+    """Read the routing config; a missing file routes everything to the default model."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+class ModelRouter:
+    """Routes generate() calls by task, with fallbacks and per-model concurrency caps."""
+
+    def __init__(self, config: dict | None = None, client: OllamaClient | None = None):
+        self.config = config if config is not None else load_config()
+        self.client = client or get_client()
+        self.pinned: str | None = None
+        self.missing: set[str] = set()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def set_model(self, model: str | None) -> None:
+        """Pin every task to `model` (no-op for None, so `--model` can pass through)."""
+        if model:
+            self.pinned = model
+            self.client.set_model(model)
+
+    def route(self, task: str) -> dict:
+        return self.config.get("tasks", {}).get(task, {})
+
+    def models_for(self, task: str) -> list[str]:
+        """Models to try for `task`, in order, without duplicates or known-missing ones."""
+        if self.pinned:
+            return [self.pinned]
+        route = self.route(task)
+        names = [route.get("model", DEFAULT), *route.get("fallback", [])]
+        models = []
+        for name in names:
+            model = self.client.model if name == DEFAULT else name
+            if model not in models and model not in self.missing:
+                models.append(model)
+        return models or [self.client.model]
+
+    def primary(self, task: str) -> str:
+        return self.models_for(task)[0]
+
+    def max_concurrent(self, model: str) -> int | None:
+        return self.config.get("models", {}).get(model, {}).get("max_concurrent")
+
+    def slot(self, model: str):
+        """Context manager holding one of `model`'s concurrency slots (if capped)."""
+        limit = self.max_concurrent(model)
+        if not limit:
+            return nullcontext()
+        with self._lock:
+            if model not in self._slots:
+                self._slots[model] = threading.BoundedSemaphore(limit)
+            return self._slots[model]
+
+    def generate(self, task: str, prompt: str, timeout: float = 600, expect_json: bool = True,
+                 **kwargs) -> str:
+        """OllamaClient.generate on the task's model, falling back down its list.
+
+        Pass `expect_json=False` for tasks that return plain text, so a
+        stream is read to the end instead of stopping at a closing brace.
+        """
+        timeout = self.route(task).get("timeout_seconds", timeout)
+        kwargs.setdefault("label", task)
+        models = self.models_for(task)
+        for i, model in enumerate(models):
+            try:
+                with self.slot(model):
+                    return self.client.generate(prompt, model=model, timeout=timeout,
+                                                expect_json=expect_json, **kwargs)
+            except (TimeoutError, StreamStalled, OllamaError) as e:
+                status = getattr(e, "status", None)
+                if isinstance(e, OllamaError) and status not in FALLBACK_STATUSES:
+                    raise
+                if status == 404:
+                    with self._lock:
+                        self.missing.add(model)
+                if i == len(models) - 1:
+                    raise
+                print(f"  {model} failed for {task} ({type(e).__name__}: {e}); "
+                      f"falling back to {models[i + 1]}", file=sys.stderr)
+                emit("router.fallback", 0, ok=False, task=task, model=model,
+                     next_model=models[i + 1], error=f"{type(e).__name__}: {e}"[:200])
+        raise AssertionError("unreachable")
+
+    def describe(self) -> list[str]:
+        lines = []
+        for task in sorted(set(TASKS) | set(self.config.get("tasks", {}))):
+            chain = " → ".join(f"{m} (max {self.max_concurrent(m) or '∞'})"
+                               for m in self.models_for(task))
+            lines.append(f"{task:<10} {chain}")
+        return lines
+
+
+_router: ModelRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Return the process-wide shared router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the task → model routes")
+    parser.add_argument("--model", "-m", default=None, help="Pin every task to this model")
+    args = parser.parse_args()
+
+    router = get_router()
+    router.set_model(args.model)
+    print(f"Config: {MODELS_CONFIG}{'' if MODELS_CONFIG.exists() else ' (missing, using defaults)'}")
+    print("\n".join(router.describe()))
+
+
+if __name__ == "__main__":
+    main()
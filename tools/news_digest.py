@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+News Digest - One roundup post covering many feed items, map-reduce style.
+
+A full summary article costs one long generation per story. A digest
+instead runs:
+
+  map     one short call per story (2-3 sentences, num_predict 256) on the
+          small "digest" model from config/models.json, several at once
+          (the router caps each model's concurrency; raise
+          OLLAMA_NUM_PARALLEL on the server to let them overlap)
+  reduce  one call on the "summary" model that reads all the short
+          summaries and writes the title, description, tags and an
+          overview grouping the stories by theme
+
+The post is the overview followed by every story's summary with a link
+to its source. Story summaries are cached per URL and output language in
+the "digest-items" job ledger, so a weekly digest reuses the stories the
+daily ones already summarized and only new items cost a map call. Entries
+older than ITEM_TTL are pruned whenever the ledger is opened.
+
+Usage:
+  python news_digest.py                       # Daily English digest of the top 8 items
+  python news_digest.py --period weekly       # Weekly digest of the top 15 items
+  python news_digest.py --lang ja --count 10  # Japanese digest of 10 items
+  python news_digest.py --source-lang en      # Only English feeds as sources
+  python news_digest.py --test                # Preview without saving
+"""
+
+import argparse
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from generate import retry_title
+from job_ledger import JobLedger, job_key, reached, written_path
+from json_extract import extract_json
+from metrics import timed
+from model_router import get_router
+from ollama_client import get_client
+from summarize_news import (BLOG_ROOT, JST, SUMMARY_PREDICT, call_ollama, fetch_candidates,
+                            get_top_articles, write_summary_post)
+from token_budget import ContextBudget
+
+ITEM_LEDGER = "digest-items"
+ITEM_TTL = 8 * 24 * 3600  # longer than a weekly digest's period, so it reuses the dailies
+DIGEST_ITEMS = {"daily": 8, "weekly": 15}
+CANDIDATE_FACTOR = 1.5  # feed items fetched per digest item; the best pages win
+MIN_ITEMS = 3
+MAP_WORKERS = 4
+MAP_PREDICT = 256
+MAP_SOURCE_TOKENS = 1500  # a few paragraphs are enough for 2-3 sentences
+
+PERIOD_NAMES = {
+    "daily": {"ja": "今日", "en": "daily"},
+    "weekly": {"ja": "今週", "en": "weekly"},
+}
+
+# Sent as the system prompt so every map call shares the same prefix
+MAP_SYSTEM = {
+    "ja": "以下のニュース記事を日本語で2〜3文に要約してください。要約文のみを返し、前置きや見出しは付けないでください。",
+    "en": "Summarize the following news item in 2-3 plain English sentences. "
+          "Return only the summary, with no preamble or heading.",
+}
+
+MAP_PROMPT = """Title: {title}
+Source: {feed}
+
+{article_text}
+"""
+
+REDUCE_PROMPT_JA = """あなたはテクニカルエディターです。AI・テクノロジーニュースの{period}のまとめ記事を書いてください。
+以下は{count}件のニュースの短い要約です。
+
+{items}
+
+以下のJSON形式で出力してください。JSONのみ返してください。
+{{
+  "title": "まとめ記事のタイトル（60文字以内）",
+  "description": "メタディスクリプション（120文字以内）",
+  "tags": ["タグ1", "タグ2", "タグ3", "タグ4", "タグ5"],
+  "body": "概要（マークダウン形式、## 見出しを2-3個使ってニュースをテーマごとにまとめ、共通する傾向や関連を説明する。合計400-600字）"
+}}
+
+要件:
+- 要約に書かれている情報だけを使う
+- 各ニュースの要約を繰り返さない（概要の後に全件を出典付きで掲載します）
+- ニュースに触れるときはタイトルで示す
+"""
+
+REDUCE_PROMPT_EN = """You are a technical editor. Write a {period} roundup of AI and technology news.
+Below are short summaries of {count} stories.
+
+{items}
+
+Output ONLY in the following JSON format:
+{{
+  "title": "Roundup title (under 60 characters)",
+  "description": "Meta description (under 160 characters)",
+  "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
+  "body": "Overview in Markdown: group the stories by theme under 2-3 ## headings and point out the trends and connections between them, 300-500 words total"
+}}
+
+Requirements:
+- Use only the information in the summaries
+- Do not repeat each summary; every story is listed with its source after the overview
+- Refer to stories by their titles
+"""
+
+
+def item_key(article: dict, lang: str) -> str:
+    return job_key("digest-item", article["url"], lang)
+
+
+def item_cache() -> JobLedger:
+    """Open the per-item summary ledger, dropping entries older than ITEM_TTL."""
+    cache = JobLedger(ITEM_LEDGER)
+    removed = cache.prune(ITEM_TTL)
+    if removed:
+        print(f"  Pruned {removed} digest item summaries older than {ITEM_TTL // 86400} days")
+    return cache
+
+
+def collect_items(count: int, lang: str, cache: JobLedger,
+                  source_lang: str | None = None) -> list[tuple[dict, str | None, float]]:
+    """Pick the `count` best feed items as (article, text, score), best first.
+
+    Items already summarized in `lang` keep their cached score and are not
+    fetched again (their text is None); the rest are fetched in parallel
+    and ranked like summary candidates.
+    """
+    articles = []
+    for article in get_top_articles(count=int(count * CANDIDATE_FACTOR) + 1, lang=source_lang):
+        # The same story often appears in more than one feed
+        if all(a["url"] != article["url"] for a in articles):
+            articles.append(article)
+    cached, todo = [], []
+    for article in articles:
+        record = cache.get(item_key(article, lang))
+        if reached(record, "generated") and record.get("summary"):
+            cached.append((article, None, record.get("score", 0.0)))
+        else:
+            todo.append(article)
+    print(f"  {len(cached)} items already summarized, fetching {len(todo)} pages...")
+    ranked = cached + fetch_candidates(todo)
+    ranked.sort(key=lambda item: item[2], reverse=True)
+    return ranked[:count]
+
+
+def summarize_item(article: dict, text: str | None, score: float, lang: str,
+                   cache: JobLedger) -> str:
+    """Map step: a 2-3 sentence summary of one item, from the cache when possible."""
+    key = item_key(article, lang)
+    record = cache.register(key, "digest-item", article)
+    if reached(record, "generated") and record.get("summary"):
+        return record["summary"]
+    if not text:
+        return ""
+    budget = ContextBudget(reserve_output=MAP_PREDICT, model=get_router().primary("digest"))
+    prompt = MAP_PROMPT.format(title=article["title"], feed=article.get("feed", ""), article_text="")
+    room = min(MAP_SOURCE_TOKENS, budget.available([MAP_SYSTEM[lang], prompt]))
+    prompt = MAP_PROMPT.format(title=article["title"], feed=article.get("feed", ""),
+                               article_text=budget.fit(text, room))
+    with timed("digest.map", url=article["url"]) as m:
+        response = get_router().generate("digest", prompt, system=MAP_SYSTEM[lang],
+                                         options={"num_predict": MAP_PREDICT, "temperature": 0.3},
+                                         expect_json=False)
+        m["chars"] = len(response)
+    summary = re.sub(r"<think>.*?</think>", "", response, flags=re.DOTALL).strip()
+    if summary:
+        cache.update(key, "generated", summary=summary, score=score)
+    return summary
+
+
+def map_items(items: list[tuple[dict, str | None, float]], lang: str,
+              cache: JobLedger) -> list[tuple[dict, str]]:
+    """Summarize every item concurrently; return (article, summary) in input order."""
+    def summarize(item):
+        article, text, score = item
+        try:
+            return summarize_item(article, text, score, lang, cache)
+        except Exception as e:
+            print(f"  Map failed for {article['url']}: {e}", file=sys.stderr)
+            cache.fail(item_key(article, lang), str(e))
+            return ""
+
+    with ThreadPoolExecutor(max_workers=min(MAP_WORKERS, len(items) or 1)) as pool:
+        summaries = list(pool.map(summarize, items))
+    return [(article, summary) for (article, _, _), summary in zip(items, summaries) if summary]
+
+
+def build_reduce_prompt(summaries: list[tuple[dict, str]], lang: str, period: str) -> str:
+    """Reduce prompt with every summary, each trimmed to an equal share of the context."""
+    template = REDUCE_PROMPT_JA if lang == "ja" else REDUCE_PROMPT_EN
+    fields = {"period": PERIOD_NAMES[period][lang], "count": len(summaries)}
+    # The reduce call is a summarize_news call, with its num_predict
+    budget = ContextBudget(reserve_output=SUMMARY_PREDICT, model=get_router().primary("summary"))
+    parts = budget.allocate([template.format(items="", **fields)],
+                            {str(i): summary for i, (_, summary) in enumerate(summaries)})
+    items = "\n\n".join(f"{i + 1}. {article['title']} ({article.get('feed', '')})\n{parts[str(i)]}"
+                        for i, (article, _) in enumerate(summaries))
+    return template.format(items=items, **fields)
+
+
+def story_sections(summaries: list[tuple[dict, str]], lang: str) -> str:
+    """Markdown listing every story's summary with a link to its source."""
+    lines = [f"## {'ニュース一覧' if lang == 'ja' else 'The stories'}\n"]
+    for article, summary in summaries:
+        lines.append(f"### [{article['title']}]({article['url']})\n\n{summary}\n")
+    return "\n".join(lines)
+
+
+def generate_digest(period: str = "daily", lang: str = "en", count: int | None = None,
+                    test: bool = False, ledger: JobLedger | None = None,
+                    items: list[tuple[dict, str | None, float]] | None = None,
+                    source_lang: str | None = None) -> Path | None:
+    """Generate a roundup post of the top feed items.
+
+    `items` from collect_items() skips the feed and page fetches. With a
+    `ledger`, the chosen items and the reduce response are recorded so a
+    rerun resumes instead of starting over.
+    """
+    date = datetime.now(tz=JST).strftime("%Y-%m-%d")
+    cache = item_cache()
+    key = job_key("digest", period, date, lang)
+    record = None
+    if ledger and not test:
+        record = ledger.register(key, "digest", {"title": f"{period} digest {date}",
+                                                 "period": period, "lang": lang})
+        path = written_path(record)
+        if path:
+            print(f"  Already written: {path.relative_to(BLOG_ROOT)}")
+            return path
+    else:
+        ledger = None
+
+    if reached(record, "searched") and record.get("items"):
+        items = [(article, None, 0.0) for article in record["items"]]
+    elif items is None:
+        items = collect_items(count or DIGEST_ITEMS[period], lang, cache, source_lang)
+
+    print(f"  Summarizing {len(items)} items...")
+    summaries = map_items(items, lang, cache)
+    if len(summaries) < MIN_ITEMS:
+        print(f"  Skipping: only {len(summaries)} items could be summarized", file=sys.stderr)
+        if ledger:
+            ledger.fail(key, f"only {len(summaries)} items summarized")
+        return None
+    if ledger:
+        ledger.update(key, "searched", items=[article for article, _ in summaries])
+
+    if reached(record, "generated") and record.get("response"):
+        print(f"  Resuming (generated): {period} digest")
+        response = record["response"]
+    else:
+        print(f"  Writing {period} digest of {len(summaries)} stories...")
+        with timed("digest.reduce", items=len(summaries), lang=lang):
+            # Read the digest to the end: its markdown body may contain braces
+            response = call_ollama(build_reduce_prompt(summaries, lang, period), expect_json=False)
+        if ledger:
+            ledger.update(key, "generated", response=response)
+
+    try:
+        with timed("parse", kind="digest"):
+            parsed = extract_json(response)
+    except ValueError as e:
+        print(f"  Failed to parse digest: {e}", file=sys.stderr)
+        get_client().forget(response)
+        if ledger:
+            ledger.update(key, "searched", response=None)
+            ledger.fail(key, f"parse: {e}")
+        return None
+    if ledger:
+        ledger.update(key, "parsed", title=parsed.get("title", ""))
+
+    body = parsed.get("body", "").rstrip() + "\n\n" + story_sections(summaries, lang)
+    title = parsed.get("title")
+    if not title:
+        print("  No title in the response, retrying title only", file=sys.stderr)
+        title = retry_title(body, f"{PERIOD_NAMES[period][lang]} AI news", lang)
+    title = title or (f"{PERIOD_NAMES[period]['ja']}のAIニュースまとめ ({date})" if lang == "ja"
+                      else f"AI News {period.capitalize()} Digest ({date})")
+
+    if test:
+        print(f"\n--- Digest Preview ---")
+        print(f"Title: {title}")
+        print(f"Description: {parsed.get('description', '')}")
+        print(f"Tags: {parsed.get('tags', [])}")
+        print(f"Stories: {len(summaries)}")
+        print(f"Body length: {len(body)} chars")
+        print(f"Body preview:\n{body[:800]}...")
+        return None
+
+    # File the digest under the category most of its stories come from
+    category = Counter(article["category"] for article, _ in summaries).most_common(1)[0][0]
+    with timed("write", kind="digest"):
+        output_path = write_summary_post(title, parsed.get("description", ""), parsed.get("tags", []),
+                                         body, lang, category, slug=f"{period}-digest-{date}")
+    if ledger:
+        ledger.update(key, "written", path=str(output_path.relative_to(BLOG_ROOT)))
+    print(f"  Saved: {output_path.relative_to(BLOG_ROOT)}")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a roundup post of many news items")
+    parser.add_argument("--period", choices=list(DIGEST_ITEMS), default="daily")
+    parser.add_argument("--lang", "-l", choices=["ja", "en"], default="en", help="Digest language")
+    parser.add_argument("--count", "-n", type=int, default=None,
+                        help="Stories to include (default: 8 daily, 15 weekly)")
+    parser.add_argument("--source-lang", choices=["ja", "en"], default=None,
+                        help="Only use feeds in this language (default: all)")
+    parser.add_argument("--test", action="store_true", help="Test mode: preview without saving")
+    parser.add_argument("--model", "-m", default=None,
+                        help="Ollama model for every task (default: config/models.json)")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Regenerate even if an identical request is in the LLM cache")
+    args = parser.parse_args()
+
+    get_router().set_model(args.model)
+    if args.no_llm_cache:
+        get_client().read_cache = False
+
+    print(f"Building {args.period} digest...", file=sys.stderr)
+    path = generate_digest(period=args.period, lang=args.lang, count=args.count, test=args.test,
+                           source_lang=args.source_lang)
+    if not path and not args.test:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Ollama Client - Shared, pooled HTTP client for the local Ollama server.
+
+All tools go through one OllamaClient so that:
+  - TCP connections are kept alive and reused across a batch
+  - every request carries the same `keep_alive`, keeping the model resident
+  - 5xx responses and dropped connections are retried with backoff
+  - the model that was pre-warmed is the model that generates
+  - completed generations are stored in the LLM cache (llm_cache.py) and
+    identical requests are answered from it without touching the GPU;
+    only responses Ollama finished (done_reason "stop") are stored, and
+    callers drop ones that fail to parse with client.forget(text)
+
+Configuration (environment):
+  OLLAMA_HOST        Server base URL (default: http://127.0.0.1:11434)
+  OLLAMA_MODEL       Default model (default: llama3.3:70b-instruct-q4_K_M)
+  OLLAMA_KEEP_ALIVE  How long Ollama keeps the model loaded (default: 30m)
+  OLLAMA_NUM_CTX     Context window for every request (default: 8192); one
+                     value everywhere, since a change makes Ollama reload
+  OLLAMA_CACHE       Set to 0 to disable the raw response cache
+
+Usage:
+  from ollama_client import get_client
+  client = get_client()
+  client.set_model("qwen3:32b")      # e.g. from --model
+  client.prewarm()
+  text = client.generate(prompt, options={"num_predict": 4096})
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+
+from llm_cache import LLMCache, request_key
+from metrics import emit, ollama_fields
+from ollama_stream import read_stream
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")
+DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.3:70b-instruct-q4_K_M")
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+NUM_CTX = int(os.environ.get("OLLAMA_NUM_CTX", 8192))
+CACHE_ENABLED = os.environ.get("OLLAMA_CACHE", "1") != "0"
+
+# Errors that mean the connection (not the request) is bad and a retry may succeed
+RETRYABLE_ERRORS = (
+    ConnectionResetError,
+    ConnectionRefusedError,
+    BrokenPipeError,
+    http.client.RemoteDisconnected,
+    http.client.IncompleteRead,
+)
+
+
+class OllamaError(RuntimeError):
+    """Raised when Ollama returns an error or cannot be reached."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class OllamaClient:
+    """Thread-safe Ollama API client with a keep-alive connection pool."""
+
+    def __init__(self, host: str = OLLAMA_HOST, model: str = DEFAULT_MODEL,
+                 keep_alive: str | int = KEEP_ALIVE, num_ctx: int = NUM_CTX, pool_size: int = 4,
+                 retries: int = 3, backoff: float = 2.0, cache: LLMCache | None = None):
+        parsed = urllib.parse.urlsplit(host if "://" in host else f"http://{host}")
+        self.scheme = parsed.scheme
+        self.hostname = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 11434
+        self.model = model
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.read_cache = True  # False: always regenerate, but still store results
+        self._recent: dict[str, str] = {}  # response digest -> cache key, for forget()
+        self._recent_lock = threading.Lock()
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.scheme}://{self.hostname}:{self.port}"
+
+    def set_model(self, model: str | None) -> None:
+        """Switch the default model (no-op for None, so `--model` can pass through)."""
+        if model:
+            self.model = model
+
+    # -- connection pool -------------------------------------------------
+
+    def _acquire(self, timeout: float) -> http.client.HTTPConnection:
+        try:
+            conn = self._pool.get_nowait()
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            return conn
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            return cls(self.hostname, self.port, timeout=timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # -- requests --------------------------------------------------------
+
+    def _open(self, path: str, payload: dict, timeout: float):
+        """Send a POST and return (conn, response), retrying transient failures."""
+        body = json.dumps(payload).encode()
+        attempt = 0
+        while True:
+            conn = self._acquire(timeout)
+            reused = conn.sock is not None
+            try:
+                conn.request("POST", path, body=body,
+                             headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+            except RETRYABLE_ERRORS as e:
+                conn.close()
+                if reused:
+                    # Idle keep-alive connection was dropped by the server; retry at once
+                    continue
+                error = OllamaError(f"connection error: {e}")
+            else:
+                if resp.status < 500:
+                    return conn, resp
+                detail = resp.read()[:200].decode(errors="ignore")
+                conn.close()
+                error = OllamaError(f"HTTP {resp.status}: {detail}", status=resp.status)
+
+            attempt += 1
+            if attempt > self.retries:
+                raise error
+            delay = self.backoff * (2 ** (attempt - 1))
+            print(f"  Ollama request failed ({error}), retrying in {delay:.0f}s "
+                  f"({attempt}/{self.retries})", file=sys.stderr)
+            time.sleep(delay)
+
+    def post(self, path: str, payload: dict, timeout: float = 600) -> dict:
+        """POST a non-streaming request and return the decoded JSON response."""
+        conn, resp = self._open(path, payload, timeout)
+        try:
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        if resp.status != 200:
+            conn.close()
+            raise OllamaError(f"HTTP {resp.status}: {data[:200].decode(errors='ignore')}",
+                              status=resp.status)
+        self._release(conn)
+        result = json.loads(data.decode())
+        if "error" in result:
+            raise OllamaError(result["error"])
+        return result
+
+    def generate(self, prompt: str, options: dict | None = None, model: str | None = None,
+                 timeout: float = 600, stream: bool = False, stall_timeout: float = 60,
+                 label: str = "", stats: dict | None = None, expect_json: bool = True,
+                 **extra) -> str:
+        """Run /api/generate and return the response text.
+
+        With `stream=True`, tokens are consumed as they arrive (see
+        ollama_stream.read_stream); `timeout` then bounds the wait for the
+        first token and `stall_timeout` any later gap. A stream that is
+        `expect_json` ends as soon as its JSON object closes; pass False for
+        plain text (markdown may contain braces). Identical requests
+        are answered from the LLM cache when one is configured. A `stats`
+        dict, if given, receives Ollama's counters (see metrics.ollama_fields).
+        """
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": {"num_ctx": self.num_ctx, **(options or {})},
+            **extra,
+        }
+        start = time.perf_counter()
+        info = {"model": payload["model"], "label": label, "stream": stream}
+        if self.cache and self.read_cache:
+            cached = self.cache.get(payload)
+            if cached is not None:
+                print(f"  LLM cache hit{' (' + label + ')' if label else ''}", file=sys.stderr)
+                emit("ollama.generate", time.perf_counter() - start, cached=True, **info)
+                if stats is not None:
+                    stats["cached"] = True
+                self._remember(cached, payload)
+                return cached
+
+        try:
+            text, final = self._generate(payload, timeout, stream, stall_timeout, label,
+                                         stop_on_close=expect_json)
+        except Exception as e:
+            emit("ollama.generate", time.perf_counter() - start, ok=False,
+                 error=f"{type(e).__name__}: {e}"[:200], **info)
+            raise
+        # A stream cut short at the closing brace has no final chunk with counters
+        counters = ollama_fields(final)
+        if stats is not None:
+            stats.update(counters)
+        emit("ollama.generate", time.perf_counter() - start, cached=False,
+             chars=len(text), stopped_early=stream and not final, **info, **counters)
+        # Streams cut short at the closing brace or by num_predict are not replayed later
+        if final.get("done_reason") == "length":
+            print(f"  Response hit num_predict{' (' + label + ')' if label else ''}, not cached",
+                  file=sys.stderr)
+        elif self.cache and text and final.get("done_reason") == "stop":
+            self.cache.put(payload, text)
+            self._remember(text, payload)
+        return text
+
+    def _remember(self, text: str, payload: dict) -> None:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._recent_lock:
+            self._recent[digest] = request_key(payload)
+            if len(self._recent) > 256:
+                del self._recent[next(iter(self._recent))]
+
+    def forget(self, text: str) -> None:
+        """Drop a response returned by generate() from the LLM cache.
+
+        Called when the response turns out to be unusable (e.g. unparseable
+        JSON), so the next run regenerates it instead of replaying it.
+        """
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._recent_lock:
+            key = self._recent.pop(digest, None)
+        if key and self.cache:
+            self.cache.delete(key)
+
+    def _generate(self, payload: dict, timeout: float, stream: bool, stall_timeout: float,
+                  label: str, stop_on_close: bool = False) -> tuple[str, dict]:
+        """Return (response text, final response JSON with Ollama's counters)."""
+        if not stream:
+            result = self.post("/api/generate", payload, timeout=timeout)
+            return result.get("response", ""), result
+
+        conn, resp = self._open("/api/generate", payload, timeout)
+        finished = False
+        try:
+            if resp.status != 200:
+                raise OllamaError(f"HTTP {resp.status}: {resp.read()[:200].decode(errors='ignore')}",
+                                  status=resp.status)
+            text, final = read_stream(resp, conn.sock, first_token_timeout=timeout,
+                                      stall_timeout=stall_timeout, stop_on_close=stop_on_close,
+                                      label=label)
+            if final:
+                # Drain the chunked terminator so the connection can be reused
+                resp.read()
+                finished = True
+            return text, final
+        finally:
+            if finished:
+                self._release(conn)
+            else:
+                # Dropping the connection mid-stream makes Ollama cancel the generation
+                conn.close()
+
+    def prewarm(self, model: str | None = None, timeout: float = 300) -> None:
+        """Load `model` (default: the client's model) and keep it resident."""
+        self.post("/api/generate", {
+            "model": model or self.model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"num_ctx": self.num_ctx},
+        }, timeout=timeout)
+
+    def prime(self, system: str, model: str | None = None, timeout: float = 600) -> dict:
+        """Evaluate a system prompt into Ollama's KV cache; return its counters.
+
+        Later requests that start with the same system prompt reuse the
+        cached prefix instead of evaluating it again, so the returned
+        prompt_eval_count/prompt_eval_s approximate the cost saved per request.
+        """
+        result = self.post("/api/generate", {
+            "model": model or self.model,
+            "system": system,
+            "prompt": ".",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"num_ctx": self.num_ctx, "num_predict": 1},
+        }, timeout=timeout)
+        return ollama_fields(result)
+
+    def unload(self, model: str | None = None) -> None:
+        """Ask Ollama to evict `model` from memory now."""
+        self.post("/api/generate", {
+            "model": model or self.model,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": 0,
+        }, timeout=60)
+
+
+_client: OllamaClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OllamaClient:
+    """Return the process-wide shared client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient(cache=LLMCache() if CACHE_ENABLED else None)
+        return _client
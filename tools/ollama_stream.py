@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Ollama Streaming - Consume /api/generate NDJSON chunks as they arrive.
+
+Reports tokens/sec while the model is decoding, notices when the article
+JSON fields (title, description, tags, body) are complete, and aborts when
+the server stops sending tokens. The stream is read to Ollama's done chunk;
+with `stop_on_close=True` (JSON responses only) it hangs up as soon as the
+top-level JSON object closes instead of waiting out the rest of the
+num_predict budget.
+
+Normally used through OllamaClient.generate(..., stream=True).
+"""
+
+import json
+import socket
+import sys
+import time
+
+from json_extract import JsonExtractor
+
+
+class StreamStalled(RuntimeError):
+    """Raised when no tokens arrive within the stall timeout."""
+
+    def __init__(self, message: str, partial: str = ""):
+        super().__init__(message)
+        self.partial = partial
+
+
+def read_stream(resp, sock, first_token_timeout: float = 600, stall_timeout: float = 60,
+                stop_on_close: bool = False, progress_interval: float = 10.0,
+                label: str = "") -> tuple[str, dict]:
+    """Read an Ollama NDJSON response; return (text, final_chunk).
+
+    `first_token_timeout` covers model load and prompt evaluation; once tokens
+    flow, any gap longer than `stall_timeout` aborts with StreamStalled.
+    `stop_on_close` ends the read once a JSON object has closed; leave it
+    off for plain text, where braces can appear anywhere.
+    `final_chunk` is the `done` chunk with Ollama's timing counters, or {}
+    when the stream was cut short (the caller must then drop the connection
+    so Ollama cancels the generation).
+    """
+    tracker = JsonExtractor()
+    parts: list[str] = []
+    tokens = 0
+    start = time.time()
+    first_token_at = None
+    last_report = start
+    final: dict = {}
+    prefix = f"  [stream{' ' + label if label else ''}]"
+    sock.settimeout(first_token_timeout)
+
+    while True:
+        try:
+            line = resp.readline()
+        except socket.timeout:
+            waited = stall_timeout if first_token_at else first_token_timeout
+            raise StreamStalled(f"no tokens for {waited:.0f}s after {tokens} tokens",
+                                partial="".join(parts))
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        chunk = json.loads(line)
+        if "error" in chunk:
+            raise RuntimeError(chunk["error"])
+        piece = chunk.get("response", "")
+        if piece:
+            if first_token_at is None:
+                first_token_at = time.time()
+                sock.settimeout(stall_timeout)
+            parts.append(piece)
+            tokens += 1
+            for field in tracker.feed(piece):
+                print(f"{prefix} field complete: {field} ({tokens} tokens)", file=sys.stderr)
+
+        now = time.time()
+        if progress_interval and now - last_report >= progress_interval and first_token_at:
+            rate = tokens / max(now - first_token_at, 1e-6)
+            print(f"{prefix} {tokens} tokens, {rate:.1f} tok/s", file=sys.stderr)
+            last_report = now
+
+        if chunk.get("done"):
+            final = chunk
+            break
+        if stop_on_close and tracker.closed:
+            print(f"{prefix} JSON object closed at {tokens} tokens, stopping early",
+                  file=sys.stderr)
+            break
+
+    if first_token_at:
+        elapsed = time.time() - first_token_at
+        print(f"{prefix} done: {tokens} tokens in {elapsed:.1f}s "
+              f"({tokens / max(elapsed, 1e-6):.1f} tok/s, "
+              f"first token after {first_token_at - start:.1f}s)", file=sys.stderr)
+    return "".join(parts), final
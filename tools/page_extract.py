@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Page Extract - Byte-capped, streaming main-content extraction for web pages.
+
+fetch_main_text() reads the response in chunks up to a hard byte cap and
+feeds them to an event parser (lxml when installed, the stdlib html.parser
+otherwise) without building a document tree. Reading stops as soon as
+enough prose has been seen for the character budget, or once an
+<article>/<main> element with a real article's worth of prose has closed
+(the comment thread after it is never downloaded).
+
+Text is collected per block (p, li, h1-h6, pre, ...). Each block's length,
+discounted by the share of it that is link text, is credited to its parent
+element and half of it to the grandparent; <article>/<main> and content-like
+class names weigh more, comment/sidebar/menu-like ones less. The best
+scoring container is the main content, and its non-link-heavy blocks are
+returned in document order. Blocks inside comment/sidebar-like containers
+never score, however much text they hold.
+
+Usage:
+  from page_extract import fetch_main_text
+  text = fetch_main_text(url, max_chars=5000)
+
+  python page_extract.py https://example.com/post   # Print the extracted text
+  python page_extract.py --file page.html --max-chars 2000
+"""
+
+import argparse
+import codecs
+import re
+import sys
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable
+
+try:
+    from lxml import etree
+except ImportError:  # html.parser fallback: same results, a few times slower
+    etree = None
+
+MAX_BYTES = 2_000_000   # never read more than this from one page
+CHUNK_SIZE = 64 * 1024
+EARLY_STOP_FACTOR = 3   # stop reading after this many budgets of prose
+USER_AGENT = "Mozilla/5.0 (compatible; BlogSummarizer/1.0)"
+TRUNCATED_MARK = "\n[...truncated]"
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer",
+             "aside", "form", "iframe", "button", "select", "head"}
+PARAGRAPH_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote",
+                  "td", "th", "dd", "dt", "figcaption"}
+BLOCK_TAGS = PARAGRAPH_TAGS | {"div", "section", "article", "main", "ul", "ol", "table",
+                               "tr", "br", "hr", "body"}
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "area", "base", "col", "embed",
+             "source", "track", "wbr", "param"}
+
+POSITIVE = re.compile(r"article|post|content|entry|story|text|main", re.I)
+NEGATIVE = re.compile(r"comment|sidebar|footer|menu|nav|related|share|social|promo|advert|"
+                      r"banner|cookie|subscribe|widget|breadcrumb", re.I)
+MIN_BLOCK_CHARS = 25
+ARTICLE_DONE_CHARS = 500  # prose in a closed <article>/<main> that ends the read
+MAX_LINK_DENSITY = 0.5
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+
+class _Element:
+    __slots__ = ("id", "tag", "weight", "skip")
+
+    def __init__(self, id: int, tag: str, weight: float, skip: bool):
+        self.id = id
+        self.tag = tag
+        self.weight = weight
+        self.skip = skip
+
+
+class MainTextCollector:
+    """Parser target: turns start/end/data events into scored text blocks."""
+
+    def __init__(self, budget: int = 0):
+        self.budget = budget  # prose chars after which `enough` turns true (0: never)
+        self.blocks: list[tuple[str, int, tuple[int, ...]]] = []  # (text, link chars, element path)
+        self.scores: dict[int, float] = {}
+        self.weights: dict[int, float] = {}
+        self.prose_chars = 0
+        self._stack: list[_Element] = []
+        self._parts: list[str] = []
+        self._link_chars = 0
+        self._in_link = 0
+        self._next_id = 0
+        self._article_start: dict[int, int] = {}  # <article>/<main> id → prose_chars at open
+        self.article_done = False
+
+    @property
+    def enough(self) -> bool:
+        return self.article_done or (bool(self.budget) and self.prose_chars >= self.budget)
+
+    # -- parser target interface (lxml calls these directly) -------------
+
+    def start(self, tag: str, attrs: dict) -> None:
+        tag = tag.lower()
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in VOID_TAGS:
+            return
+        parent = self._stack[-1] if self._stack else None
+        names = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+        weight = 1.5 if tag in ("article", "main") else 1.25 if POSITIVE.search(names) else 1.0
+        if NEGATIVE.search(names):
+            weight = 0.2
+        if parent and parent.weight < 1:
+            weight *= parent.weight  # stays penalized inside a comment section
+        skip = tag in SKIP_TAGS or bool(parent and parent.skip)
+        if tag == "a" and not skip:
+            self._in_link += 1
+        if tag in ("article", "main") and not skip:
+            self._article_start[self._next_id] = self.prose_chars
+        self._stack.append(_Element(self._next_id, tag, weight, skip))
+        self.weights[self._next_id] = weight
+        self._next_id += 1
+
+    def end(self, tag: str) -> None:
+        tag = tag.lower()
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                break
+        else:
+            return  # stray end tag
+        if tag in BLOCK_TAGS:
+            self._flush()
+        for element in self._stack[i:]:
+            if element.tag == "a" and not element.skip:
+                self._in_link -= 1
+            start = self._article_start.pop(element.id, None)
+            if start is not None and self.prose_chars - start >= ARTICLE_DONE_CHARS:
+                self.article_done = True
+        del self._stack[i:]
+
+    def data(self, text: str) -> None:
+        if self._stack and self._stack[-1].skip:
+            return
+        self._parts.append(text)
+        if self._in_link:
+            self._link_chars += len(text.strip())
+
+    def close(self) -> "MainTextCollector":
+        self._flush()
+        return self
+
+    # -- scoring ---------------------------------------------------------
+
+    def _flush(self) -> None:
+        if not self._parts:
+            return
+        text = " ".join("".join(self._parts).split())
+        link_chars = min(self._link_chars, len(text))
+        self._parts = []
+        self._link_chars = 0
+        if not text:
+            return
+        path = tuple(element.id for element in self._stack)
+        self.blocks.append((text, link_chars, path))
+        if len(text) < MIN_BLOCK_CHARS or (self._stack and self._stack[-1].weight < 1):
+            # Comment threads and sidebars neither score nor count towards the budget
+            return
+        density = link_chars / len(text)
+        if density < MAX_LINK_DENSITY:
+            self.prose_chars += len(text)
+        score = len(text) * (1 - density)
+        # A <p> credits its parent; text directly in a <div> credits the div itself
+        containers = path[:-1] if self._stack and self._stack[-1].tag in PARAGRAPH_TAGS else path
+        for share, element_id in zip((1.0, 0.5), reversed(containers)):
+            self.scores[element_id] = self.scores.get(element_id, 0.0) + score * share
+
+    def main_text(self, max_chars: int = 5000) -> str:
+        """Text of the best container, capped at `max_chars` (marked when cut)."""
+        self._flush()
+        best = max(self.scores, key=lambda i: self.scores[i] * self.weights.get(i, 1.0), default=None)
+        lines = [text for text, link_chars, path in self.blocks
+                 if (best is None or best in path) and link_chars / len(text) < MAX_LINK_DENSITY]
+        if best is not None and sum(len(line) for line in lines) < 200:
+            # Winner too thin to be the article (e.g. a teaser box); take all prose
+            lines = [text for text, link_chars, _ in self.blocks
+                     if link_chars / len(text) < MAX_LINK_DENSITY]
+        text = "\n".join(lines)
+        if len(text) > max_chars:
+            text = text[:max_chars] + TRUNCATED_MARK
+        return text
+
+
+class _StdlibParser(HTMLParser):
+    """html.parser adapter that decodes bytes incrementally and forwards events."""
+
+    def __init__(self, target: MainTextCollector, charset: str):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+        try:
+            self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data: bytes) -> None:
+        super().feed(self._decoder.decode(data))
+
+    def close(self) -> None:
+        super().feed(self._decoder.decode(b"", final=True))
+        super().close()
+        self.target.close()
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        if tag not in VOID_TAGS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def sniff_charset(head: bytes) -> str:
+    m = _META_CHARSET.search(head[:4096])
+    return m.group(1).decode("ascii").lower() if m else "utf-8"
+
+
+def _make_parser(target: MainTextCollector, charset: str):
+    if etree is not None:
+        try:
+            return etree.HTMLParser(target=target, encoding=charset, recover=True)
+        except LookupError:
+            return etree.HTMLParser(target=target, recover=True)
+    return _StdlibParser(target, charset)
+
+
+def extract(chunks: Iterable[bytes], max_chars: int = 5000, charset: str | None = None,
+            max_bytes: int = MAX_BYTES) -> str:
+    """Extract the main text from an iterable of HTML byte chunks.
+
+    Stops consuming `chunks` after `max_bytes` or once enough prose has been
+    seen for `max_chars`.
+    """
+    collector = MainTextCollector(budget=max_chars * EARLY_STOP_FACTOR)
+    parser = None
+    read = 0
+    for chunk in chunks:
+        chunk = chunk[:max_bytes - read]
+        if parser is None:
+            parser = _make_parser(collector, charset or sniff_charset(chunk))
+        read += len(chunk)
+        parser.feed(chunk)
+        if collector.enough or read >= max_bytes:
+            break
+    if parser is not None:
+        parser.close()
+    return collector.main_text(max_chars)
+
+
+def extract_main_text(html: str | bytes, max_chars: int = 5000) -> str:
+    """Extract the main text from a whole document already in memory."""
+    data = html.encode("utf-8") if isinstance(html, str) else html
+    charset = "utf-8" if isinstance(html, str) else None
+    return extract((data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)),
+                   max_chars=max_chars, charset=charset)
+
+
+def fetch_main_text(url: str, max_chars: int = 5000, max_bytes: int = MAX_BYTES,
+                    timeout: float = 15) -> str:
+    """Download `url` (at most `max_bytes`) and return its main text."""
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return extract(iter(lambda: resp.read(CHUNK_SIZE), b""), max_chars=max_chars,
+                       charset=resp.headers.get_content_charset(), max_bytes=max_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the main text of a web page")
+    parser.add_argument("url", nargs="?", help="Page URL")
+    parser.add_argument("--file", type=Path, help="Read a saved HTML file instead")
+    parser.add_argument("--max-chars", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.file:
+        text = extract_main_text(args.file.read_bytes(), max_chars=args.max_chars)
+    elif args.url:
+        text = fetch_main_text(args.url, max_chars=args.max_chars)
+    else:
+        parser.print_help()
+        sys.exit(1)
+    print(text)
+    print(f"\n[{len(text)} chars, parser: {'lxml' if etree is not None else 'html.parser'}]",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
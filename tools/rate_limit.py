@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Rate Limit - Per-host token buckets shared across runs.
+
+Call `acquire(url)` right before an outgoing request. It returns at once
+while the host's bucket has tokens and only sleeps when the host is
+actually being hit faster than its limit. Bucket levels are persisted to
+tools/cache/rate_limits.json (under a file lock), so back-to-back runs of
+auto_publish or generate.py respect the same budget.
+
+Usage:
+  from rate_limit import acquire
+  acquire("https://html.duckduckgo.com/html/?q=...")
+  urllib.request.urlopen(...)
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX: fall back to in-process locking only
+    fcntl = None
+
+TOOLS_DIR = Path(__file__).resolve().parent
+CACHE_DIR = TOOLS_DIR / "cache"
+STATE_FILE = CACHE_DIR / "rate_limits.json"
+LOCK_FILE = CACHE_DIR / "rate_limits.lock"
+
+# requests per minute (refill rate) and burst (bucket size) per host
+HOST_LIMITS = {
+    "html.duckduckgo.com": {"per_minute": 1.0, "burst": 3},
+}
+DEFAULT_LIMIT = {"per_minute": 60.0, "burst": 5}
+
+_thread_lock = threading.Lock()
+
+
+def host_of(url: str) -> str:
+    """Return the lowercase host for a URL (or the argument if it is a bare host)."""
+    host = urllib.parse.urlsplit(url).hostname if "://" in url else url
+    return (host or url).lower()
+
+
+def limit_for(host: str) -> dict:
+    return HOST_LIMITS.get(host, DEFAULT_LIMIT)
+
+
+class _StateLock:
+    """Serialize bucket updates across threads and processes."""
+
+    def __enter__(self):
+        _thread_lock.acquire()
+        self._fh = None
+        if fcntl:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._fh = open(LOCK_FILE, "w")
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fh:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+        _thread_lock.release()
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(STATE_FILE)
+
+
+def _take(host: str) -> float:
+    """Take a token if available; return 0, or the seconds until one will be."""
+    limit = limit_for(host)
+    rate = limit["per_minute"] / 60.0
+    burst = float(limit["burst"])
+    now = time.time()
+
+    with _StateLock():
+        state = _load_state()
+        bucket = state.get(host, {"tokens": burst, "updated": now})
+        tokens = min(burst, bucket["tokens"] + max(0.0, now - bucket["updated"]) * rate)
+        if tokens >= 1.0 - 1e-6:
+            state[host] = {"tokens": max(0.0, tokens - 1.0), "updated": now}
+            wait = 0.0
+        else:
+            state[host] = {"tokens": tokens, "updated": now}
+            wait = (1.0 - tokens) / rate
+        _save_state(state)
+    return wait
+
+
+def acquire(url: str) -> float:
+    """Block until a request to `url`'s host is allowed; return seconds waited."""
+    host = host_of(url)
+    waited = 0.0
+    while True:
+        wait = _take(host)
+        if wait <= 0:
+            return waited
+        print(f"  Rate limit: waiting {wait:.0f}s for {host}", file=sys.stderr)
+        time.sleep(wait)
+        waited += wait
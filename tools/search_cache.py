@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Search Cache - Persistent, TTL-bound LRU cache for web search results.
+
+Keyed by normalized (query, num_results) and stored in SQLite under
+tools/cache/, so re-runs, retries after an Ollama failure and ja/en pairs
+of the same keyword reuse results instead of hitting DuckDuckGo again.
+
+Usage:
+  python search_cache.py --stats      # Show cache size and age
+  python search_cache.py --clear      # Drop all cached results
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+CACHE_DIR = TOOLS_DIR / "cache"
+SEARCH_CACHE_DB = CACHE_DIR / "search.sqlite3"
+
+DEFAULT_TTL = 3 * 24 * 3600  # 3 days: search results feed "latest info" prompts
+DEFAULT_MAX_ENTRIES = 2000
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """SQLite-backed cache of parsed search snippets with TTL and LRU eviction."""
+
+    def __init__(self, path: Path = SEARCH_CACHE_DB, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS search (
+                    query TEXT NOT NULL,
+                    num_results INTEGER NOT NULL,
+                    results TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (query, num_results)
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS search_accessed ON search (accessed)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, query: str, num_results: int) -> list[str] | None:
+        """Return cached snippets, or None if missing or expired."""
+        key = _normalize(query)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT results, created FROM search WHERE query = ? AND num_results = ?",
+                (key, num_results),
+            ).fetchone()
+            if not row:
+                return None
+            results, created = row
+            if now - created > self.ttl:
+                db.execute("DELETE FROM search WHERE query = ? AND num_results = ?", (key, num_results))
+                db.commit()
+                return None
+            db.execute("UPDATE search SET accessed = ? WHERE query = ? AND num_results = ?",
+                       (now, key, num_results))
+            db.commit()
+        return json.loads(results)
+
+    def put(self, query: str, num_results: int, results: list[str]) -> None:
+        """Store snippets and evict the least recently used entries over the cap."""
+        key = _normalize(query)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO search (query, num_results, results, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, num_results, json.dumps(results, ensure_ascii=False), now, now),
+            )
+            db.execute("DELETE FROM search WHERE created < ?", (now - self.ttl,))
+            (count,) = db.execute("SELECT COUNT(*) FROM search").fetchone()
+            if count > self.max_entries:
+                db.execute(
+                    "DELETE FROM search WHERE rowid IN "
+                    "(SELECT rowid FROM search ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM search")
+            self._db().commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, oldest = self._db().execute(
+                "SELECT COUNT(*), MIN(created) FROM search").fetchone()
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "oldest_age_hours": round((time.time() - oldest) / 3600, 1) if oldest else None,
+            "ttl_hours": round(self.ttl / 3600, 1),
+        }
+
+
+_cache: SearchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide shared cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache()
+        return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the web search cache")
+    parser.add_argument("--stats", action="store_true", help="Show cache statistics")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached results")
+    args = parser.parse_args()
+
+    cache = get_search_cache()
+    if args.clear:
+        cache.clear()
+        print("Search cache cleared.")
+    print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Similarity - MinHash/LSH index for near-duplicate topic detection.
+
+Titles are NFKC-normalized and shingled per script: Latin words become
+character 3-grams (so word order and "release"/"released" matter little),
+CJK runs become character 2-grams (Japanese has no spaces to split on).
+Each shingle set gets a MinHash signature; LSH banding narrows a query to a
+handful of candidates, which are then checked by exact Jaccard similarity
+and publication date.
+
+Usage:
+  index = SimilarityIndex()
+  index.add("OpenAI releases GPT-5", date=datetime(...))
+  index.query("GPT-5 released by OpenAI", threshold=0.5, since=cutoff)
+  # -> [(0.846, "OpenAI releases GPT-5")]
+"""
+
+import hashlib
+import re
+import struct
+import unicodedata
+from datetime import datetime
+from functools import lru_cache
+
+NUM_PERM = 60
+BANDS = 20
+ROWS = NUM_PERM // BANDS  # 3 rows/band: candidate threshold ~ (1/20)^(1/3) = 0.37
+
+_HASH_BYTES = NUM_PERM * 4
+_UNPACK = struct.Struct(f"<{NUM_PERM}I").unpack
+_TOKEN = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+_LATIN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "the", "of", "by", "to", "in", "on", "for", "and", "is", "with", "how"}
+
+
+def shingles(text: str) -> frozenset[str]:
+    """Return the script-aware shingle set for a title or keyword."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    result = set()
+    for token in _TOKEN.findall(text):
+        if _LATIN.fullmatch(token):
+            if token in _STOPWORDS:
+                continue
+            if len(token) <= 3:
+                result.add(token)
+            else:
+                result.update(token[i:i + 3] for i in range(len(token) - 2))
+        elif len(token) == 1:
+            result.add(token)
+        else:
+            result.update(token[i:i + 2] for i in range(len(token) - 1))
+    return frozenset(result)
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_row(shingle: str) -> tuple[int, ...]:
+    # One XOF call yields all NUM_PERM independent 32-bit hashes of a shingle
+    return _UNPACK(hashlib.shake_128(shingle.encode()).digest(_HASH_BYTES))
+
+
+def minhash(shingle_set: frozenset[str]) -> tuple[int, ...]:
+    """MinHash signature: per permutation, the minimum 32-bit hash over shingles."""
+    if not shingle_set:
+        return (0,) * NUM_PERM
+    return tuple(map(min, zip(*map(_hash_row, shingle_set))))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class SimilarityIndex:
+    """In-memory LSH index over short texts with optional dates."""
+
+    def __init__(self):
+        self._items: list[tuple[str, frozenset[str], datetime | None]] = []
+        self._buckets: dict[tuple, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, text: str, date: datetime | None = None) -> None:
+        sh = shingles(text)
+        if not sh:
+            return
+        item_id = len(self._items)
+        self._items.append((text, sh, date))
+        sig = minhash(sh)
+        for band in range(BANDS):
+            key = (band,) + sig[band * ROWS:(band + 1) * ROWS]
+            self._buckets.setdefault(key, []).append(item_id)
+
+    def query(self, text: str, threshold: float = 0.5,
+              since: datetime | None = None) -> list[tuple[float, str]]:
+        """Return [(similarity, text)] of indexed items at or above `threshold`.
+
+        Items with a date before `since` are ignored; undated items always count.
+        """
+        sh = shingles(text)
+        if not sh:
+            return []
+        sig = minhash(sh)
+        candidates = set()
+        for band in range(BANDS):
+            key = (band,) + sig[band * ROWS:(band + 1) * ROWS]
+            candidates.update(self._buckets.get(key, ()))
+
+        matches = []
+        for item_id in candidates:
+            item_text, item_sh, item_date = self._items[item_id]
+            if since and item_date and item_date < since:
+                continue
+            score = jaccard(sh, item_sh)
+            if score >= threshold:
+                matches.append((round(score, 3), item_text))
+        matches.sort(reverse=True)
+        return matches
@@ -7,29 +7,36 @@ Usage:
   python summarize_news.py --count 2          # Generate 2 summary articles
   python summarize_news.py --test             # Test with 1 article (no save)
   python summarize_news.py --lang ja          # Force Japanese summary
+  python summarize_news.py --candidates 1     # Only try the top feed item
+
+Several top feed items (--candidates, default 5) are fetched at once, at
+most two per site, and the one whose page yields the most usable text,
+weighted by freshness and feed weight, is summarized. A paywalled or
+JS-only page then costs a fallback instead of the day's summary.
 """
 
 import argparse
 import json
 import re
 import sys
-import time
+import threading
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Error: beautifulsoup4 not installed. Run: pip install --user beautifulsoup4", file=sys.stderr)
-    sys.exit(1)
-
-try:
-    import feedparser
-except ImportError:
-    print("Error: feedparser not installed. Run: pip install --user feedparser", file=sys.stderr)
-    sys.exit(1)
+from content_index import record_article
+from feed_store import snapshot
+from generate import retry_title
+from job_ledger import JobLedger, job_key, reached, written_path
+from json_extract import extract_json
+from metrics import timed
+from model_router import get_router
+from ollama_client import get_client
+from page_extract import fetch_main_text
+from rate_limit import acquire, host_of
+from token_budget import ContextBudget
+from topic_discovery import compute_recency_score, parse_entry_date
 
 TOOLS_DIR = Path(__file__).resolve().parent
 CONFIG_DIR = TOOLS_DIR / "config"
@@ -37,8 +44,14 @@ FEEDS_CONFIG = CONFIG_DIR / "feeds.json"
 BLOG_ROOT = TOOLS_DIR.parent
 CONTENT_DIR = BLOG_ROOT / "content"
 
-OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
-MODEL = "llama3.3:70b-instruct-q4_K_M"
+STREAM_ENABLED = False
+SUMMARY_CANDIDATES = 5  # feed items fetched per summary; the best page wins
+FETCH_WORKERS = 4
+PER_HOST_FETCHES = 2
+MIN_TEXT_CHARS = 100
+SOURCE_MAX_CHARS = 20000  # extraction cap; the token budget trims further per prompt
+SUMMARY_PREDICT = 4096  # num_predict of summary calls; also kept free in the context window
+STALL_TIMEOUT = 60  # seconds without a token before a streamed generation is aborted
 
 JST = timezone(timedelta(hours=9))
 
@@ -89,95 +102,89 @@ Requirements:
 """
 
 
-def fetch_article_text(url: str, max_chars: int = 5000) -> str:
-    """Fetch article URL and extract main text content."""
+def fetch_article_text(url: str, max_chars: int = SOURCE_MAX_CHARS) -> str:
+    """Fetch article URL and extract its main text (see page_extract.py)."""
     try:
-        req = urllib.request.Request(url, headers={
-            "User-Agent": "Mozilla/5.0 (compatible; BlogSummarizer/1.0)"
-        })
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            html = resp.read().decode("utf-8", errors="ignore")
-
-        soup = BeautifulSoup(html, "html.parser")
-
-        # Remove script, style, nav, header, footer elements
-        for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
-            tag.decompose()
-
-        # Try to find main content area
-        main = soup.find("article") or soup.find("main") or soup.find(class_=re.compile(r"(article|post|content|entry)"))
-        if main:
-            text = main.get_text(separator="\n", strip=True)
-        else:
-            text = soup.get_text(separator="\n", strip=True)
-
-        # Clean up whitespace
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        text = "\n".join(lines)
-
-        # Truncate to max_chars
-        if len(text) > max_chars:
-            text = text[:max_chars] + "\n[...truncated]"
-
-        return text
+        acquire(url)
+        return fetch_main_text(url, max_chars=max_chars)
     except Exception as e:
         print(f"  Failed to fetch article: {e}", file=sys.stderr)
         return ""
 
 
-def call_ollama(prompt: str) -> str:
-    """Call Ollama API for text generation."""
-    data = json.dumps({
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"num_predict": 4096, "temperature": 0.5},
-    }).encode()
-
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=data,
-        headers={"Content-Type": "application/json"},
-    )
+def text_quality(text: str) -> float:
+    """Score extracted text 0-1: long, sentence-like text beats menus and teasers."""
+    if len(text) < MIN_TEXT_CHARS:
+        return 0.0
+    lines = text.splitlines()
+    # A line of prose is ~30 CJK characters or ~60 Latin ones
+    prose = sum(len(line) for line in lines
+                if len(line) >= (30 if re.search(r"[\u3040-\u9fff]", line) else 60))
+    return round(min(1.0, len(text) / 3000) * (0.3 + 0.7 * prose / len(text)), 3)
 
-    with urllib.request.urlopen(req, timeout=600) as resp:
-        result = json.loads(resp.read().decode())
-        return result.get("response", "")
 
+def fetch_candidates(articles: list[dict], max_workers: int = FETCH_WORKERS,
+                     per_host: int = PER_HOST_FETCHES) -> list[tuple[dict, str, float]]:
+    """Fetch several articles at once; return (article, text, score), best first.
 
-def extract_json(text: str) -> dict:
-    """Extract article fields from LLM response using regex."""
-    result = {}
+    At most `per_host` pages are fetched from one site at a time (on top of
+    the rate limiter). Articles without enough text are dropped.
+    """
+    if not articles:
+        return []
+    slots = {host: threading.Semaphore(per_host) for host in {host_of(a["url"]) for a in articles}}
+
+    def fetch(article: dict) -> str:
+        with slots[host_of(article["url"])]:
+            with timed("page_fetch", url=article["url"], candidate=True) as m:
+                text = fetch_article_text(article["url"])
+                m["chars"] = len(text)
+        return text
 
-    m = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
-    if m:
-        result["title"] = m.group(1)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(articles))) as pool:
+        texts = list(pool.map(fetch, articles))
 
-    m = re.search(r'"description"\s*:\s*"((?:[^"\\]|\\.)*)"', text)
-    if m:
-        result["description"] = m.group(1)
+    ranked = []
+    for article, text in zip(articles, texts):
+        quality = text_quality(text)
+        if not quality:
+            print(f"  Candidate skipped, not enough text: {article['url']}", file=sys.stderr)
+            continue
+        freshness = compute_recency_score(parse_entry_date(article))
+        score = article.get("weight", 1.0) * (0.6 * quality + 0.4 * freshness)
+        ranked.append((article, text, score))
+    ranked.sort(key=lambda item: item[2], reverse=True)
+    return ranked
 
-    m = re.search(r'"tags"\s*:\s*\[(.*?)\]', text, re.DOTALL)
-    if m:
-        result["tags"] = re.findall(r'"((?:[^"\\]|\\.)*)"', m.group(1))
 
-    m = re.search(r'"body"\s*:\s*"', text)
-    if m:
-        body = text[m.end():]
-        body = body.rstrip()
-        if body.endswith("}"):
-            body = body[:-1].rstrip()
-        if body.endswith("}"):
-            body = body[:-1].rstrip()
-        if body.endswith('"'):
-            body = body[:-1]
-        body = body.replace("\\n", "\n").replace("\\t", "\t").replace('\\"', '"').replace("\\\\", "\\")
-        result["body"] = body
+def best_articles(count: int = 1, lang: str | None = None,
+                  candidates: int | None = None) -> list[tuple[dict, str]]:
+    """Pick the `count` best of the top `candidates` feed items, with their text."""
+    articles = []
+    for article in get_top_articles(count=max(count, candidates or SUMMARY_CANDIDATES), lang=lang):
+        # The same story often appears in more than one feed
+        if all(a["url"] != article["url"] for a in articles):
+            articles.append(article)
+    if not articles:
+        return []
+    print(f"  Fetching {len(articles)} candidate articles...")
+    ranked = fetch_candidates(articles)
+    for article, _, score in ranked[:count]:
+        print(f"  Picked ({score:.2f}): {article['title'][:60]}")
+    return [(article, text) for article, text, _ in ranked[:count]]
 
-    if not result.get("title") and not result.get("body"):
-        raise ValueError(f"Could not extract fields from response:\n{text[:500]}")
 
-    return result
+def call_ollama(prompt: str, expect_json: bool = True) -> str:
+    """Call Ollama API for text generation."""
+    return get_router().generate(
+        "summary",
+        prompt,
+        options={"num_predict": SUMMARY_PREDICT, "temperature": 0.5},
+        timeout=600,
+        stream=STREAM_ENABLED,
+        stall_timeout=STALL_TIMEOUT,
+        expect_json=expect_json,
+    )
 
 
 def get_top_articles(count: int = 2, lang: str | None = None) -> list[dict]:
@@ -185,27 +192,24 @@ def get_top_articles(count: int = 2, lang: str | None = None) -> list[dict]:
     with open(FEEDS_CONFIG, encoding="utf-8") as f:
         config = json.load(f)
 
+    feed_configs = [fc for fc in config["feeds"] if not lang or fc["language"] == lang]
+    feed_entries = snapshot(feed_configs)
+
     articles = []
-    for feed_config in config["feeds"]:
-        if lang and feed_config["language"] != lang:
-            continue
-        try:
-            feed = feedparser.parse(feed_config["url"])
-            for entry in feed.entries[:5]:
-                link = entry.get("link", "")
-                title = entry.get("title", "")
-                if link and title:
-                    articles.append({
-                        "title": title,
-                        "url": link,
-                        "lang": feed_config["language"],
-                        "category": feed_config["category"],
-                        "feed": feed_config["name"],
-                        "weight": feed_config.get("weight", 1.0),
-                    })
-        except Exception as e:
-            print(f"  Feed error ({feed_config['name']}): {e}", file=sys.stderr)
-        time.sleep(1)
+    for feed_config in feed_configs:
+        for entry in feed_entries.get(feed_config["name"], [])[:5]:
+            link = entry.get("link", "")
+            title = entry.get("title", "")
+            if link and title:
+                articles.append({
+                    "title": title,
+                    "url": link,
+                    "lang": feed_config["language"],
+                    "category": feed_config["category"],
+                    "feed": feed_config["name"],
+                    "weight": feed_config.get("weight", 1.0),
+                    "published": entry.get("published"),
+                })
 
     # Sort by weight (higher = better source)
     articles.sort(key=lambda x: x["weight"], reverse=True)
@@ -226,35 +230,110 @@ def slugify(text: str) -> str:
         return slug[:80]
 
 
-def generate_summary(article: dict, test: bool = False) -> Path | None:
-    """Generate a summary article from a source article."""
+def prefetch_summary(article: dict, ledger: JobLedger, article_text: str | None = None) -> bool:
+    """Fetch the source text into the ledger ahead of generate_summary.
+
+    Lets the page download run while the GPU is still busy with another job;
+    generate_summary then resumes from the recorded text. `article_text`
+    already fetched (see best_articles) is recorded as is. Returns False if
+    not enough text could be extracted.
+    """
+    key = job_key("summary", article["url"])
+    record = ledger.register(key, "summary", article)
+    if reached(record, "searched") and record.get("article_text"):
+        return True
+    if article_text is None:
+        print(f"  Fetching article: {article['title'][:60]}...")
+        with timed("page_fetch", url=article["url"]) as m:
+            article_text = fetch_article_text(article["url"])
+            m["chars"] = len(article_text)
+    if not article_text or len(article_text) < MIN_TEXT_CHARS:
+        print(f"  Skipping: could not extract enough text from {article['url']}", file=sys.stderr)
+        ledger.fail(key, "could not extract enough text")
+        return False
+    ledger.update(key, "searched", article_text=article_text)
+    return True
+
+
+def generate_summary(article: dict, test: bool = False,
+                     ledger: JobLedger | None = None, article_text: str | None = None) -> Path | None:
+    """Generate a summary article from a source article.
+
+    `article_text` skips the page fetch when the text is already at hand.
+    With a `ledger`, the fetched text and raw LLM response are recorded so a
+    rerun resumes from the last completed stage.
+    """
     title = article["title"]
     url = article["url"]
     lang = article["lang"]
     category = article["category"]
 
-    print(f"  Fetching article: {title[:60]}...")
-    article_text = fetch_article_text(url)
-    if not article_text or len(article_text) < 100:
-        print(f"  Skipping: could not extract enough text from {url}", file=sys.stderr)
-        return None
-
-    prompt_template = SUMMARY_PROMPT_JA if lang == "ja" else SUMMARY_PROMPT_EN
-    prompt = prompt_template.format(title=title, source_url=url, article_text=article_text)
+    key = job_key("summary", url)
+    record = None
+    if ledger and not test:
+        record = ledger.register(key, "summary", article)
+        path = written_path(record)
+        if path:
+            print(f"  Already written: {path.relative_to(BLOG_ROOT)}")
+            return path
+    else:
+        ledger = None
 
-    print(f"  Summarizing: [{lang}] {title[:60]}...")
-    response = call_ollama(prompt)
+    if reached(record, "searched") and record.get("article_text"):
+        article_text = record["article_text"]
+    elif article_text:
+        if ledger:
+            ledger.update(key, "searched", article_text=article_text)
+    else:
+        print(f"  Fetching article: {title[:60]}...")
+        with timed("page_fetch", url=url) as m:
+            article_text = fetch_article_text(url)
+            m["chars"] = len(article_text)
+        if not article_text or len(article_text) < MIN_TEXT_CHARS:
+            print(f"  Skipping: could not extract enough text from {url}", file=sys.stderr)
+            if ledger:
+                ledger.fail(key, "could not extract enough text")
+            return None
+        if ledger:
+            ledger.update(key, "searched", article_text=article_text)
+
+    if reached(record, "generated") and record.get("response"):
+        print(f"  Resuming (generated): {title[:60]}")
+        response = record["response"]
+    else:
+        prompt_template = SUMMARY_PROMPT_JA if lang == "ja" else SUMMARY_PROMPT_EN
+        # Give the source text whatever the context window has left, in tokens
+        budget = ContextBudget(reserve_output=SUMMARY_PREDICT, model=get_router().primary("summary"))
+        instructions = prompt_template.format(title=title, source_url=url, article_text="")
+        article_text = budget.allocate([instructions], {"article": article_text})["article"]
+        prompt = prompt_template.format(title=title, source_url=url, article_text=article_text)
+
+        print(f"  Summarizing: [{lang}] {title[:60]}...")
+        response = call_ollama(prompt)
+        if ledger:
+            ledger.update(key, "generated", response=response)
 
     try:
-        parsed = extract_json(response)
+        with timed("parse", kind="summary", url=url):
+            parsed = extract_json(response)
     except ValueError as e:
         print(f"  Failed to parse summary: {e}", file=sys.stderr)
+        get_client().forget(response)
+        if ledger:
+            ledger.update(key, "searched", response=None)
+            ledger.fail(key, f"parse: {e}")
         return None
+    if ledger:
+        ledger.update(key, "parsed", title=parsed.get("title", ""))
 
-    summary_title = parsed.get("title", f"Summary: {title[:50]}")
     description = parsed.get("description", "")
     tags = parsed.get("tags", [])
     body = parsed.get("body", "")
+    summary_title = parsed.get("title")
+    if not summary_title and body:
+        print(f"  No title in the response, retrying title only: {title[:60]}", file=sys.stderr)
+        summary_title = retry_title(body, title, lang)
+    summary_title = summary_title or f"Summary: {title[:50]}"
 
     # Ensure source attribution is included
     source_section = f"\n\n## {'出典' if lang == 'ja' else 'Sources'}\n\n- [{title}]({url})\n"
@@ -270,9 +349,19 @@ def generate_summary(article: dict, test: bool = False) -> Path | None:
         print(f"Body preview:\n{body[:500]}...")
         return None
 
-    # Create Hugo content file
+    with timed("write", kind="summary", url=url):
+        output_path = write_summary_post(summary_title, description, tags, body, lang, category)
+    if ledger:
+        ledger.update(key, "written", path=str(output_path.relative_to(BLOG_ROOT)))
+    print(f"  Saved: {output_path.relative_to(BLOG_ROOT)}")
+    return output_path
+
+
+def write_summary_post(title: str, description: str, tags: list, body: str,
+                       lang: str, category: str, slug: str | None = None) -> Path:
+    """Write a Hugo content file of type "summary" and index it; return its path."""
     date = datetime.now(tz=JST).strftime("%Y-%m-%dT%H:%M:%S+09:00")
-    slug = slugify(summary_title)
+    slug = slug or slugify(title)
     cat_names = {
         "ai": {"ja": "AI / Machine Learning", "en": "AI / Machine Learning"},
         "tech": {"ja": "テクノロジー", "en": "Technology"},
@@ -282,16 +371,16 @@ def generate_summary(article: dict, test: bool = False) -> Path | None:
     cover_image = f"/images/covers/{category}.svg"
 
     front_matter = f"""---
-title: "{summary_title}"
+title: {json.dumps(title, ensure_ascii=False)}
 date: {date}
-description: "{description}"
+description: {json.dumps(description, ensure_ascii=False)}
 tags: {json.dumps(tags, ensure_ascii=False)}
 categories: ["{cat_name}"]
 slug: "{slug}"
 type: "summary"
 cover:
   image: "{cover_image}"
-  alt: "{summary_title}"
+  alt: {json.dumps(title, ensure_ascii=False)}
   relative: false
 ShowToc: true
 TocOpen: false
@@ -306,34 +395,47 @@ draft: false
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / f"{slug}.md"
     output_path.write_text(content, encoding="utf-8")
-    print(f"  Saved: {output_path.relative_to(BLOG_ROOT)}")
+    record_article(output_path)
     return output_path
 
 
 def main():
+    global STREAM_ENABLED, STALL_TIMEOUT, SUMMARY_CANDIDATES
     parser = argparse.ArgumentParser(description="Generate summary articles from trending news")
     parser.add_argument("--count", "-n", type=int, default=1, help="Number of summaries to generate (default: 1)")
     parser.add_argument("--lang", "-l", choices=["ja", "en"], default=None, help="Force language (default: auto)")
     parser.add_argument("--test", action="store_true", help="Test mode: preview without saving")
-    parser.add_argument("--model", "-m", default=None, help="Ollama model to use")
+    parser.add_argument("--candidates", type=int, default=SUMMARY_CANDIDATES,
+                        help=f"Feed items to fetch and rank per run (default: {SUMMARY_CANDIDATES})")
+    parser.add_argument("--model", "-m", default=None,
+                        help="Ollama model for every task (default: config/models.json)")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Regenerate even if an identical request is in the LLM cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream tokens from Ollama with live progress and stall detection")
+    parser.add_argument("--stall-timeout", type=float, default=STALL_TIMEOUT,
+                        help=f"Streaming: abort after this many seconds without tokens (default: {STALL_TIMEOUT})")
     args = parser.parse_args()
 
-    global MODEL
-    if args.model:
-        MODEL = args.model
+    get_router().set_model(args.model)
+    if args.no_llm_cache:
+        get_client().read_cache = False
+    STREAM_ENABLED = args.stream
+    STALL_TIMEOUT = args.stall_timeout
+    SUMMARY_CANDIDATES = args.candidates
 
     print("Fetching top articles for summarization...", file=sys.stderr)
-    articles = get_top_articles(count=args.count, lang=args.lang)
+    articles = best_articles(count=args.count, lang=args.lang)
 
     if not articles:
-        print("No articles found for summarization.", file=sys.stderr)
+        print("No articles with usable text found for summarization.", file=sys.stderr)
         sys.exit(1)
 
     generated = []
     failed = []
-    for article in articles:
+    for article, article_text in articles:
         try:
-            path = generate_summary(article, test=args.test)
+            path = generate_summary(article, test=args.test, article_text=article_text)
             if path:
                 generated.append(path)
         except Exception as e:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Task Graph - Run dependent steps concurrently with asyncio.
+
+Each task is a blocking function run in a worker thread (asyncio.to_thread)
+as soon as all of its dependencies have finished. Tasks marked `gpu=True`
+also hold a slot of a shared semaphore sized to Ollama's parallelism, so
+I/O-bound steps (feeds, page fetches, web search) overlap with generation
+while the generations themselves queue up one (or N) at a time.
+
+A task whose dependency failed is skipped rather than run.
+
+Usage:
+  from task_graph import Task, TaskGraph
+  graph = TaskGraph([
+      Task("discover", lambda r: find_topics()),
+      Task("search", lambda r: search(r["discover"][0]), deps=("discover",)),
+      Task("generate", lambda r: generate(r["search"]), deps=("search",), gpu=True),
+  ], gpu_slots=1)
+  results = asyncio.run(graph.run())
+  graph.print_summary()
+"""
+
+import asyncio
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Task:
+    """A step in the graph: `func(results)` gets the results of finished tasks by name."""
+    name: str
+    func: Callable[[dict[str, Any]], Any]
+    deps: tuple[str, ...] = ()
+    gpu: bool = False
+
+
+@dataclass
+class TaskRun:
+    """Outcome and timing of one task."""
+    name: str
+    status: str = "pending"  # pending | ok | failed | skipped
+    error: str = ""
+    queued_at: float = 0.0    # all dependencies done
+    started_at: float = 0.0   # running (after waiting for a GPU slot)
+    ended_at: float = 0.0
+
+
+class TaskGraph:
+    """Dependency-ordered task runner with a GPU concurrency limit."""
+
+    def __init__(self, tasks: list[Task], gpu_slots: int = 1):
+        names = [t.name for t in tasks]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate task names")
+        for task in tasks:
+            unknown = [d for d in task.deps if d not in names]
+            if unknown:
+                raise ValueError(f"task '{task.name}' depends on unknown {unknown}")
+        self._check_acyclic(tasks)
+        self.tasks = tasks
+        self.gpu_slots = max(1, gpu_slots)
+        self.results: dict[str, Any] = {}
+        self.runs = {t.name: TaskRun(t.name) for t in tasks}
+        self.started = 0.0
+        self.ended = 0.0
+
+    @staticmethod
+    def _check_acyclic(tasks: list[Task]) -> None:
+        deps = {t.name: set(t.deps) for t in tasks}
+        while deps:
+            ready = [name for name, d in deps.items() if not d]
+            if not ready:
+                raise ValueError(f"dependency cycle among {sorted(deps)}")
+            for name in ready:
+                del deps[name]
+            for d in deps.values():
+                d.difference_update(ready)
+
+    async def run(self) -> dict[str, Any]:
+        """Run every task; return {name: result} for the tasks that succeeded."""
+        gpu = asyncio.Semaphore(self.gpu_slots)
+        done = {t.name: asyncio.Event() for t in self.tasks}
+        self.started = time.time()
+
+        async def run_task(task: Task) -> None:
+            run = self.runs[task.name]
+            try:
+                for dep in task.deps:
+                    await done[dep].wait()
+                failed = [d for d in task.deps if self.runs[d].status != "ok"]
+                if failed:
+                    run.status = "skipped"
+                    run.error = f"dependency {', '.join(failed)} did not succeed"
+                    return
+                run.queued_at = time.time()
+                if task.gpu:
+                    async with gpu:
+                        await self._call(task, run)
+                else:
+                    await self._call(task, run)
+            finally:
+                done[task.name].set()
+
+        await asyncio.gather(*(run_task(t) for t in self.tasks))
+        self.ended = time.time()
+        return self.results
+
+    async def _call(self, task: Task, run: TaskRun) -> None:
+        run.started_at = time.time()
+        try:
+            self.results[task.name] = await asyncio.to_thread(task.func, self.results)
+            run.status = "ok"
+        except Exception as e:
+            run.status = "failed"
+            run.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=sys.stderr)
+        finally:
+            run.ended_at = time.time()
+
+    def gpu_seconds(self) -> float:
+        """Total time spent inside GPU tasks."""
+        return sum(self.runs[t.name].ended_at - self.runs[t.name].started_at
+                   for t in self.tasks if t.gpu and self.runs[t.name].started_at)
+
+    def summary_lines(self) -> list[str]:
+        """Human-readable per-task timeline (offsets from graph start)."""
+        lines = []
+        for task in self.tasks:
+            run = self.runs[task.name]
+            if run.started_at:
+                wait = run.started_at - run.queued_at
+                timing = (f"{run.started_at - self.started:7.1f}s → {run.ended_at - self.started:7.1f}s"
+                          f"  ({run.ended_at - run.started_at:.1f}s"
+                          f"{f', waited {wait:.1f}s for GPU' if wait >= 0.1 else ''})")
+            else:
+                timing = ""
+            note = f"  {run.error}" if run.error else ""
+            lines.append(f"{task.name:<18} {'[gpu]' if task.gpu else '     '} "
+                         f"{run.status:<8} {timing}{note}")
+        wall = self.ended - self.started
+        lines.append(f"Wall time {wall:.1f}s, GPU busy {self.gpu_seconds():.1f}s")
+        return lines
+
+    def print_summary(self) -> None:
+        print("\n".join(self.summary_lines()))
@@ -0,0 +1,32 @@
+import pytest
+
+from generate import read_batch_file
+
+
+def write(tmp_path, text):
+    path = tmp_path / "keywords.txt"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_valid_lines_become_jobs(tmp_path):
+    jobs = read_batch_file(write(tmp_path, "# comment\n\nllm|ja\nrag|en+ja|tech\n"))
+    assert [(j["keyword"], j["lang"], j["category"], j["translate_to"]) for j in jobs] == [
+        ("llm", "ja", "ai", None), ("rag", "en", "tech", "ja")]
+
+
+def test_bilingual_adds_the_other_language(tmp_path):
+    jobs = read_batch_file(write(tmp_path, "llm|en\n"), bilingual=True)
+    assert jobs[0]["translate_to"] == "ja"
+
+
+def test_bad_lines_are_all_reported_up_front(tmp_path):
+    path = write(tmp_path, "ok|ja\nsame|ja+ja\nfrench|fr\n|en\n")
+    with pytest.raises(ValueError) as exc:
+        read_batch_file(path)
+    message = str(exc.value)
+    assert message.startswith("3 bad line(s)")
+    assert "line 2: same|ja+ja" in message
+    assert "line 3: french|fr" in message
+    assert "line 4: |en" in message
+    assert "line 1" not in message
@@ -0,0 +1,35 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import history_store
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, "HISTORY_FILE", tmp_path / "history.jsonl")
+    monkeypatch.setattr(history_store, "ARCHIVE_FILE", tmp_path / "archive.jsonl")
+    monkeypatch.setattr(history_store, "LEGACY_HISTORY_FILE", tmp_path / "legacy.json")
+    return history_store.HISTORY_FILE, history_store.ARCHIVE_FILE
+
+
+def line(keyword, days_ago):
+    date = (datetime.now(tz=timezone.utc) - timedelta(days=days_ago)).isoformat()
+    return json.dumps({"keyword": keyword, "date": date}) + "\n"
+
+
+def test_compact_skips_a_truncated_line(files):
+    history, archive = files
+    history.write_text(line("old", 60) + '{"keyword": "half", "da\n' + line("new", 1),
+                       encoding="utf-8")
+
+    assert history_store.compact(30) == 1
+    assert [json.loads(l)["keyword"] for l in archive.read_text().splitlines()] == ["old"]
+    assert [json.loads(l)["keyword"] for l in history.read_text().splitlines()] == ["new"]
+
+
+def test_needs_compaction_looks_past_an_unreadable_first_line(files):
+    history, _ = files
+    history.write_text('{"keyw\n' + line("old", 60), encoding="utf-8")
+    assert history_store.needs_compaction(30)
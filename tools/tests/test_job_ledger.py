@@ -0,0 +1,23 @@
+import json
+import time
+
+from job_ledger import JobLedger
+
+
+def test_prune_drops_only_stale_records(tmp_path):
+    ledger = JobLedger("items", root=tmp_path)
+    ledger.update("old", "generated", summary="s")
+    ledger.update("new", "generated", summary="s")
+    path = ledger.dir / "old.json"
+    record = json.loads(path.read_text(encoding="utf-8"))
+    record["updated"] = time.time() - 10 * 86400
+    path.write_text(json.dumps(record), encoding="utf-8")
+    (ledger.dir / "broken.json").write_text("{", encoding="utf-8")
+
+    assert ledger.prune(8 * 86400) == 2
+    assert ledger.get("old") is None
+    assert ledger.get("new")["summary"] == "s"
+
+
+def test_prune_of_a_missing_ledger_is_a_no_op(tmp_path):
+    assert JobLedger("none", root=tmp_path).prune(60) == 0
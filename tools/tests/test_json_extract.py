@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from json_extract import JsonExtractor, extract, extract_json
+
+CODE_BODY = (
+    "## Code\n\n"
+    "```python\n"
+    'subprocess.run(["git", "add", path], check=True)\n'
+    'print("a", "b")\n'
+    'config = {"title": "x", "retries": 3}\n'
+    'print(json.dumps({"key": "value"}))\n'
+    "```\n\n"
+    "## Conclusion\n\n"
+    'Quotes like "this", and "that" stay in the text.'
+)
+
+
+def raw_article(body: str) -> str:
+    """An article the way models write it: escaped newlines, unescaped quotes."""
+    return ('{\n  "title": "Running git from Python",\n  "description": "D",\n'
+            '  "tags": ["python", "git"],\n  "body": "' + body.replace("\n", "\\n") + '"\n}')
+
+
+@pytest.mark.parametrize("wrap", [
+    lambda raw: raw,
+    lambda raw: f"```json\n{raw}\n```",
+    lambda raw: f"Here is the article:\n{raw}\n\nHope this helps!",
+])
+def test_unescaped_quotes_in_code_blocks_keep_the_whole_body(wrap):
+    article = extract_json(wrap(raw_article(CODE_BODY)))
+    assert article["body"] == CODE_BODY
+    assert article["title"] == "Running git from Python"
+    assert article["tags"] == ["python", "git"]
+
+
+def test_streamed_chunks_give_the_same_body():
+    extractor = JsonExtractor()
+    raw = raw_article(CODE_BODY)
+    for i in range(0, len(raw), 7):
+        extractor.feed(raw[i:i + 7])
+    assert extractor.finish()["body"] == CODE_BODY
+    assert extractor.incomplete == []
+
+
+@pytest.mark.parametrize("indent", [None, 1])
+def test_translation_pass_json(indent):
+    # translate_article sends the article with json.dumps and the model echoes that layout
+    translated = {"title": "Pythonからgitを実行する", "description": "説明",
+                  "tags": ["Python", "git"], "body": CODE_BODY.replace("Conclusion", "まとめ")}
+    text = json.dumps(translated, ensure_ascii=False, indent=indent)
+    assert extract_json(text) == translated
+    # ...and the same with the quotes left unescaped, as models often do
+    unescaped = text.replace('\\"', '"')
+    assert extract_json(f"```json\n{unescaped}\n```")["body"] == translated["body"]
+
+
+def test_field_order_does_not_matter():
+    raw = '{"body": "print(\\"a\\", \\"b\\")\nok", "title": "T", "tags": ["x"]}'
+    raw = raw.replace('\\"', '"')
+    assert extract_json(raw) == {"title": "T", "body": 'print("a", "b")\nok', "tags": ["x"]}
+
+
+def test_truncated_body_is_recovered():
+    fields, incomplete = extract('{"title": "T", "body": "## Intro\\n\\nprint("a", "b'
+                                 )
+    assert fields["body"] == '## Intro\n\nprint("a", "b'
+    assert incomplete == ["body"]
+
+
+def test_outline_sections_with_quotes():
+    fields, incomplete = extract(
+        '{"title": "A", "sections": [{"heading": "Using "uv"", "points": "run("x", "y")"},'
+        ' {"heading": "Conclusion", "points": "recap"}]}')
+    assert fields["sections"] == [{"heading": 'Using "uv"', "points": 'run("x", "y")'},
+                                  {"heading": "Conclusion", "points": "recap"}]
+    assert incomplete == []
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def metrics_file(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.jsonl"
+    monkeypatch.setattr(metrics, "METRICS_FILE", path)
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    return path
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_block_can_record_a_handled_failure(metrics_file):
+    with metrics.timed("feed.fetch", feed="f") as m:
+        m["ok"] = False
+        m["error"] = "HTTP 500"
+    record = records(metrics_file)[0]
+    assert (record["ok"], record["error"], record["feed"]) == (False, "HTTP 500", "f")
+
+
+def test_exception_after_ok_was_set_is_still_recorded(metrics_file):
+    with pytest.raises(KeyError):
+        with metrics.timed("feed.fetch") as m:
+            m["ok"] = False
+            m["error"] = "HTTP 500"
+            raise KeyError("boom")
+    record = records(metrics_file)[0]
+    assert record["ok"] is False
+    assert record["error"] == "KeyError: 'boom'"
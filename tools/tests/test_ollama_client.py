@@ -0,0 +1,53 @@
+import pytest
+
+import metrics
+from llm_cache import LLMCache
+from ollama_client import OllamaClient
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    return OllamaClient(cache=LLMCache(root=tmp_path))
+
+
+def fake_generate(monkeypatch, client, text, final):
+    calls = []
+
+    def _generate(payload, *args, **kwargs):
+        calls.append(payload)
+        return text, final
+    monkeypatch.setattr(client, "_generate", _generate)
+    return calls
+
+
+def test_completed_response_is_cached(monkeypatch, client):
+    calls = fake_generate(monkeypatch, client, '{"title": "t"}', {"done_reason": "stop"})
+    assert client.generate("p") == '{"title": "t"}'
+    assert client.generate("p") == '{"title": "t"}'
+    assert len(calls) == 1
+
+
+def test_response_cut_by_num_predict_is_not_cached(monkeypatch, client):
+    calls = fake_generate(monkeypatch, client, '{"title": "t", "body": "tru', {"done_reason": "length"})
+    client.generate("p")
+    client.generate("p")
+    assert len(calls) == 2
+    assert client.cache.stats()["entries"] == 0
+
+
+def test_stream_stopped_early_is_not_cached(monkeypatch, client):
+    calls = fake_generate(monkeypatch, client, '{"title": "t", "tags": []}', {})
+    client.generate("p", stream=True)
+    client.generate("p")
+    assert len(calls) == 2
+    assert client.cache.stats()["entries"] == 0
+
+
+def test_forget_drops_the_cached_response(monkeypatch, client):
+    calls = fake_generate(monkeypatch, client, "not json", {"done_reason": "stop"})
+    text = client.generate("p")
+    client.generate("p")  # from the cache
+    client.forget(text)
+    client.generate("p")
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import metrics
+from ollama_client import OllamaClient
+from ollama_stream import read_stream
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bench"))
+from stub_ollama import StubOllama  # noqa: E402
+
+SECTION = ("Point the client at the GPU box:\n\n```bash\nexport OLLAMA_HOST=${HOST}:11434\n```\n\n"
+           "Then load the model once with `ollama run`, and every request reuses it.")
+ARTICLE = '{"title": "t", "tags": ["a", "b"]}'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    responses = tmp_path / "responses.json"
+    responses.write_text(json.dumps([{"match": "section", "response": SECTION},
+                                     {"match": "", "response": ARTICLE + "\nHope this helps!"}]),
+                         encoding="utf-8")
+    stub = StubOllama(responses_file=responses).start()
+    yield OllamaClient(host=stub.url)
+    stub.stop()
+
+
+def test_plain_text_stream_is_read_to_the_end(client):
+    assert client.generate("write the section", stream=True, expect_json=False) == SECTION
+
+
+def test_json_stream_stops_when_the_object_closes(client):
+    assert client.generate("write the article", stream=True).strip() == ARTICLE
+
+
+class Lines:
+    def __init__(self, chunks):
+        self.lines = [json.dumps(c).encode() + b"\n" for c in chunks]
+
+    def readline(self):
+        return self.lines.pop(0) if self.lines else b""
+
+    def settimeout(self, seconds):
+        pass
+
+
+def test_read_stream_reads_to_the_done_chunk_by_default():
+    pieces = ["Set ", "${HOST}", " and ", "{x}", " then load."]
+    chunks = [{"response": p, "done": False} for p in pieces] + [{"done": True, "done_reason": "stop"}]
+    stream = Lines(chunks)
+    text, final = read_stream(stream, stream, progress_interval=0)
+    assert text == "".join(pieces)
+    assert final["done_reason"] == "stop"
@@ -0,0 +1,48 @@
+from token_budget import TRUNCATED_MARK, ContextBudget, estimate_tokens, trim_to_tokens
+
+EN = "Python 3.12 is out. See docs.python.org/3.12 for the details! It is faster. "
+JA = "最初の文です。次の文です！三つ目はどうでしょう？"
+
+
+def test_short_text_is_unchanged():
+    assert trim_to_tokens(EN, 1000) == EN
+
+
+def test_sentences_keep_numbers_urls_and_separators():
+    trimmed = trim_to_tokens(EN * 20, 40)
+    assert trimmed.endswith(TRUNCATED_MARK)
+    kept = trimmed[:-len(TRUNCATED_MARK)]
+    assert kept.startswith("Python 3.12 is out. See docs.python.org/3.12 for the details!")
+    assert "3. 12" not in kept and "python. org" not in kept
+    assert (EN * 20).startswith(kept)
+
+
+def test_japanese_sentences_are_not_spaced():
+    kept = trim_to_tokens(JA * 50, 40)[:-len(TRUNCATED_MARK)]
+    assert kept and " " not in kept
+    assert (JA * 50).startswith(kept)
+    assert kept.endswith(("。", "！", "？"))
+
+
+def test_paragraph_without_sentence_break_is_cut_not_dropped():
+    text = "これは句読点のない長い段落" * 300
+    trimmed = trim_to_tokens(text, 100)
+    kept = trimmed[:-len(TRUNCATED_MARK)]
+    assert len(kept) > 50 and text.startswith(kept)
+    assert estimate_tokens(trimmed) <= 100
+
+
+def test_whole_paragraphs_are_kept_first():
+    text = "\n".join(f"- result {i}: " + "word " * 20 for i in range(30))
+    kept = trim_to_tokens(text, 200)[:-len(TRUNCATED_MARK)]
+    assert text.startswith(kept)
+    assert kept.count("\n") >= 3
+
+
+def test_allocate_gives_unused_share_to_other_parts():
+    budget = ContextBudget(num_ctx=4096, reserve_output=1024)
+    parts = budget.allocate(["instructions"], {"long": JA * 500, "short": "brief"})
+    assert parts["short"] == "brief"
+    room = budget.available(["instructions"])
+    assert estimate_tokens(parts["long"]) <= room - estimate_tokens("brief")
+    assert estimate_tokens(parts["long"]) > room // 2
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Token Budget - Size prompt context in tokens instead of characters.
+
+Japanese text costs roughly one token per character while English costs
+about one per four, so a fixed character limit overflows the context
+window for one language and wastes it for the other. Ollama silently
+drops the start of a prompt that does not fit in num_ctx.
+
+  - estimate_tokens() counts CJK characters and other text separately
+  - with OLLAMA_TOKENIZE=1, count_tokens() asks Ollama's /api/tokenize for
+    an exact count (cached per model and text); servers without the
+    endpoint fall back to the estimate
+  - ContextBudget takes the model's num_ctx, reserves room for the output
+    and the fixed instructions, splits the rest between the variable
+    parts of a prompt and trims each at paragraph, then sentence,
+    boundaries
+
+Configuration (environment):
+  OLLAMA_NUM_CTX     Context window, see ollama_client.py (default: 8192)
+  OLLAMA_TOKENIZE    Set to 1 to count tokens exactly via Ollama
+
+Usage:
+  from token_budget import ContextBudget
+  budget = ContextBudget(reserve_output=2048)
+  parts = budget.allocate(fixed=[instructions], parts={"article": text})
+  prompt = instructions.format(article_text=parts["article"])
+
+  python token_budget.py --file page.txt            # Estimate (and exact, if enabled)
+  python token_budget.py --file page.txt --fit 1000 # Show the text trimmed to 1000 tokens
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+from ollama_client import NUM_CTX, OllamaError, get_client
+
+EXACT = os.environ.get("OLLAMA_TOKENIZE", "0") == "1"
+
+# Tokens per character by script, on the safe side for Llama/Qwen tokenizers
+CJK_TOKENS_PER_CHAR = 1.0
+OTHER_TOKENS_PER_CHAR = 0.27
+SAFETY_MARGIN = 64  # chat template tokens and estimation slack
+
+TRUNCATED_MARK = "\n[...truncated]"
+
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]")
+# A sentence with its trailing whitespace: ends at 。！？, or at .!? followed by
+# whitespace (not the dots in "3.12" or "docs.python.org"), or at the end of text
+_SENTENCE = re.compile(r".+?(?:[。！？]+|[.!?]+(?=\s|$)|$)\s*", re.S)
+
+_exact_cache: dict[tuple[str, str], int] = {}
+_exact_lock = threading.Lock()
+_exact_unavailable = False
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast token estimate: CJK characters and other characters weighted separately."""
+    cjk = len(_CJK.findall(text))
+    return int(cjk * CJK_TOKENS_PER_CHAR + (len(text) - cjk) * OTHER_TOKENS_PER_CHAR) + 1
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    """Exact count from Ollama when enabled and supported, else the estimate."""
+    global _exact_unavailable
+    if not EXACT or _exact_unavailable or not text:
+        return estimate_tokens(text)
+    client = get_client()
+    model = model or client.model
+    key = (model, hashlib.sha1(text.encode("utf-8")).hexdigest())
+    with _exact_lock:
+        if key in _exact_cache:
+            return _exact_cache[key]
+    try:
+        tokens = len(client.post("/api/tokenize", {"model": model, "content": text},
+                                 timeout=30)["tokens"])
+    except (OllamaError, KeyError, OSError) as e:
+        print(f"  Ollama tokenize unavailable ({e}); using estimates", file=sys.stderr)
+        _exact_unavailable = True
+        return estimate_tokens(text)
+    with _exact_lock:
+        _exact_cache[key] = tokens
+    return tokens
+
+
+def _take(pieces: list[str], sep: str, max_tokens: int) -> tuple[list[str], int]:
+    """Leading pieces whose estimate fits in `max_tokens`; also return the tokens used."""
+    kept, used = [], 0
+    for piece in pieces:
+        cost = estimate_tokens(piece + sep)
+        if used + cost > max_tokens:
+            break
+        kept.append(piece)
+        used += cost
+    return kept, used
+
+
+def _cut_chars(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` whose estimate fits in `max_tokens`."""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def trim_to_tokens(text: str, max_tokens: int, mark: str = TRUNCATED_MARK) -> str:
+    """Cut `text` to about `max_tokens` (estimated), at a paragraph or sentence boundary.
+
+    A first paragraph without a sentence that fits is cut mid-sentence instead.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - estimate_tokens(mark))
+    paragraphs = text.split("\n")
+    kept, used = _take(paragraphs, "\n", budget)
+    # Fill the remaining room with whole sentences of the next paragraph
+    sentences = _SENTENCE.findall(paragraphs[len(kept)]) if len(kept) < len(paragraphs) else []
+    partial, _ = _take(sentences, "", budget - used)
+    if partial:
+        kept.append("".join(partial).rstrip())
+    elif not kept:
+        kept.append(_cut_chars(paragraphs[0], budget))
+    return "\n".join(kept) + mark
+
+
+class ContextBudget:
+    """Splits a model's context window between the parts of one prompt."""
+
+    def __init__(self, num_ctx: int = NUM_CTX, reserve_output: int = 2048,
+                 model: str | None = None):
+        self.num_ctx = num_ctx
+        self.reserve_output = reserve_output
+        self.model = model
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def available(self, fixed: list[str]) -> int:
+        """Tokens left for variable parts after the output reserve and fixed text."""
+        used = sum(self.count(t) for t in fixed if t)
+        return max(0, self.num_ctx - self.reserve_output - SAFETY_MARGIN - used)
+
+    def allocate(self, fixed: list[str], parts: dict[str, str],
+                 shares: dict[str, float] | None = None) -> dict[str, str]:
+        """Trim each part to its share of the room left by `fixed`.
+
+        Shares default to equal; a part that needs less than its share
+        gives the rest to the others.
+        """
+        room = self.available(fixed)
+        shares = shares or {name: 1.0 for name in parts}
+        need = {name: self.count(text) for name, text in parts.items()}
+        limits: dict[str, int] = {}
+        pending = [name for name in parts if need[name]]
+        while pending:
+            total_share = sum(shares.get(name, 1.0) for name in pending)
+            fair = {name: room * shares.get(name, 1.0) / total_share for name in pending}
+            satisfied = [name for name in pending if need[name] <= fair[name]]
+            if not satisfied:
+                limits.update({name: int(fair[name]) for name in pending})
+                break
+            for name in satisfied:
+                limits[name] = need[name]
+                room -= need[name]
+                pending.remove(name)
+        return {name: self.fit(text, limits.get(name, 0)) for name, text in parts.items()}
+
+    def fit(self, text: str, max_tokens: int) -> str:
+        """Trim `text` to `max_tokens`, re-checking with the exact count when enabled."""
+        limit = max_tokens
+        trimmed = trim_to_tokens(text, limit)
+        for _ in range(3):
+            actual = self.count(trimmed)
+            if actual <= max_tokens or not trimmed:
+                break
+            # The estimate was optimistic for this text; shrink proportionally
+            limit = int(limit * max_tokens / actual) - 1
+            trimmed = trim_to_tokens(text, limit)
+        return trimmed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate and trim prompt tokens")
+    parser.add_argument("--file", type=Path, required=True, help="Text file to measure")
+    parser.add_argument("--fit", type=int, help="Print the text trimmed to this many tokens")
+    parser.add_argument("--model", "-m", default=None, help="Model for exact counts")
+    args = parser.parse_args()
+
+    text = args.file.read_text(encoding="utf-8")
+    print(f"{len(text)} chars, ~{estimate_tokens(text)} tokens (estimate)", file=sys.stderr)
+    if EXACT:
+        print(f"{count_tokens(text, args.model)} tokens (Ollama)", file=sys.stderr)
+    if args.fit:
+        print(ContextBudget(model=args.model).fit(text, args.fit))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,20 +12,19 @@ import argparse
 import json
 import re
 import sys
-import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-try:
-    import feedparser
-except ImportError:
-    print("Error: feedparser not installed. Run: pip install --user feedparser", file=sys.stderr)
-    sys.exit(1)
+import history_store
+from content_index import get_index
+from feed_store import fetch_entries, snapshot
+from keyword_matcher import KeywordMatcher, merge_keywords
+from metrics import timed
+from similarity import SimilarityIndex
 
 TOOLS_DIR = Path(__file__).resolve().parent
 CONFIG_DIR = TOOLS_DIR / "config"
 FEEDS_CONFIG = CONFIG_DIR / "feeds.json"
-HISTORY_FILE = CONFIG_DIR / "topics_history.json"
 BLOG_ROOT = TOOLS_DIR.parent
 CONTENT_DIR = BLOG_ROOT / "content"
 
@@ -44,6 +43,8 @@ CATEGORY_KEYWORDS = {
                  "attention", "reasoning", "multimodal"],
 }
 
+_matcher: KeywordMatcher | None = None
+
 
 def load_feeds_config() -> dict:
     """Load RSS feed configuration."""
@@ -51,56 +52,49 @@ def load_feeds_config() -> dict:
         return json.load(f)
 
 
-def load_history() -> list[dict]:
-    """Load previously generated topic history."""
-    if not HISTORY_FILE.exists():
-        return []
-    with open(HISTORY_FILE, encoding="utf-8") as f:
-        data = json.load(f)
-    return data.get("generated", [])
+def load_history(days: float = 30) -> list[dict]:
+    """Load topic history from the last `days` days (oldest first)."""
+    return history_store.recent(days)
 
 
-def save_history(history: list[dict]) -> None:
-    """Save topic history."""
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump({"generated": history}, f, ensure_ascii=False, indent=2)
+def save_history(new_records: list[dict], keep_days: float = 30) -> None:
+    """Append new topic records, archiving entries older than `keep_days`."""
+    history_store.append(new_records, keep_days=keep_days)
 
 
 def get_existing_slugs() -> set[str]:
     """Get slugs of all existing articles to avoid duplicates."""
-    slugs = set()
-    for md_file in CONTENT_DIR.rglob("*.md"):
-        slugs.add(md_file.stem.lower())
-        # Also extract slug from front matter
-        try:
-            text = md_file.read_text(encoding="utf-8")
-            m = re.search(r'^slug:\s*"?([^"\n]+)"?', text, re.MULTILINE)
-            if m:
-                slugs.add(m.group(1).strip().lower())
-        except Exception:
-            pass
-    return slugs
+    return get_index().slugs
+
+
+def get_matcher() -> KeywordMatcher:
+    """Return the keyword matcher for CATEGORY_KEYWORDS plus feeds.json `keywords`."""
+    global _matcher
+    if _matcher is None:
+        config_keywords = load_feeds_config().get("keywords", {})
+        _matcher = KeywordMatcher(merge_keywords(CATEGORY_KEYWORDS, config_keywords))
+    return _matcher
+
+
+def classify_hits(hits: dict[str, int]) -> str:
+    """Pick the category with the most keyword hits (default: tech)."""
+    best = max(hits, key=hits.get)
+    return best if hits[best] > 0 else "tech"
+
+
+def keyword_score(hits: dict[str, int], category: str) -> float:
+    """Normalize a category's keyword hit count to 0-1 (3+ matches = 1.0)."""
+    return min(hits.get(category, 0) / 3.0, 1.0)
 
 
 def classify_category(text: str) -> str:
     """Classify an entry into a category based on keyword matching."""
-    text_lower = text.lower()
-    scores = {}
-    for cat, keywords in CATEGORY_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in text_lower)
-        scores[cat] = score
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "tech"
+    return classify_hits(get_matcher().hits(text))
 
 
 def compute_keyword_score(text: str, category: str) -> float:
     """Score how relevant an entry is based on keyword matches."""
-    text_lower = text.lower()
-    keywords = CATEGORY_KEYWORDS.get(category, [])
-    if not keywords:
-        return 0.0
-    matches = sum(1 for kw in keywords if kw in text_lower)
-    return min(matches / 3.0, 1.0)  # Normalize: 3+ matches = 1.0
+    return keyword_score(get_matcher().hits(text), category)
 
 
 def compute_recency_score(published: datetime | None) -> float:
@@ -120,16 +114,15 @@ def compute_recency_score(published: datetime | None) -> float:
     return 0.1
 
 
-def parse_entry_date(entry) -> datetime | None:
-    """Extract publication date from a feed entry."""
-    for attr in ("published_parsed", "updated_parsed"):
-        parsed = getattr(entry, attr, None)
-        if parsed:
-            try:
-                return datetime(*parsed[:6], tzinfo=timezone.utc)
-            except Exception:
-                pass
-    return None
+def parse_entry_date(entry: dict) -> datetime | None:
+    """Extract publication date from a normalized feed entry."""
+    published = entry.get("published")
+    if not published:
+        return None
+    try:
+        return datetime.fromisoformat(published)
+    except ValueError:
+        return None
 
 
 def extract_topic_keyword(entry) -> str:
@@ -145,39 +138,29 @@ def extract_topic_keyword(entry) -> str:
     return title
 
 
-def fetch_feed(feed_config: dict) -> list[dict]:
-    """Fetch and parse a single RSS feed, return scored entries."""
+def score_entries(feed_config: dict, feed_entries: list[dict]) -> list[dict]:
+    """Score a feed's normalized entries (see feed_store) for topic selection."""
     name = feed_config["name"]
-    url = feed_config["url"]
     default_lang = feed_config["language"]
     default_cat = feed_config["category"]
     weight = feed_config.get("weight", 1.0)
-
-    print(f"  Fetching: {name} ...", file=sys.stderr)
-    try:
-        feed = feedparser.parse(url)
-    except Exception as e:
-        print(f"  Failed to fetch {name}: {e}", file=sys.stderr)
-        return []
-
-    if feed.bozo and not feed.entries:
-        print(f"  Warning: {name} returned no entries (bozo={feed.bozo_exception})", file=sys.stderr)
-        return []
+    matcher = get_matcher()
 
     entries = []
-    for entry in feed.entries[:20]:  # Limit to 20 most recent
+    for entry in feed_entries[:20]:  # Limit to 20 most recent
         title = entry.get("title", "")
         summary = entry.get("summary", "")
         combined_text = f"{title} {summary}"
         keyword = extract_topic_keyword(entry)
-        category = classify_category(combined_text)
+        hits = matcher.hits(combined_text)
+        category = classify_hits(hits)
 
         # If the feed has a default category and the classification is weak, use default
         if category == "tech" and default_cat != "tech":
             category = default_cat
 
         pub_date = parse_entry_date(entry)
-        kw_score = compute_keyword_score(combined_text, category)
+        kw_score = keyword_score(hits, category)
         recency = compute_recency_score(pub_date)
         total_score = (0.7 * kw_score + 0.3 * recency) * weight
 
@@ -196,10 +179,47 @@ def fetch_feed(feed_config: dict) -> list[dict]:
     return entries
 
 
+def fetch_feed(feed_config: dict) -> list[dict]:
+    """Fetch and parse a single RSS feed, return scored entries."""
+    return score_entries(feed_config, fetch_entries(feed_config))
+
+
+def _parse_date(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_similarity_index(history: list[dict]) -> SimilarityIndex:
+    """Index published article titles and previously generated topic keywords."""
+    index = SimilarityIndex()
+    for rec in get_index().articles.values():
+        if rec.get("title"):
+            index.add(rec["title"], _parse_date(rec.get("date")))
+    for h in history:
+        if h.get("keyword"):
+            index.add(h["keyword"], _parse_date(h.get("date")))
+    return index
+
+
 def deduplicate(topics: list[dict], existing_slugs: set[str],
-                history: list[dict], dedup_days: int = 7) -> list[dict]:
-    """Remove topics that are duplicates of existing articles or recent history."""
+                history: list[dict], dedup_days: int = 7,
+                similarity: SimilarityIndex | None = None,
+                near_dup_threshold: float = 0.5,
+                near_dup_days: int = 30) -> list[dict]:
+    """Remove topics that are duplicates of existing articles or recent history.
+
+    With a `similarity` index, topics whose wording is within
+    `near_dup_threshold` (Jaccard over shingles) of anything dated in the
+    last `near_dup_days` are dropped as well, including near-duplicates
+    within the current batch.
+    """
     cutoff = datetime.now(tz=timezone.utc) - timedelta(days=dedup_days)
+    near_dup_cutoff = datetime.now(tz=timezone.utc) - timedelta(days=near_dup_days)
 
     # Build set of recently generated keywords
     recent_keywords = set()
@@ -228,6 +248,14 @@ def deduplicate(topics: list[dict], existing_slugs: set[str],
         # Check against duplicates in current batch
         if kw_lower in seen_keywords:
             continue
+        # Check for near-duplicates of recent articles, history and this batch
+        if similarity is not None:
+            matches = similarity.query(topic["keyword"], near_dup_threshold, since=near_dup_cutoff)
+            if matches:
+                print(f"  Near-duplicate ({matches[0][0]:.2f}): {topic['keyword']} ~ {matches[0][1]}",
+                      file=sys.stderr)
+                continue
+            similarity.add(topic["keyword"], datetime.now(tz=timezone.utc))
         seen_keywords.add(kw_lower)
         result.append(topic)
 
@@ -262,12 +290,15 @@ def discover_topics(count: int = 3, dump: bool = False) -> list[dict]:
     ja_ratio = settings.get("ja_en_ratio", [60, 40])[0]
     min_score = settings.get("min_score", 0.3)
 
-    # Fetch all feeds
+    # Fetch all feeds (or reuse the shared snapshot), then score
+    print(f"  Fetching {len(config['feeds'])} feeds ...", file=sys.stderr)
+    with timed("discover.feeds", feeds=len(config["feeds"])):
+        feed_entries = snapshot(config["feeds"])
     all_entries = []
-    for feed_config in config["feeds"]:
-        entries = fetch_feed(feed_config)
-        all_entries.extend(entries)
-        time.sleep(1)  # Rate limiting between feeds
+    with timed("discover.score") as m:
+        for feed_config in config["feeds"]:
+            all_entries.extend(score_entries(feed_config, feed_entries.get(feed_config["name"], [])))
+        m["entries"] = len(all_entries)
 
     if not all_entries:
         print("No entries found from any feed.", file=sys.stderr)
@@ -288,24 +319,29 @@ def discover_topics(count: int = 3, dump: bool = False) -> list[dict]:
         print(f"No entries above minimum score ({min_score}). Using top entries.", file=sys.stderr)
         filtered = all_entries[:count * 3]
 
-    # Deduplicate
-    existing_slugs = get_existing_slugs()
-    history = load_history()
-    deduped = deduplicate(filtered, existing_slugs, history, dedup_days)
+    # Deduplicate (only history inside the largest window is loaded)
+    near_dup_days = settings.get("near_dup_window_days", 30)
+    history_days = max(dedup_days, near_dup_days)
+    with timed("discover.dedup", candidates=len(filtered)) as m:
+        existing_slugs = get_existing_slugs()
+        history = load_history(history_days)
+        similarity = build_similarity_index(history)
+        deduped = deduplicate(filtered, existing_slugs, history, dedup_days, similarity,
+                              near_dup_threshold=settings.get("near_dup_threshold", 0.5),
+                              near_dup_days=near_dup_days)
+        m["kept"] = len(deduped)
 
     # Balance languages and select top topics
     selected = balance_languages(deduped, ja_ratio, count)
 
     # Record in history
     now = datetime.now(tz=JST).isoformat()
-    for topic in selected:
-        history.append({
-            "keyword": topic["keyword"],
-            "lang": topic["lang"],
-            "category": topic["category"],
-            "date": now,
-        })
-    save_history(history)
+    save_history([{
+        "keyword": topic["keyword"],
+        "lang": topic["lang"],
+        "category": topic["category"],
+        "date": now,
+    } for topic in selected], keep_days=history_days)
 
     return selected
 